@@ -1,11 +1,122 @@
-from django.contrib import admin
+from datetime import MAXYEAR, datetime
+
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.db.models import Max, Min, Q
+from django.utils import timezone
 from django.utils.html import format_html
+from django.utils.text import smart_split, unescape_string_literal
 from django.urls import reverse
-from .models import Booking
+from .models import Booking, BookingHold, OutboxEvent
+from .services import BookingService
+from apps.core.pagination import EstimatedCountPaginator
+from apps.rooms.models import Room
+from apps.users.models import User
+
+# Верхняя граница BigAutoField (bigint)
+MAX_BIGINT = 2 ** 63 - 1
+
+
+class BookingAdminForm(forms.ModelForm):
+    """
+    Форма бронирования в админке.
+
+    Поле stay не редактируется в форме, поэтому Django не проверяет
+    ограничение booking_no_overlap - проверяем пересечение сами.
+    """
+
+    class Meta:
+        model = Booking
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        room = cleaned_data.get('room')
+        check_in = cleaned_data.get('check_in')
+        check_out = cleaned_data.get('check_out')
+
+        if room and check_in and check_out and cleaned_data.get('status') == 'active':
+            is_available, error_msg = BookingService.check_room_availability(
+                room, check_in, check_out, exclude_booking_id=self.instance.pk, user=cleaned_data.get('user')
+            )
+            if not is_available:
+                raise forms.ValidationError(error_msg)
+
+        return cleaned_data
+
+
+class CreatedPeriodFilter(admin.SimpleListFilter):
+    """
+    Фильтр по году и месяцу создания вместо date_hierarchy.
+
+    date_hierarchy строит список лет и месяцев через SELECT DISTINCT по всей
+    таблице. Здесь годы берутся из MIN/MAX(created_at) (два чтения индекса),
+    месяцы выбранного года - фиксированный список.
+    """
+    title = 'Период создания'
+    parameter_name = 'created'
+
+    def lookups(self, request, model_admin):
+        bounds = Booking.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None:
+            return []
+
+        first_year = timezone.localtime(bounds['first']).year
+        last_year = timezone.localtime(bounds['last']).year
+        choices = []
+        selected = self.parse(self.value())
+        for year in range(last_year, first_year - 1, -1):
+            choices.append((str(year), str(year)))
+            if selected and selected[0] == year:
+                choices.extend((f'{year}-{month:02d}', f'— {year}-{month:02d}') for month in range(1, 13))
+        return choices
+
+    def queryset(self, request, queryset):
+        selected = self.parse(self.value())
+        if not selected:
+            return queryset
+
+        year, month = selected
+        if month:
+            start = datetime(year, month, 1)
+            end_year, end_month = year + month // 12, month % 12 + 1
+        else:
+            start = datetime(year, 1, 1)
+            end_year, end_month = year + 1, 1
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(start))
+        # После декабря 9999 года datetime не продолжается - верхней границы нет
+        if end_year <= MAXYEAR:
+            queryset = queryset.filter(created_at__lt=timezone.make_aware(datetime(end_year, end_month, 1)))
+        return queryset
+
+    @staticmethod
+    def parse(value):
+        """
+        'YYYY' -> (год, None), 'YYYY-MM' -> (год, месяц), иначе None.
+        """
+        try:
+            parts = [int(part) for part in (value or '').split('-')]
+            if len(parts) == 1 and 1 <= parts[0] <= MAXYEAR:
+                return parts[0], None
+            if len(parts) == 2 and 1 <= parts[0] <= MAXYEAR and 1 <= parts[1] <= 12:
+                return parts[0], parts[1]
+        except ValueError:
+            pass
+        return None
 
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
+    """
+    Бронирования в админке, рассчитано на таблицы в миллионы строк:
+
+    - количество строк - оценка планировщика (EstimatedCountPaginator),
+      без второго COUNT(*) по всей таблице;
+    - период создания - CreatedPeriodFilter вместо date_hierarchy;
+    - поиск - подзапросы к users и rooms по триграммным индексам.
+    """
+    form = BookingAdminForm
 
     list_display = [
         'id',
@@ -21,11 +132,12 @@ class BookingAdmin(admin.ModelAdmin):
 
     list_filter = [
         'status',
-        'created_at',
+        CreatedPeriodFilter,
         'check_in',
         'check_out',
     ]
 
+    # Поля для подсказки в поле поиска; сам поиск - get_search_results
     search_fields = [
         'user__username',
         'user__email',
@@ -73,7 +185,10 @@ class BookingAdmin(admin.ModelAdmin):
 
     list_per_page = 25
 
-    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    actions = ['cancel_selected']
 
     def get_queryset(self, request):
         """
@@ -82,6 +197,60 @@ class BookingAdmin(admin.ModelAdmin):
         queryset = super().get_queryset(request)
         return queryset.select_related('room', 'user', 'cancelled_by')
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск по пользователю, номеру комнаты и id бронирования.
+
+        Вместо OR по четырем JOIN к users (который не использует индексы)
+        каждое слово ищется подзапросами user_id IN (...) и room_id IN (...):
+        они идут по триграммным индексам users и rooms, а бронирования
+        выбираются по индексам (user, -created_at) и (room, -created_at).
+        """
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+
+            users = User.objects.filter(
+                Q(username__icontains=bit)
+                | Q(email__icontains=bit)
+                | Q(first_name__icontains=bit)
+                | Q(last_name__icontains=bit)
+            ).values('pk')
+            rooms = Room.objects.filter(room_number__icontains=bit).values('pk')
+
+            condition = Q(user__in=users) | Q(room__in=rooms)
+            # Длинная строка цифр переполнила бы bigint (DataError вместо пустого результата)
+            if bit.isascii() and bit.isdigit() and int(bit) <= MAX_BIGINT:
+                condition |= Q(pk=int(bit))
+            queryset = queryset.filter(condition)
+
+        return queryset, False
+
+    def save_model(self, request, obj, form, change):
+        """
+        Обновление индекса занятости и кэша поиска после правки бронирования в админке.
+        """
+        super().save_model(request, obj, form, change)
+
+        room_ids = [obj.room_id]
+        if change and 'room' in form.changed_data:
+            room_ids.append(form.initial.get('room'))
+        BookingService._on_bookings_changed(*room_ids)
+
+    @admin.action(description='Отменить выбранные бронирования')
+    def cancel_selected(self, request, queryset):
+        """
+        Массовая отмена одним запросом через BookingService.
+        """
+        results = BookingService.cancel_bookings(queryset, cancelled_by=request.user)
+        cancelled = sum(1 for result in results.values() if result == 'cancelled')
+        skipped = len(results) - cancelled
+
+        message = f'Отменено бронирований: {cancelled}.'
+        if skipped:
+            message += f' Уже были отменены: {skipped}.'
+        self.message_user(request, message, messages.SUCCESS if cancelled else messages.WARNING)
+
     def get_room_link(self, obj):
         if obj.room:
             url = reverse('admin:rooms_room_change', args=[obj.room.pk])
@@ -127,3 +296,59 @@ class BookingAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(BookingHold)
+class BookingHoldAdmin(admin.ModelAdmin):
+    list_display = ['id', 'room', 'user', 'check_in', 'check_out', 'expires_at', 'created_at']
+    list_select_related = ['room', 'user']
+    search_fields = ['user__username', 'room__room_number']
+    readonly_fields = ['created_at']
+    raw_id_fields = ['room', 'user']
+    ordering = ['expires_at']
+
+    def has_add_permission(self, request):
+        # Резервы создаются только через API оформления бронирования
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class OutboxStateFilter(admin.SimpleListFilter):
+    """
+    Состояние события: в очереди, обработано или мертвое (исчерпаны попытки).
+    """
+    title = 'Состояние'
+    parameter_name = 'state'
+
+    def lookups(self, request, model_admin):
+        return [
+            ('pending', 'В очереди'),
+            ('processed', 'Обработано'),
+            ('dead', 'Исчерпаны попытки'),
+        ]
+
+    def queryset(self, request, queryset):
+        max_attempts = settings.BOOKING_OUTBOX['MAX_ATTEMPTS']
+        if self.value() == 'pending':
+            return queryset.filter(processed_at__isnull=True, attempts__lt=max_attempts)
+        if self.value() == 'processed':
+            return queryset.filter(processed_at__isnull=False)
+        if self.value() == 'dead':
+            return queryset.filter(processed_at__isnull=True, attempts__gte=max_attempts)
+        return queryset
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'created_at', 'processed_at', 'attempts']
+    list_filter = [OutboxStateFilter, 'event_type']
+    readonly_fields = [
+        'event_type', 'payload', 'created_at', 'processed_at', 'attempts', 'last_error', 'completed_handlers'
+    ]
+    ordering = ['-id']
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,119 @@
+"""
+Кэш результатов поиска свободных комнат.
+
+Ключ записи включает период, фильтры и текущую эпоху бронирований. Любое
+изменение бронирований (или комнат) увеличивает эпоху, после чего старые
+записи больше не читаются и просто истекают по TIMEOUT.
+
+Хранилище - алиас 'availability' из CACHES: FileBasedCache в /dev/shm (по
+умолчанию, общий для воркеров на хосте), RedisCache (общий для всех хостов) или
+LocMemCache (только для одного процесса - проверка bookings.W001 предупреждает
+об этом). DatabaseCache тоже общий, но на каждый поиск тратит больше запросов,
+чем экономит.
+"""
+import hashlib
+import json
+import time
+from datetime import date
+from typing import Callable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class AvailabilityCache:
+    """
+    Версионированный кэш id свободных комнат по периоду и фильтрам.
+    """
+    PREFIX = 'availability'
+
+    def __init__(self, alias: str = 'availability'):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def epoch(self) -> int:
+        """
+        Текущая эпоха бронирований.
+
+        Если ключ эпохи потерян (вытеснен или кэш очищен), начинаем с текущего
+        времени в наносекундах, чтобы не совпасть ни с одной прошлой эпохой.
+        """
+        key = f'{self.PREFIX}:epoch'
+        epoch = self.cache.get(key)
+        if epoch is None:
+            self.cache.add(key, time.time_ns(), timeout=None)
+            epoch = self.cache.get(key)
+        return epoch
+
+    def bump(self) -> None:
+        """
+        Инвалидация всех записей: переход на следующую эпоху.
+        """
+        key = f'{self.PREFIX}:epoch'
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns(), timeout=None)
+
+    def get_room_ids(
+        self,
+        check_in: date,
+        check_out: date,
+        filters: Optional[dict],
+        compute: Callable[[], List[int]]
+    ) -> List[int]:
+        """
+        id свободных комнат из кэша или из compute() при промахе.
+        """
+        key = self._key(check_in, check_out, filters)
+
+        room_ids = self.cache.get(key)
+        if room_ids is not None:
+            self._count('hits')
+            return room_ids
+
+        self._count('misses')
+        room_ids = compute()
+        self.cache.set(key, room_ids)
+        return room_ids
+
+    def stats(self) -> dict:
+        """
+        Счетчики попаданий и промахов (при AVAILABILITY_CACHE_STATS).
+
+        Для LocMemCache счетчики свои у каждого процесса.
+        """
+        counters = self.cache.get_many([f'{self.PREFIX}:stats:hits', f'{self.PREFIX}:stats:misses'])
+        hits = counters.get(f'{self.PREFIX}:stats:hits', 0)
+        misses = counters.get(f'{self.PREFIX}:stats:misses', 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else 0.0,
+        }
+
+    def reset_stats(self) -> None:
+        self.cache.delete_many([f'{self.PREFIX}:stats:hits', f'{self.PREFIX}:stats:misses'])
+
+    def _key(self, check_in: date, check_out: date, filters: Optional[dict]) -> str:
+        filters_hash = hashlib.md5(
+            json.dumps(filters or {}, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f'{self.PREFIX}:{self.epoch()}:{check_in.isoformat()}:{check_out.isoformat()}:{filters_hash}'
+
+    def _count(self, name: str) -> None:
+        if not settings.AVAILABILITY_CACHE_STATS:
+            return
+        key = f'{self.PREFIX}:stats:{name}'
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            if not self.cache.add(key, 1, timeout=None):
+                self.cache.incr(key)
+
+
+availability_cache = AvailabilityCache()
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_version_caches(app_configs, **kwargs):
+    """
+    Эпоха AvailabilityCache и версия каталога комнат сбрасывают данные во всех
+    воркерах, только если кэш общий. В кэше процесса остальные воркеры продолжают
+    отдавать старые результаты поиска и каталог.
+    """
+    aliases = {'availability': 'AVAILABILITY_CACHE_BACKEND'}
+    if settings.ROOM_CATALOG['ENABLED']:
+        aliases.setdefault(settings.ROOM_CATALOG['CACHE'], 'ROOM_CATALOG_CACHE')
+
+    warnings = []
+    for alias, setting in aliases.items():
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend in PROCESS_LOCAL_BACKENDS:
+            warnings.append(Warning(
+                f"Кэш '{alias}' ({backend}) не общий для процессов: при нескольких воркерах "
+                f"изменения бронирований и комнат не будут видны остальным.",
+                hint=f'Укажите в {setting} FileBasedCache в /dev/shm или RedisCache.',
+                id='bookings.W001',
+            ))
+    return warnings
@@ -0,0 +1,36 @@
+from django.core.exceptions import ValidationError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class RoomUnavailableError(ValidationError):
+    """
+    Запись бронирования отклонена: даты комнаты заняты другим бронированием.
+
+    busy - занятые интервалы комнаты в окне поиска вариантов, уже прочитанные
+    для текста ошибки: suggest_alternatives подбирает по ним свободные даты
+    без повторного запроса.
+    """
+
+    def __init__(self, message, busy):
+        super().__init__(message)
+        self.busy = busy
+
+
+class BookingConflict(APIException):
+    """
+    Комната занята на запрошенные даты.
+
+    Ответ 400, как у обычной ошибки валидации, но вместе с вариантами
+    для повторной попытки: {<поле>: [сообщение], 'alternatives': {...}}.
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'booking_conflict'
+
+    def __init__(self, field: str, message: str, alternatives: dict):
+        super().__init__(message)
+        # detail задается напрямую, чтобы id, даты и цены не превращались в строки ErrorDetail
+        self.detail = {
+            field: [message],
+            'alternatives': alternatives,
+        }
@@ -0,0 +1,122 @@
+"""
+Поддержка заголовка Idempotency-Key для изменяющих запросов.
+
+Первый запрос с ключом вставляет запись IdempotencyKey, выполняется и сохраняет
+успешный ответ - все в одной транзакции с изменениями самого запроса. Поэтому
+запись без ответа никогда не фиксируется: если процесс упадет, откатятся и
+ключ, и бронирование, и повтор выполнится заново.
+
+Повтор с тем же ключом и тем же телом возвращает сохраненный ответ одним
+запросом к БД, не вызывая сериализатор и BookingService. Параллельный дубль
+ждет на уникальном индексе (user, key), пока первый запрос не завершится,
+и затем получает его ответ.
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class IdempotencyMixin:
+    """
+    Миксин для APIView: оборачивает обработчик в проверку Idempotency-Key.
+
+    - повтор с тем же ключом и телом - сохраненный ответ и заголовок Idempotent-Replayed
+    - тот же ключ с другим телом - 422
+    - параллельный запрос с тем же ключом ждет первый и получает его ответ
+    - ответы с ошибкой не сохраняются (транзакция откатывается), ключ свободен для повтора
+    """
+
+    def idempotent(self, request, handler):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return handler()
+
+        if len(key) > 255:
+            return Response(
+                {'error': f'Заголовок {IDEMPOTENCY_HEADER} не должен быть длиннее 255 символов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        request_hash = self._request_hash(request)
+
+        record = IdempotencyKey.objects.filter(
+            user=request.user, key=key, expires_at__gt=timezone.now()
+        ).first()
+        if record is None:
+            try:
+                return self._execute(request, key, request_hash, handler)
+            except IntegrityError:
+                # Параллельный запрос с тем же ключом зафиксировал ответ первым
+                record = IdempotencyKey.objects.filter(user=request.user, key=key).first()
+                if record is None:
+                    raise
+
+        return self._replay(request, key, record, request_hash)
+
+    @staticmethod
+    def _execute(request, key, request_hash, handler):
+        """
+        Запись ключа, обработчик и сохранение ответа в одной транзакции.
+
+        Вставка ключа блокирует строку уникального индекса до конца транзакции:
+        дубль с тем же ключом ждет и после фиксации получает IntegrityError.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Истекший, но еще не удаленный ключ можно занять заново
+            IdempotencyKey.objects.filter(user=request.user, key=key, expires_at__lte=now).delete()
+            record = IdempotencyKey.objects.create(
+                user=request.user,
+                key=key,
+                request_hash=request_hash,
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+            )
+
+            response = handler()
+
+            if status.is_success(response.status_code):
+                record.response_status = response.status_code
+                record.response_body = response.data
+                record.save(update_fields=['response_status', 'response_body'])
+            else:
+                transaction.set_rollback(True)
+
+        return response
+
+    @staticmethod
+    def _replay(request, key, record, request_hash):
+        if record.request_hash != request_hash:
+            logger.warning(f'Idempotency key reused with different payload: {key}, User: {request.user.username}')
+            return Response(
+                {'error': f'Ключ {IDEMPOTENCY_HEADER} уже использован для другого запроса.'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+
+        logger.info(f'Idempotent replay: key {key}, User: {request.user.username}')
+        return Response(
+            record.response_body,
+            status=record.response_status,
+            headers={'Idempotent-Replayed': 'true'}
+        )
+
+    @staticmethod
+    def _request_hash(request) -> str:
+        payload = json.dumps(
+            {'method': request.method, 'path': request.path, 'body': request.data},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.bookings.cache import availability_cache
+
+
+class Command(BaseCommand):
+    help = 'Статистика попаданий кэша поиска свободных комнат'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Сбросить счетчики после вывода'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.AVAILABILITY_CACHE_STATS:
+            self.stdout.write(self.style.WARNING('Счетчики выключены: включите AVAILABILITY_CACHE_STATS=True.'))
+
+        stats = availability_cache.stats()
+        self.stdout.write(
+            f"Попадания: {stats['hits']}, промахи: {stats['misses']}, hit rate: {stats['hit_rate']:.2%}"
+        )
+
+        if options['reset']:
+            availability_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Счетчики сброшены.'))
@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from apps.bookings.models import Booking
+from apps.bookings.serializers import BookingListSerializer
+from apps.core.fast import CompiledSerializer
+from apps.rooms.models import Room
+from apps.rooms.serializers import RoomSerializer
+
+
+class Command(BaseCommand):
+    help = 'Сравнение сериализации списков: DRF и values() (FastListMixin)'
+
+    TARGETS = {
+        'bookings': (BookingListSerializer, lambda: Booking.objects.select_related('room').order_by('-created_at', 'pk')),
+        'rooms': (RoomSerializer, lambda: Room.objects.order_by('room_number')),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            choices=sorted(self.TARGETS),
+            default='bookings',
+            help='Какой список сериализовать'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help='Количество строк (по умолчанию 1000)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Количество повторов, берется лучшее время (по умолчанию 5)'
+        )
+
+    def handle(self, *args, **options):
+        serializer_class, get_queryset = self.TARGETS[options['target']]
+        limit = options['limit']
+        request = Request(RequestFactory().get('/'))
+        context = {'request': request}
+
+        def drf():
+            queryset = get_queryset()[:limit]
+            return JSONRenderer().render(serializer_class(queryset, many=True, context=context).data)
+
+        compiled = CompiledSerializer.compile(serializer_class(context=context))
+        if compiled is None:
+            raise CommandError(f'{serializer_class.__name__} не сводится к values()')
+
+        def fast():
+            rows = compiled.values(get_queryset())[:limit]
+            return JSONRenderer().render(compiled.serialize(rows))
+
+        drf_time, drf_output = self.measure(drf, options['repeat'])
+        fast_time, fast_output = self.measure(fast, options['repeat'])
+
+        if drf_output != fast_output:
+            raise CommandError('Ответы DRF и values() различаются')
+
+        rows = drf_output.count(b'"id":')
+        self.stdout.write(f'Строк: {rows}, размер ответа: {len(drf_output)} байт')
+        self.stdout.write(f'DRF:      {drf_time * 1000:.1f} мс')
+        self.stdout.write(f'values(): {fast_time * 1000:.1f} мс')
+        if fast_time:
+            self.stdout.write(self.style.SUCCESS(f'Ускорение: {drf_time / fast_time:.1f}x, ответы совпадают.'))
+
+    @staticmethod
+    def measure(func, repeat):
+        best = None
+        output = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
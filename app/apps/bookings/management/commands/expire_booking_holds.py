@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.bookings.services import BookingService
+
+
+class Command(BaseCommand):
+    help = 'Удаление истекших резервов комнат'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько резервов удалять за один запрос'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, повторяя очистку каждые --interval секунд'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=30,
+            help='Пауза между проходами в режиме --loop, секунд'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            expired = BookingService.expire_holds(batch_size=options['batch_size'])
+            self.stdout.write(f'Удалено истекших резервов: {expired}')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.bookings.models import OutboxEvent
+from apps.bookings.outbox import dead_events, process_batch
+
+
+class Command(BaseCommand):
+    help = 'Обработка событий бронирований из outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько событий забирать за одну транзакцию'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, ожидая новые события'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Пауза при пустой очереди в режиме --loop, секунд'
+        )
+        parser.add_argument(
+            '--prune-days',
+            type=int,
+            default=None,
+            help='Удалить обработанные и мертвые события старше указанного числа дней'
+        )
+        parser.add_argument(
+            '--retry-dead',
+            action='store_true',
+            help='Вернуть в очередь события, исчерпавшие попытки (уже выполненные обработчики не повторяются)'
+        )
+
+    def handle(self, *args, **options):
+        if options['prune_days'] is not None:
+            threshold = timezone.now() - timedelta(days=options['prune_days'])
+            deleted, _ = OutboxEvent.objects.filter(processed_at__lt=threshold).delete()
+            self.stdout.write(f'Удалено обработанных событий: {deleted}')
+            deleted, _ = dead_events().filter(created_at__lt=threshold).delete()
+            self.stdout.write(f'Удалено мертвых событий: {deleted}')
+
+        if options['retry_dead']:
+            retried = dead_events().update(attempts=0, last_error='')
+            self.stdout.write(f'Возвращено в очередь мертвых событий: {retried}')
+
+        total = 0
+        while True:
+            processed = process_batch(batch_size=options['batch_size'])
+            total += processed
+
+            if processed:
+                continue
+            self.report_dead()
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Обработано событий: {total}'))
+
+    def report_dead(self):
+        dead = dead_events().count()
+        if dead and dead != getattr(self, 'reported_dead', None):
+            self.stderr.write(self.style.WARNING(
+                f'Событий с исчерпанными попытками: {dead}. Ошибки - в админке (события outbox), '
+                f'повтор - process_outbox --retry-dead.'
+            ))
+        self.reported_dead = dead
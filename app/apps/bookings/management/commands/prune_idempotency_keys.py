@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.bookings.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Удаление истекших ключей идемпотентности'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Сколько ключей удалять за один запрос'
+        )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        total = 0
+
+        while True:
+            ids = list(
+                IdempotencyKey.objects.filter(expires_at__lte=now)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not ids:
+                break
+            deleted, _ = IdempotencyKey.objects.filter(pk__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f'Удалено ключей: {total}'))
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.bookings.occupancy import occupancy_index
+
+
+class Command(BaseCommand):
+    help = 'Перестроение индекса занятости комнат из активных бронирований'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, перестраивая индекс каждые --interval секунд'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=None,
+            help='Пауза между перестроениями в режиме --loop, секунд '
+                 '(по умолчанию половина OCCUPANCY_INDEX_MAX_AGE)'
+        )
+
+    def handle(self, *args, **options):
+        if not occupancy_index.enabled:
+            self.stdout.write(self.style.WARNING('Индекс занятости отключен (OCCUPANCY_INDEX_ENABLED).'))
+            return
+
+        # Перестроение до истечения MAX_AGE: иначе поиск уходит в SQL до следующего запуска
+        interval = options['interval'] or max(settings.OCCUPANCY_INDEX['MAX_AGE'] // 2, 1)
+        while True:
+            occupancy_index.rebuild()
+            self.stdout.write(self.style.SUCCESS(f'Индекс занятости перестроен: {occupancy_index.path}'))
+
+            if not options['loop']:
+                break
+            time.sleep(interval)
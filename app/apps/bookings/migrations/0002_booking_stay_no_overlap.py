@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 07:01
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        # gist-индекс по room_id (скалярное равенство) требует btree_gist
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='booking',
+            name='stay',
+            field=models.GeneratedField(db_persist=True, expression=models.Func(models.F('check_in'), models.F('check_out'), function='daterange', output_field=django.contrib.postgres.fields.ranges.DateRangeField()), help_text='Полуоткрытый интервал [check_in, check_out) для проверки пересечений', output_field=django.contrib.postgres.fields.ranges.DateRangeField(), verbose_name='Период проживания'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status', 'active')), expressions=[('room', '='), ('stay', '&&')], name='booking_no_overlap', violation_error_message='Комната уже забронирована на эти даты.'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0 on 2026-10-17 07:11
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_idempotency_key'),
+        ('rooms', '0003_room_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('check_in', models.DateField(verbose_name='Дата заезда')),
+                ('check_out', models.DateField(verbose_name='Дата выезда')),
+                ('stay', models.GeneratedField(db_persist=True, expression=models.Func(models.F('check_in'), models.F('check_out'), function='daterange', output_field=django.contrib.postgres.fields.ranges.DateRangeField()), output_field=django.contrib.postgres.fields.ranges.DateRangeField(), verbose_name='Период проживания')),
+                ('expires_at', models.DateTimeField(help_text='После этого момента резерв не действует', verbose_name='Истекает')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='rooms.room', verbose_name='Комната')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_holds', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Резерв комнаты',
+                'verbose_name_plural': 'Резервы комнат',
+                'db_table': 'booking_holds',
+                'ordering': ['expires_at'],
+                'indexes': [models.Index(fields=['expires_at'], name='booking_hold_expires_idx')],
+                'constraints': [django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('room', '='), ('stay', '&&')], name='booking_hold_no_overlap', violation_error_message='Комната уже зарезервирована на эти даты.')],
+            },
+        ),
+    ]
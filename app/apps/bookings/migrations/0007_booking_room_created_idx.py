@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 07:27
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Индексы большой таблицы строятся без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ('bookings', '0006_outbox_event'),
+        ('rooms', '0004_room_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['room', '-created_at'], name='booking_room_created_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 08:22
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Поиск пересечений обслуживает GiST-индекс booking_no_overlap;
+    # индекс удаляется без блокировки записи
+    atomic = False
+
+    dependencies = [
+        ('bookings', '0007_booking_room_created_idx'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='booking',
+            name='booking_room_active_dates_idx',
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import BooleanField, ExpressionWrapper, F, Func, IntegerField, Q
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 from django.conf import settings
 from decimal import Decimal
@@ -50,6 +54,13 @@ class Booking(models.Model):
         verbose_name='Дата выезда',
         help_text='Дата окончания бронирования'
     )
+    stay = models.GeneratedField(
+        expression=Func(F('check_in'), F('check_out'), function='daterange', output_field=DateRangeField()),
+        output_field=DateRangeField(),
+        db_persist=True,
+        verbose_name='Период проживания',
+        help_text='Полуоткрытый интервал [check_in, check_out) для проверки пересечений'
+    )
 
     total_price = models.DecimalField(
         max_digits=10,
@@ -88,6 +99,27 @@ class Booking(models.Model):
         verbose_name = 'Бронирование'
         verbose_name_plural = 'Бронирования'
         ordering = ['-created_at']
+        indexes = [
+            # Список бронирований пользователя с сортировкой по -created_at
+            models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+            # Список всех бронирований для администраторов
+            models.Index(fields=['-created_at'], name='booking_created_idx'),
+            # Поиск в админке по комнате: room_id IN (...) для всех статусов
+            models.Index(fields=['room', '-created_at'], name='booking_room_created_idx'),
+        ]
+        constraints = [
+            # Пересечение активных бронирований одной комнаты отсекает сама БД;
+            # GiST-индекс ограничения обслуживает и поиск пересечений (stay && daterange)
+            ExclusionConstraint(
+                name='booking_no_overlap',
+                expressions=[
+                    ('room', RangeOperators.EQUAL),
+                    ('stay', RangeOperators.OVERLAPS),
+                ],
+                condition=Q(status='active'),
+                violation_error_message='Комната уже забронирована на эти даты.',
+            ),
+        ]
 
     def __str__(self):
         return f"Бронирование #{self.pk} - {self.room.room_number} ({self.user.username})"
@@ -118,6 +150,28 @@ class Booking(models.Model):
         today = date.today()
         return self.check_in <= today <= self.check_out
 
+    @classmethod
+    def sql_properties(cls):
+        """
+        SQL-выражения для свойств выше - для чтения списков через values()
+        без создания экземпляров модели.
+        """
+        today = date.today()
+
+        def flag(condition):
+            return ExpressionWrapper(condition, output_field=BooleanField())
+
+        return {
+            'nights_count': Func(
+                F('check_out'), F('check_in'),
+                template='(%(expressions)s)', arg_joiner=' - ', output_field=IntegerField()
+            ),
+            'is_active': flag(Q(status='active')),
+            'is_past': flag(Q(check_out__lt=today)),
+            'is_upcoming': flag(Q(check_in__gt=today)),
+            'is_current': flag(Q(check_in__lte=today, check_out__gte=today)),
+        }
+
     def clean(self):
         errors = {}
 
@@ -146,6 +200,202 @@ class Booking(models.Model):
         if errors:
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    def save(self, *args, validate=True, **kwargs):
+        # Пересечения проверяет ограничение booking_no_overlap при записи.
+        # BookingService передает validate=False: данные уже проверены сериализатором,
+        # а full_clean повторно запрашивает связанные объекты.
+        if validate:
+            self.full_clean(validate_constraints=False)
         super().save(*args, **kwargs)
+
+
+class BookingHold(models.Model):
+    """
+    Временный резерв комнаты на время оплаты.
+
+    Резерв блокирует даты комнаты для других пользователей до expires_at,
+    затем превращается в бронирование (BookingService.convert_hold) или
+    удаляется командой expire_booking_holds.
+    """
+
+    room = models.ForeignKey(
+        'rooms.Room',
+        on_delete=models.CASCADE,
+        related_name='holds',
+        verbose_name='Комната'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='booking_holds',
+        verbose_name='Пользователь'
+    )
+    check_in = models.DateField(verbose_name='Дата заезда')
+    check_out = models.DateField(verbose_name='Дата выезда')
+    stay = models.GeneratedField(
+        expression=Func(F('check_in'), F('check_out'), function='daterange', output_field=DateRangeField()),
+        output_field=DateRangeField(),
+        db_persist=True,
+        verbose_name='Период проживания'
+    )
+    expires_at = models.DateTimeField(
+        verbose_name='Истекает',
+        help_text='После этого момента резерв не действует'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+
+    class Meta:
+        db_table = 'booking_holds'
+        verbose_name = 'Резерв комнаты'
+        verbose_name_plural = 'Резервы комнат'
+        ordering = ['expires_at']
+        indexes = [
+            # Очистка истекших резервов пачками
+            models.Index(fields=['expires_at'], name='booking_hold_expires_idx'),
+        ]
+        constraints = [
+            # Два резерва одной комнаты не пересекаются; GiST-индекс ограничения
+            # используется и для проверки резервов при бронировании
+            ExclusionConstraint(
+                name='booking_hold_no_overlap',
+                expressions=[
+                    ('room', RangeOperators.EQUAL),
+                    ('stay', RangeOperators.OVERLAPS),
+                ],
+                violation_error_message='Комната уже зарезервирована на эти даты.',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Резерв #{self.pk} - комната {self.room_id} до {self.expires_at:%H:%M:%S}"
+
+    @property
+    def is_expired(self):
+        """Истек ли резерв."""
+        return self.expires_at <= timezone.now()
+
+
+class IdempotencyKey(models.Model):
+    """
+    Ключ идемпотентности запроса (заголовок Idempotency-Key).
+
+    Хранит хэш запроса и сохраненный ответ, чтобы повтор того же
+    запроса вернул прежний результат без повторного выполнения.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name='Пользователь'
+    )
+    key = models.CharField(
+        max_length=255,
+        verbose_name='Ключ',
+        help_text='Значение заголовка Idempotency-Key'
+    )
+    request_hash = models.CharField(
+        max_length=64,
+        verbose_name='Хэш запроса',
+        help_text='SHA-256 метода, пути и тела запроса'
+    )
+    response_status = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        verbose_name='Код ответа',
+        help_text='Пусто только внутри транзакции запроса: ключ фиксируется вместе с ответом'
+    )
+    response_body = models.JSONField(
+        null=True,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Тело ответа'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Истекает',
+        help_text='После этого момента ключ удаляется командой prune_idempotency_keys'
+    )
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Ключ идемпотентности'
+        verbose_name_plural = 'Ключи идемпотентности'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
+
+
+class OutboxEvent(models.Model):
+    """
+    Событие бронирования для внешних обработчиков (transactional outbox).
+
+    Пишется в той же транзакции, что и изменение бронирования, и
+    обрабатывается позже командой process_outbox.
+    """
+
+    EVENT_CHOICES = [
+        ('booking.created', 'Бронирование создано'),
+        ('booking.updated', 'Даты бронирования изменены'),
+        ('booking.cancelled', 'Бронирование отменено'),
+    ]
+
+    event_type = models.CharField(
+        max_length=50,
+        choices=EVENT_CHOICES,
+        verbose_name='Тип события'
+    )
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        verbose_name='Данные события'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Дата обработки'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Неудачных попыток'
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка'
+    )
+    completed_handlers = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Выполненные обработчики',
+        help_text='Обработчики, уже успешно обработавшие событие: при повторе они пропускаются'
+    )
+
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Событие outbox'
+        verbose_name_plural = 'События outbox'
+        ordering = ['id']
+        indexes = [
+            # Выборка необработанных событий воркером: маленький индекс только по очереди
+            models.Index(
+                fields=['id'],
+                condition=Q(processed_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.pk}"
@@ -0,0 +1,297 @@
+"""
+Индекс занятости комнат: один бит на комнату на каждую ночь.
+
+Индекс хранится в файле, который отображается в память (mmap), поэтому все
+воркеры на хосте читают одну и ту же копию. Файл разбит на строки по ночам:
+строка ночи - битовая маска комнат (бит N - комната с pk=N). Занятые комнаты
+на период - побитовое ИЛИ строк этого периода.
+
+Файл помнит версию бронирований, с которой он совпадает. Версия общая для
+всех воркеров и хостов (кэш OCCUPANCY_INDEX['CACHE']) и увеличивается при
+каждом изменении бронирований еще до коммита. Изменение, обработанное этим
+хостом, переносится в файл вместе с новой версией; изменение, которого файл
+не видел (другой хост, запись в обход сервиса), оставляет версии разными до
+следующего перестроения.
+
+Если индекс отключен, не построен, устарел, отстал от версии бронирований или
+период выходит за его горизонт, методы возвращают None, и вызывающий код
+использует обычный SQL-запрос.
+"""
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional, Set
+
+from django.conf import settings
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'OCCIDX02'
+# magic, первая ночь (ordinal), горизонт в днях, емкость по комнатам, время построения,
+# версия бронирований, флаг устаревания
+HEADER = struct.Struct('<8sIIIdqB')
+HEADER_SIZE = 64
+STALE_OFFSET = HEADER.size - 1
+
+
+class OccupancyIndex:
+    """
+    Битовая карта занятости комнат, общая для всех процессов на хосте.
+    """
+    PREFIX = 'occupancy'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mm = None
+        self._inode = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.OCCUPANCY_INDEX['ENABLED']
+
+    @property
+    def cache(self):
+        return caches[settings.OCCUPANCY_INDEX['CACHE']]
+
+    def version(self) -> int:
+        """
+        Общая версия бронирований (как эпоха в AvailabilityCache).
+        """
+        key = f'{self.PREFIX}:version'
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, time.time_ns(), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self) -> Optional[int]:
+        """
+        Новая версия бронирований: до refresh_rooms() индекс не используется.
+
+        Returns:
+            Новая версия или None, если индекс отключен
+        """
+        if not self.enabled:
+            return None
+
+        key = f'{self.PREFIX}:version'
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # Ключ потерян: новая версия не совпадет ни с одним файлом
+            version = time.time_ns()
+            self.cache.set(key, version, timeout=None)
+            return version
+
+    @property
+    def path(self) -> Path:
+        # Отдельный файл на каждую БД, чтобы тестовая база не читала боевой индекс
+        name = connection.settings_dict['NAME']
+        return Path(settings.OCCUPANCY_INDEX['DIR']) / f'occupancy-{name}.idx'
+
+    def occupied_room_ids(self, check_in: date, check_out: date) -> Optional[Set[int]]:
+        """
+        Множество id комнат, занятых хотя бы одну ночь в периоде [check_in, check_out).
+
+        Returns:
+            None, если индекс не может ответить и нужен SQL-запрос
+        """
+        if not self.enabled:
+            return None
+
+        mm = self._reader()
+        if mm is None:
+            return None
+
+        magic, base, horizon, capacity, built_at, version, stale = HEADER.unpack_from(mm)
+        if magic != MAGIC or stale:
+            return None
+        if time.time() - built_at > settings.OCCUPANCY_INDEX['MAX_AGE']:
+            return None
+        if version != self.version():
+            return None
+
+        start = check_in.toordinal() - base
+        end = check_out.toordinal() - base
+        if start < 0 or end > horizon:
+            return None
+
+        stride = capacity // 8
+        occupied = 0
+        for night in range(start, end):
+            offset = HEADER_SIZE + night * stride
+            occupied |= int.from_bytes(mm[offset:offset + stride], 'little')
+
+        room_ids = set()
+        while occupied:
+            lowest = occupied & -occupied
+            room_ids.add(lowest.bit_length() - 1)
+            occupied ^= lowest
+
+        return room_ids
+
+    def rebuild(self) -> None:
+        """
+        Полное перестроение индекса из активных бронирований.
+
+        Новый файл пишется рядом и атомарно подменяет старый, читатели
+        переоткрывают его при следующем запросе. Индекс старше MAX_AGE не
+        используется, поэтому перестроение нужно запускать периодически
+        (rebuild_occupancy_index --loop).
+        """
+        from apps.rooms.models import Room
+        from .models import Booking
+
+        horizon = settings.OCCUPANCY_INDEX['HORIZON_DAYS']
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+
+        # Блокировка на все время чтения и подмены: refresh_rooms, пришедший
+        # после чтения бронирований, применится уже к новому файлу, а не
+        # будет перезаписан устаревшими данными
+        with self._file_lock():
+            # Версия читается до бронирований: изменение между ними увеличит
+            # ее еще раз, и файл не будет принят до его refresh_rooms
+            version = self.version()
+            max_room_id = Room.objects.aggregate(max_id=Max('pk'))['max_id'] or 0
+            # Запас под новые комнаты, емкость кратна 64 битам
+            capacity = (max_room_id // 64 + 2) * 64
+            stride = capacity // 8
+            base = timezone.localdate()
+
+            buffer = bytearray(HEADER_SIZE + horizon * stride)
+            bookings = Booking.objects.filter(
+                status='active',
+                stay__overlap=DateRange(base, base + timedelta(days=horizon)),
+            ).values_list('room_id', 'check_in', 'check_out')
+
+            for room_id, check_in, check_out in bookings.iterator(chunk_size=5000):
+                self._set_nights(buffer, stride, base.toordinal(), horizon, room_id, check_in, check_out)
+
+            HEADER.pack_into(buffer, 0, MAGIC, base.toordinal(), horizon, capacity, time.time(), version, 0)
+
+            with open(tmp_path, 'wb') as f:
+                f.write(buffer)
+            os.replace(tmp_path, path)
+
+        logger.info(f'Occupancy index rebuilt: {path}, rooms capacity {capacity}, horizon {horizon} days')
+
+    def refresh_rooms(self, room_ids: Set[int], version: Optional[int]) -> None:
+        """
+        Пересчет строк комнат по данным из БД.
+
+        Вызывается после коммита транзакции, изменившей бронирования комнат;
+        version - результат bump() внутри этой транзакции. Файл принимает ее,
+        только если совпадал с предыдущей версией, то есть других изменений
+        с тех пор не было.
+        """
+        if not self.enabled or version is None or not room_ids:
+            return
+
+        from .models import Booking
+
+        try:
+            with self._file_lock(), open(self.path, 'r+b') as f, mmap.mmap(f.fileno(), 0) as mm:
+                magic, base, horizon, capacity, built_at, file_version, stale = HEADER.unpack_from(mm)
+                if magic != MAGIC or stale:
+                    return
+
+                if max(room_ids) >= capacity:
+                    # Комната создана после построения индекса и не помещается в строку
+                    mm[STALE_OFFSET] = 1
+                    logger.warning(f'Occupancy index marked stale: room {max(room_ids)} exceeds capacity {capacity}')
+                    return
+
+                stride = capacity // 8
+                for room_id in room_ids:
+                    byte, mask = room_id // 8, 1 << (room_id % 8)
+                    for night in range(horizon):
+                        offset = HEADER_SIZE + night * stride + byte
+                        mm[offset] &= ~mask & 0xFF
+
+                bookings = Booking.objects.filter(
+                    room_id__in=room_ids,
+                    status='active',
+                    stay__overlap=DateRange(date.fromordinal(base), date.fromordinal(base + horizon)),
+                ).values_list('room_id', 'check_in', 'check_out')
+
+                for room_id, check_in, check_out in bookings:
+                    self._set_nights(mm, stride, base, horizon, room_id, check_in, check_out)
+
+                if file_version == version - 1:
+                    HEADER.pack_into(mm, 0, magic, base, horizon, capacity, built_at, version, stale)
+                else:
+                    logger.info(f'Occupancy index behind bookings version {version}, waiting for rebuild')
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error(f'Occupancy index refresh failed for rooms {sorted(room_ids)}: {str(e)}')
+            self.mark_stale()
+
+    def mark_stale(self) -> None:
+        """
+        Пометить индекс устаревшим: до перестроения поиск идет через SQL.
+        """
+        try:
+            with self._file_lock(), open(self.path, 'r+b') as f:
+                f.seek(STALE_OFFSET)
+                f.write(b'\x01')
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _set_nights(buffer, stride, base, horizon, room_id, check_in, check_out):
+        start = max(check_in.toordinal() - base, 0)
+        end = min(check_out.toordinal() - base, horizon)
+        byte, mask = room_id // 8, 1 << (room_id % 8)
+        for night in range(start, end):
+            buffer[HEADER_SIZE + night * stride + byte] |= mask
+
+    def _reader(self):
+        """
+        mmap текущего файла индекса только для чтения.
+
+        Файл переоткрывается, если rebuild() подменил его новым.
+        """
+        path = self.path
+        try:
+            # Путь входит в ключ: номер inode удаленного файла может достаться другому
+            inode = (str(path), os.stat(path).st_ino)
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            if self._mm is None or self._inode != inode:
+                if self._mm is not None:
+                    self._mm.close()
+                with open(path, 'rb') as f:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._inode = inode
+            return self._mm
+
+    @contextmanager
+    def _file_lock(self):
+        lock_path = self.path.with_suffix('.lock')
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+occupancy_index = OccupancyIndex()
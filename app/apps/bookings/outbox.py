@@ -0,0 +1,135 @@
+"""
+Transactional outbox для событий бронирований.
+
+BookingService записывает события в таблицу outbox_events в той же
+транзакции, что и само изменение: событие появляется тогда и только тогда,
+когда изменение закоммичено. Команда process_outbox забирает события пачками
+(SELECT ... FOR UPDATE SKIP LOCKED, поэтому воркеров может быть несколько)
+и передает их обработчикам из BOOKING_OUTBOX['HANDLERS'].
+
+Обработчик - функция handler(event: OutboxEvent). Доставка - "хотя бы один
+раз": обработчик, успешно выполненный для события, записывается в
+completed_handlers и при повторе пропускается, но падение воркера до фиксации
+пачки повторит и его. Поэтому обработчики должны быть идемпотентными
+(например, по event.pk).
+
+Исключение в обработчике оставляет событие в очереди; после MAX_ATTEMPTS
+неудачных попыток событие "мертвое": воркер его больше не берет, а
+process_outbox сообщает о таких событиях (повтор - --retry-dead).
+"""
+import logging
+from functools import lru_cache
+from typing import Callable, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def emit(event_type: str, payload: dict) -> OutboxEvent:
+    """
+    Запись события в outbox в текущей транзакции.
+    """
+    return OutboxEvent.objects.create(event_type=event_type, payload=payload)
+
+
+def emit_many(event_type: str, payloads: Iterable[dict]) -> List[OutboxEvent]:
+    """
+    Запись нескольких событий одного типа одним INSERT.
+    """
+    return OutboxEvent.objects.bulk_create(
+        [OutboxEvent(event_type=event_type, payload=payload) for payload in payloads]
+    )
+
+
+def get_handlers() -> List[Tuple[str, Callable[[OutboxEvent], None]]]:
+    """
+    Пары (путь, обработчик): путь записывается в completed_handlers.
+    """
+    return _import_handlers(tuple(settings.BOOKING_OUTBOX['HANDLERS']))
+
+
+@lru_cache(maxsize=None)
+def _import_handlers(paths: Tuple[str, ...]) -> List[Tuple[str, Callable[[OutboxEvent], None]]]:
+    return [(path, import_string(path)) for path in paths]
+
+
+def dead_events():
+    """
+    Необработанные события, исчерпавшие MAX_ATTEMPTS попыток.
+    """
+    return OutboxEvent.objects.filter(
+        processed_at__isnull=True,
+        attempts__gte=settings.BOOKING_OUTBOX['MAX_ATTEMPTS'],
+    )
+
+
+def process_batch(batch_size: int = 100) -> int:
+    """
+    Обработка одной пачки событий.
+
+    Строки блокируются до конца транзакции, параллельные воркеры пропускают
+    их (SKIP LOCKED) и берут следующие.
+
+    Returns:
+        Количество выбранных событий
+    """
+    handlers = get_handlers()
+    max_attempts = settings.BOOKING_OUTBOX['MAX_ATTEMPTS']
+
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True,
+                attempts__lt=max_attempts,
+            ).order_by('id')[:batch_size]
+        )
+
+        for event in events:
+            errors = []
+            for path, handler in handlers:
+                if path in event.completed_handlers:
+                    continue
+                try:
+                    # Ошибка БД в обработчике не должна ломать транзакцию всей пачки
+                    with transaction.atomic():
+                        handler(event)
+                except Exception as e:
+                    errors.append(f'{path}: {str(e)}')
+                else:
+                    event.completed_handlers.append(path)
+
+            if not errors:
+                event.processed_at = timezone.now()
+                continue
+
+            event.attempts += 1
+            event.last_error = '\n'.join(errors)
+            logger.error(f'Outbox event {event.pk} ({event.event_type}) failed, attempt {event.attempts}: {event.last_error}')
+            if event.attempts >= max_attempts:
+                logger.error(f'Outbox event {event.pk} ({event.event_type}) gave up after {event.attempts} attempts')
+
+        OutboxEvent.objects.bulk_update(events, ['processed_at', 'attempts', 'last_error', 'completed_handlers'])
+
+    return len(events)
+
+
+def log_event(event: OutboxEvent) -> None:
+    """
+    Обработчик по умолчанию: запись события в лог бронирований.
+    """
+    payload = event.payload
+
+    if event.event_type == 'booking.created':
+        logger.info(f"Booking created: ID {payload['booking_id']}, Room {payload['room_number']}, User: {payload['username']}, Dates: {payload['check_in']} to {payload['check_out']}, Price: {payload['total_price']}")
+    elif event.event_type == 'booking.updated':
+        logger.info(f"Booking updated: ID {payload['booking_id']}, Room {payload['room_number']}, Old dates: {payload['old_check_in']} to {payload['old_check_out']}, New dates: {payload['check_in']} to {payload['check_out']}, Price: {payload['old_total_price']} -> {payload['total_price']}")
+    elif event.event_type == 'booking.cancelled':
+        logger.info(f"Booking cancelled: ID {payload['booking_id']}, Room ID {payload['room_id']}, Cancelled by: {payload['cancelled_by']}")
+    else:
+        logger.info(f'Outbox event {event.event_type}: {payload}')
@@ -17,4 +17,4 @@ class IsOwnerOrAdmin(permissions.BasePermission):
         if request.user.is_staff or request.user.is_superuser:
             return True
 
-        return obj.user == request.user
+        return obj.user_id == request.user.pk
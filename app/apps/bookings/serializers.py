@@ -1,18 +1,32 @@
 from rest_framework import serializers
+from django.core.exceptions import ValidationError as DjangoValidationError
 from datetime import date
 from decimal import Decimal
 
-from .models import Booking
+from .models import Booking, BookingHold
 from .services import BookingService
-from apps.rooms.models import Room
-from apps.rooms.serializers import RoomSerializer
+from .exceptions import BookingConflict
+from apps.rooms.catalog import room_catalog
+from apps.rooms.serializers import CatalogRoomField, RoomSerializer
 from apps.users.serializers import UserSerializer
+from apps.core.sparse import SparseFieldsetMixin
 
 
-class BookingSerializer(serializers.ModelSerializer):
+class BookingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для информации о бронировании.
+    Поддерживает ?fields= и ?expand=room,user,cancelled_by.
     """
+    sql_fields = Booking.sql_properties
+    expandable_fields = ('room', 'user', 'cancelled_by')
+    field_dependencies = {
+        'nights_count': ['check_in', 'check_out'],
+        'is_active': ['status'],
+        'is_past': ['check_out'],
+        'is_upcoming': ['check_in'],
+        'is_current': ['check_in', 'check_out'],
+    }
+
     room = RoomSerializer(read_only=True)
     user = UserSerializer(read_only=True)
     cancelled_by = UserSerializer(read_only=True)
@@ -50,10 +64,16 @@ class BookingSerializer(serializers.ModelSerializer):
         ]
 
 
-class BookingListSerializer(serializers.ModelSerializer):
+class BookingListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Облегченный сериализатор для списка бронирований.
+    Поддерживает ?fields=.
     """
+    sql_fields = Booking.sql_properties
+    field_dependencies = {
+        'nights_count': ['check_in', 'check_out'],
+    }
+
     room_number = serializers.CharField(source='room.room_number', read_only=True)
     room_price = serializers.DecimalField(
         source='room.price_per_night',
@@ -79,15 +99,45 @@ class BookingListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'total_price', 'status', 'created_at']
 
 
+class BookingAlternativesSerializer(serializers.Serializer):
+    """
+    Варианты при конфликте бронирования: свободные даты той же комнаты
+    и похожие комнаты на запрошенные даты.
+    """
+    same_room = serializers.SerializerMethodField()
+    similar_rooms = RoomSerializer(many=True, read_only=True)
+
+    def get_same_room(self, obj):
+        return [
+            {'check_in': check_in.isoformat(), 'check_out': check_out.isoformat()}
+            for check_in, check_out in obj['same_room']
+        ]
+
+
+def raise_booking_conflict(error, field, room, check_in, check_out, exclude_booking_id=None):
+    """
+    Перевод ошибки BookingService в ответ API.
+
+    Конфликт дат по полю field дополняется вариантами для повторной попытки,
+    остальные ошибки возвращаются как обычная ошибка валидации.
+    """
+    messages = error.message_dict if hasattr(error, 'error_dict') else {}
+    if field not in messages:
+        raise serializers.ValidationError(serializers.as_serializer_error(error))
+
+    # Интервалы комнаты, прочитанные для текста ошибки, не запрашиваются повторно
+    alternatives = BookingService.suggest_alternatives(
+        room, check_in, check_out, exclude_booking_id=exclude_booking_id, busy=getattr(error, 'busy', None)
+    )
+    raise BookingConflict(field, messages[field][0], BookingAlternativesSerializer(alternatives).data)
+
+
 class BookingCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор для создания бронирования.
-    Валидирует даты и проверяет доступность комнаты.
+    Валидирует даты, доступность комнаты проверяет BookingService при записи.
     """
-    room = serializers.PrimaryKeyRelatedField(
-        queryset=Room.objects.filter(is_active=True),
-        help_text='ID комнаты для бронирования'
-    )
+    room = CatalogRoomField(help_text='ID комнаты для бронирования')
 
     class Meta:
         model = Booking
@@ -105,11 +155,10 @@ class BookingCreateSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         """
-        Комплексная валидация дат и доступности.
+        Комплексная валидация дат.
         """
         check_in = attrs.get('check_in')
         check_out = attrs.get('check_out')
-        room = attrs.get('room')
 
         # Проверка что check_out > check_in
         if check_out <= check_in:
@@ -124,16 +173,6 @@ class BookingCreateSerializer(serializers.ModelSerializer):
                 'check_out': 'Максимальный период бронирования - 365 дней.'
             })
 
-        # Проверка доступности комнаты
-        is_available, error_msg = BookingService.check_room_availability(
-            room, check_in, check_out
-        )
-
-        if not is_available:
-            raise serializers.ValidationError({
-                'room': error_msg
-            })
-
         return attrs
 
     def create(self, validated_data):
@@ -146,12 +185,15 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         check_out = validated_data['check_out']
 
         # Используем сервис для создания
-        booking = BookingService.create_booking(
-            user=user,
-            room=room,
-            check_in=check_in,
-            check_out=check_out
-        )
+        try:
+            booking = BookingService.create_booking(
+                user=user,
+                room=room,
+                check_in=check_in,
+                check_out=check_out
+            )
+        except DjangoValidationError as e:
+            raise_booking_conflict(e, 'room', room, check_in, check_out)
 
         return booking
 
@@ -178,7 +220,7 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         """
-        Валидация новых дат и проверка доступности.
+        Валидация новых дат.
         """
         # Получаем текущий объект
         instance = self.instance
@@ -206,16 +248,6 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
                 'check_out': 'Максимальный период бронирования - 365 дней.'
             })
 
-        # Проверка доступности (исключая текущее бронирование)
-        is_available, error_msg = BookingService.check_room_availability(
-            instance.room, check_in, check_out, exclude_booking_id=instance.id
-        )
-
-        if not is_available:
-            raise serializers.ValidationError({
-                'dates': error_msg
-            })
-
         return attrs
 
     def update(self, instance, validated_data):
@@ -225,11 +257,223 @@ class BookingUpdateSerializer(serializers.ModelSerializer):
         check_in = validated_data.get('check_in', instance.check_in)
         check_out = validated_data.get('check_out', instance.check_out)
 
-        # Используем сервис для обновления (с транзакцией)
-        booking = BookingService.update_booking_dates(
-            booking=instance,
-            check_in=check_in,
-            check_out=check_out
-        )
+        # Используем сервис для обновления, пересечение проверяется при записи
+        try:
+            booking = BookingService.update_booking_dates(
+                booking=instance,
+                check_in=check_in,
+                check_out=check_out
+            )
+        except DjangoValidationError as e:
+            raise_booking_conflict(e, 'dates', instance.room, check_in, check_out, exclude_booking_id=instance.id)
 
         return booking
+
+
+class BookingGroupCreateSerializer(serializers.Serializer):
+    """
+    Сериализатор группового бронирования: несколько комнат на одни даты.
+    """
+    MAX_ROOMS = 40
+
+    rooms = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=MAX_ROOMS,
+        help_text='Список ID комнат для бронирования'
+    )
+    check_in = serializers.DateField(help_text='Дата заезда в формате YYYY-MM-DD')
+    check_out = serializers.DateField(help_text='Дата выезда в формате YYYY-MM-DD')
+
+    def validate_check_in(self, value):
+        """
+        Проверка что дата заезда не в прошлом.
+        """
+        if value < date.today():
+            raise serializers.ValidationError(
+                "Дата заезда не может быть в прошлом."
+            )
+        return value
+
+    def validate(self, attrs):
+        """
+        Валидация дат и комнаты из каталога в памяти (apps.rooms.catalog).
+        """
+        check_in = attrs.get('check_in')
+        check_out = attrs.get('check_out')
+
+        if check_out <= check_in:
+            raise serializers.ValidationError({
+                'check_out': 'Дата выезда должна быть позже даты заезда.'
+            })
+
+        if (check_out - check_in).days > 365:
+            raise serializers.ValidationError({
+                'check_out': 'Максимальный период бронирования - 365 дней.'
+            })
+
+        room_ids = attrs['rooms']
+        if len(set(room_ids)) != len(room_ids):
+            raise serializers.ValidationError({
+                'rooms': 'Комнаты в списке не должны повторяться.'
+            })
+
+        rooms = room_catalog.get_many(room_ids)
+        missing = sorted(set(room_ids) - {room.pk for room in rooms})
+        if missing:
+            raise serializers.ValidationError({
+                'rooms': f'Комнаты не найдены или недоступны для бронирования: {missing}'
+            })
+
+        attrs['rooms'] = rooms
+        return attrs
+
+    def create(self, validated_data):
+        """
+        Создание группы бронирований через сервисный слой.
+        """
+        try:
+            return BookingService.create_group_booking(
+                user=self.context['request'].user,
+                rooms=validated_data['rooms'],
+                check_in=validated_data['check_in'],
+                check_out=validated_data['check_out']
+            )
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(serializers.as_serializer_error(e))
+
+
+class BookingGroupResultSerializer(serializers.Serializer):
+    """
+    Ответ группового бронирования: созданные бронирования и общая стоимость.
+    """
+    bookings = BookingSerializer(many=True, read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+
+class BookingBulkCancelSerializer(serializers.Serializer):
+    """
+    Выбор бронирований для массовой отмены: список id или комната и период.
+    """
+    MAX_IDS = 1000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        min_length=1,
+        max_length=MAX_IDS,
+        help_text='ID бронирований для отмены'
+    )
+    room = CatalogRoomField(
+        active_only=False,
+        required=False,
+        help_text='Отменить активные бронирования комнаты'
+    )
+    date_from = serializers.DateField(
+        required=False,
+        help_text='Вместе с room: только бронирования, пересекающиеся с периодом'
+    )
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'ids' in attrs and 'room' in attrs:
+            raise serializers.ValidationError('Укажите либо ids, либо room.')
+        if 'ids' not in attrs and 'room' not in attrs:
+            raise serializers.ValidationError('Укажите ids или room.')
+
+        date_from = attrs.get('date_from')
+        date_to = attrs.get('date_to')
+        if (date_from or date_to) and 'room' not in attrs:
+            raise serializers.ValidationError({'room': 'Период задается только вместе с room.'})
+        if date_from and date_to and date_to <= date_from:
+            raise serializers.ValidationError({'date_to': 'Дата окончания должна быть позже даты начала.'})
+
+        return attrs
+
+    def get_queryset(self):
+        """
+        Бронирования, выбранные для отмены.
+        """
+        data = self.validated_data
+        if 'ids' in data:
+            return Booking.objects.filter(pk__in=data['ids'])
+
+        queryset = Booking.objects.filter(room=data['room'], status='active')
+        if data.get('date_from'):
+            queryset = queryset.filter(check_out__gt=data['date_from'])
+        if data.get('date_to'):
+            queryset = queryset.filter(check_in__lt=data['date_to'])
+        return queryset
+
+
+class BookingExportSerializer(serializers.ModelSerializer):
+    """
+    Плоская строка выгрузки бронирований (NDJSON / CSV).
+    """
+    sql_fields = Booking.sql_properties
+
+    username = serializers.CharField(source='user.username', read_only=True)
+    email = serializers.CharField(source='user.email', read_only=True)
+    room_number = serializers.CharField(source='room.room_number', read_only=True)
+    nights_count = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Booking
+        fields = [
+            'id',
+            'user',
+            'username',
+            'email',
+            'room',
+            'room_number',
+            'check_in',
+            'check_out',
+            'nights_count',
+            'total_price',
+            'status',
+            'cancelled_at',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
+class BookingHoldSerializer(serializers.ModelSerializer):
+    """
+    Сериализатор временного резерва комнаты.
+    """
+    room = RoomSerializer(read_only=True)
+
+    class Meta:
+        model = BookingHold
+        fields = ['id', 'room', 'check_in', 'check_out', 'expires_at', 'created_at']
+        read_only_fields = fields
+
+
+class BookingHoldCreateSerializer(BookingCreateSerializer):
+    """
+    Сериализатор создания резерва: те же проверки, что и у бронирования.
+    """
+
+    class Meta:
+        model = BookingHold
+        fields = ['room', 'check_in', 'check_out']
+
+    def create(self, validated_data):
+        """
+        Создание резерва через сервисный слой.
+        """
+        room = validated_data['room']
+        check_in = validated_data['check_in']
+        check_out = validated_data['check_out']
+
+        try:
+            hold = BookingService.create_hold(
+                user=self.context['request'].user,
+                room=room,
+                check_in=check_in,
+                check_out=check_out
+            )
+        except DjangoValidationError as e:
+            raise_booking_conflict(e, 'room', room, check_in, check_out)
+
+        return hold
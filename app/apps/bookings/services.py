@@ -1,19 +1,34 @@
 import logging
-from django.db import transaction
-from django.db.models import Q, Exists, OuterRef
+from functools import partial
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import BooleanField, Exists, F, OuterRef, Value
+from django.db.models.functions import Abs
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from decimal import Decimal
-from datetime import date
-from typing import Optional, Tuple
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
 
 from apps.rooms.models import Room
-from .models import Booking
+from .models import Booking, BookingHold
+from .cache import availability_cache
+from .exceptions import RoomUnavailableError
+from .occupancy import occupancy_index
+from . import outbox
 
 logger = logging.getLogger(__name__)
 
 
 class BookingService: # Сервис для отмена бронирование
 
+    # Насколько далеко от запрошенных дат искать свободные даты той же комнаты
+    ALTERNATIVES_SEARCH_DAYS = 30
+    # Ценовой диапазон похожих комнат: ±20% от цены запрошенной
+    SIMILAR_PRICE_BAND = Decimal('0.2')
+
     @staticmethod
     def calculate_total_price(room: Room, check_in: date, check_out: date) -> Decimal:
         """
@@ -33,40 +48,248 @@ class BookingService: # Сервис для отмена бронировани
 
         return room.price_per_night * nights
 
+    @staticmethod
+    def overlapping_bookings(check_in: date, check_out: date):
+        """
+        Активные бронирования, пересекающиеся с периодом [check_in, check_out).
+
+        Условие stay && daterange совпадает с ограничением booking_no_overlap,
+        поэтому запрос идет по его GiST-индексу.
+        """
+        return Booking.objects.filter(
+            status='active',
+            stay__overlap=DateRange(check_in, check_out),
+        )
+
+    @staticmethod
+    def live_holds(check_in: date, check_out: date):
+        """
+        Действующие (не истекшие) резервы, пересекающиеся с периодом [check_in, check_out).
+        """
+        return BookingHold.objects.filter(
+            expires_at__gt=timezone.now(),
+            stay__overlap=DateRange(check_in, check_out),
+        )
+
+    @staticmethod
+    def busy_intervals(check_in: date, check_out: date, exclude_booking_id: Optional[int] = None, **filters):
+        """
+        Занятые интервалы периода: активные бронирования и действующие резервы.
+
+        Returns:
+            Queryset кортежей (room_id, check_in, check_out) - UNION ALL двух
+            выборок, сортировать можно по этим полям
+        """
+        fields = ('room_id', 'check_in', 'check_out')
+        bookings = BookingService.overlapping_bookings(check_in, check_out).filter(**filters)
+        if exclude_booking_id:
+            bookings = bookings.exclude(id=exclude_booking_id)
+        holds = BookingService.live_holds(check_in, check_out).filter(**filters)
+        return bookings.order_by().values_list(*fields).union(
+            holds.order_by().values_list(*fields), all=True
+        )
+
+    @staticmethod
+    def _lock_rooms(*room_ids: int) -> None:
+        """
+        Advisory-блокировка комнат (pg_advisory_xact_lock по id) до конца транзакции.
+
+        Резервы и бронирования комнаты проверяют друг друга под этой
+        блокировкой, поэтому не проходят одновременно. Строка комнаты не
+        блокируется: правка комнаты в админке резервы и бронирования не ждет.
+        Несколько комнат блокируются в порядке id.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(id) FROM unnest(%s::bigint[]) AS id', [sorted(room_ids)])
+
+    @staticmethod
+    def _booked_error(room: Room, conflict_check_in: date, conflict_check_out: date) -> str:
+        return (
+            f"Комната {room.room_number} уже забронирована на эти даты. "
+            f"Конфликтующее бронирование: с {conflict_check_in} по {conflict_check_out}"
+        )
+
+    @staticmethod
+    def _held_error(room: Room) -> str:
+        return f"Комната {room.room_number} временно зарезервирована на эти даты. Попробуйте позже."
+
     @staticmethod
     def check_room_availability(
         room: Room,
         check_in: date,
         check_out: date,
-        exclude_booking_id: Optional[int] = None
+        exclude_booking_id: Optional[int] = None,
+        user=None
     ) -> Tuple[bool, Optional[str]]:
         """
         Проверка доступности комнаты на указанные даты.
+
+        Учитываются активные бронирования и действующие резервы; резервы
+        пользователя user его самого не блокируют.
         """
-        conflicting_bookings = Booking.objects.filter(
-            room=room,
-            status='active'
-        ).filter(
-            # Алгоритм проверки пересечения дат
-            Q(check_in__lt=check_out) & Q(check_out__gt=check_in)
-        )
+        conflicting_bookings = BookingService.overlapping_bookings(
+            check_in, check_out
+        ).filter(room=room)
 
         # Исключаем текущее бронирование при редактировании
         if exclude_booking_id:
             conflicting_bookings = conflicting_bookings.exclude(id=exclude_booking_id)
 
-        if conflicting_bookings.exists():
-            first_conflict = conflicting_bookings.first()
-            error_msg = (
-                f"Комната {room.room_number} уже забронирована на эти даты. "
-                f"Конфликтующее бронирование: с {first_conflict.check_in} по {first_conflict.check_out}"
-            )
-            return False, error_msg
+        first_conflict = conflicting_bookings.order_by('check_in').first()
+        if first_conflict is not None:
+            return False, BookingService._booked_error(room, first_conflict.check_in, first_conflict.check_out)
+
+        holds = BookingService.live_holds(check_in, check_out).filter(room=room)
+        if user is not None:
+            holds = holds.exclude(user=user)
+        if holds.exists():
+            return False, BookingService._held_error(room)
 
         return True, None
 
     @staticmethod
-    @transaction.atomic
+    def suggest_alternatives(
+        room: Room,
+        check_in: date,
+        check_out: date,
+        exclude_booking_id: Optional[int] = None,
+        limit: int = 3,
+        busy: Optional[List[Tuple[date, date]]] = None
+    ) -> dict:
+        """
+        Варианты для повторной попытки при конфликте бронирования.
+
+        Два запроса: занятые интервалы комнаты вокруг запрошенных дат
+        (бронирования и резервы) и поиск похожих свободных комнат. Интервалы,
+        уже прочитанные при отказе (RoomUnavailableError.busy), передаются
+        в busy - тогда запрос один.
+
+        Returns:
+            {
+                'same_room': [(check_in, check_out), ...] - ближайшие свободные даты
+                    той же длительности в этой комнате,
+                'similar_rooms': [Room, ...] - комнаты не меньшей вместимости
+                    в ценовом диапазоне, свободные на запрошенные даты
+            }
+        """
+        nights = (check_out - check_in).days
+        window_start, window_end = BookingService.alternatives_window(check_in, check_out)
+
+        if busy is None:
+            intervals = BookingService.busy_intervals(
+                window_start, window_end, exclude_booking_id=exclude_booking_id, room=room
+            ).order_by('check_in')
+            busy = [(busy_from, busy_to) for _, busy_from, busy_to in intervals]
+
+        same_room = []
+        for free_from, free_to in BookingService.free_gaps(busy, window_start, window_end):
+            latest_start = free_to - timedelta(days=nights)
+            if latest_start < free_from:
+                continue
+            # Ближайшее к запрошенной дате размещение внутри свободного промежутка
+            start = min(max(check_in, free_from), latest_start)
+            same_room.append((start, start + timedelta(days=nights)))
+
+        same_room.sort(key=lambda dates: abs((dates[0] - check_in).days))
+
+        band = room.price_per_night * BookingService.SIMILAR_PRICE_BAND
+        similar_rooms = Room.objects.filter(
+            is_active=True,
+            capacity__gte=room.capacity,
+            price_per_night__gte=room.price_per_night - band,
+            price_per_night__lte=room.price_per_night + band,
+        ).exclude(
+            pk=room.pk
+        ).exclude(
+            Exists(BookingService.overlapping_bookings(check_in, check_out).filter(room=OuterRef('pk')))
+        ).exclude(
+            Exists(BookingService.live_holds(check_in, check_out).filter(room=OuterRef('pk')))
+        ).annotate(
+            price_diff=Abs(F('price_per_night') - room.price_per_night)
+        ).order_by('price_diff', 'capacity')[:limit]
+
+        return {
+            'same_room': same_room[:limit],
+            'similar_rooms': list(similar_rooms),
+        }
+
+    @staticmethod
+    def _on_bookings_changed(*room_ids: int) -> None:
+        """
+        Новая версия индекса занятости сразу, чтобы он не отвечал до пересчета;
+        после коммита - пересчет строк индекса и новая эпоха кэша поиска.
+        """
+        version = occupancy_index.bump()
+        transaction.on_commit(partial(occupancy_index.refresh_rooms, set(room_ids), version))
+        transaction.on_commit(availability_cache.bump)
+
+    @staticmethod
+    def _is_overlap_violation(error: IntegrityError) -> bool:
+        """
+        Нарушено ли ограничение booking_no_overlap (пересечение дат в БД).
+        """
+        diag = getattr(error.__cause__, 'diag', None)
+        return getattr(diag, 'constraint_name', None) == 'booking_no_overlap'
+
+    @staticmethod
+    def alternatives_window(check_in: date, check_out: date) -> Tuple[date, date]:
+        """
+        Период, в котором suggest_alternatives ищет свободные даты той же комнаты.
+        """
+        search = timedelta(days=BookingService.ALTERNATIVES_SEARCH_DAYS)
+        return max(date.today(), check_in - search), check_out + search
+
+    @staticmethod
+    def _overlap_error(
+        field: str,
+        room: Room,
+        check_in: date,
+        check_out: date,
+        exclude_booking_id: Optional[int] = None
+    ) -> RoomUnavailableError:
+        """
+        Ошибка для бронирования, отклоненного ограничением в БД.
+
+        Один запрос - занятые интервалы комнаты в окне поиска вариантов: из них
+        берется конфликтующее бронирование для текста ошибки, а сами интервалы
+        уходят с ошибкой в suggest_alternatives.
+        """
+        window_start, window_end = BookingService.alternatives_window(check_in, check_out)
+        fields = ('check_in', 'check_out', 'is_hold')
+
+        bookings = BookingService.overlapping_bookings(window_start, window_end).filter(room=room)
+        if exclude_booking_id:
+            bookings = bookings.exclude(id=exclude_booking_id)
+        holds = BookingService.live_holds(window_start, window_end).filter(room=room)
+        intervals = list(
+            bookings.order_by().annotate(
+                is_hold=Value(False, output_field=BooleanField())
+            ).values_list(*fields).union(
+                holds.order_by().annotate(
+                    is_hold=Value(True, output_field=BooleanField())
+                ).values_list(*fields),
+                all=True
+            ).order_by('check_in')
+        )
+
+        conflict = next(
+            (
+                (busy_from, busy_to) for busy_from, busy_to, is_hold in intervals
+                if not is_hold and busy_from < check_out and busy_to > check_in
+            ),
+            None
+        )
+        if conflict is not None:
+            error_msg = BookingService._booked_error(room, *conflict)
+        else:
+            error_msg = f"Комната {room.room_number} уже забронирована на эти даты."
+
+        return RoomUnavailableError(
+            {field: error_msg},
+            busy=[(busy_from, busy_to) for busy_from, busy_to, _ in intervals]
+        )
+
+    @staticmethod
     def create_booking(
         user,
         room: Room,
@@ -75,23 +298,16 @@ class BookingService: # Сервис для отмена бронировани
     ) -> Booking:
         """
         Создание нового бронирования.
-        """
-        room = Room.objects.select_for_update().get(pk=room.pk)
-
-        # Проверяем доступность
-        is_available, error_msg = BookingService.check_room_availability(
-            room, check_in, check_out
-        )
-
-        if not is_available:
-            logger.warning(f'Booking creation failed - room unavailable: Room {room.room_number}, {check_in} to {check_out}, User: {user.username}')
-            raise ValidationError({'room': error_msg})
 
+        Доступность проверяет сама вставка: пересечение отсекает ограничение
+        booking_no_overlap, строка комнаты не блокируется. Детали конфликта
+        запрашиваются только при отказе. Действующие резервы других
+        пользователей проверяются в той же транзакции под блокировкой комнаты.
+        """
         # Рассчитываем стоимость
         total_price = BookingService.calculate_total_price(room, check_in, check_out)
 
-        # Создаем бронирование
-        booking = Booking.objects.create(
+        booking = Booking(
             user=user,
             room=room,
             check_in=check_in,
@@ -100,35 +316,53 @@ class BookingService: # Сервис для отмена бронировани
             status='active'
         )
 
-        logger.info(f'Booking created: ID {booking.id}, Room {room.room_number}, User: {user.username}, Dates: {check_in} to {check_out}, Price: {total_price}')
+        # Создаем бронирование
+        try:
+            with transaction.atomic():
+                # Резервы других пользователей ограничение bookings не видит:
+                # проверяем их под блокировкой комнаты, которую берет и create_hold
+                BookingService._lock_rooms(room.pk)
+                booking.save(force_insert=True, validate=False)
+                if BookingService.live_holds(check_in, check_out).filter(room=room).exclude(user=user).exists():
+                    logger.warning(f'Booking creation failed - room held: Room {room.room_number}, {check_in} to {check_out}, User: {user.username}')
+                    raise ValidationError({'room': BookingService._held_error(room)})
+                outbox.emit('booking.created', {
+                    'booking_id': booking.id,
+                    'room_id': room.pk,
+                    'room_number': room.room_number,
+                    'user_id': user.pk,
+                    'username': user.username,
+                    'check_in': check_in,
+                    'check_out': check_out,
+                    'total_price': total_price,
+                })
+        except IntegrityError as e:
+            if not BookingService._is_overlap_violation(e):
+                raise
+            logger.warning(f'Booking creation failed - room unavailable: Room {room.room_number}, {check_in} to {check_out}, User: {user.username}')
+            raise BookingService._overlap_error('room', room, check_in, check_out)
+
+        BookingService._on_bookings_changed(room.pk)
 
         return booking
 
     @staticmethod
-    @transaction.atomic
     def update_booking_dates(
         booking: Booking,
         check_in: date,
         check_out: date
     ) -> Booking:
         """
-        Обновление дат существующего бронирования с проверкой доступности.
+        Обновление дат существующего бронирования.
+
+        Как и при создании, пересечение с другими бронированиями проверяет
+        ограничение booking_no_overlap при записи.
         """
         # Проверяем что бронирование активно
         if booking.status != 'active':
             raise ValidationError("Нельзя редактировать отмененное бронирование")
 
-        # Блокируем комнату
-        room = Room.objects.select_for_update().get(pk=booking.room.pk)
-
-        # Проверяем доступность (исключая текущее бронирование)
-        is_available, error_msg = BookingService.check_room_availability(
-            room, check_in, check_out, exclude_booking_id=booking.id
-        )
-
-        if not is_available:
-            logger.warning(f'Booking update failed - room unavailable: Booking ID {booking.id}, Room {room.room_number}, New dates: {check_in} to {check_out}')
-            raise ValidationError({'dates': error_msg})
+        room = booking.room
 
         # Обновляем даты и пересчитываем стоимость
         old_check_in = booking.check_in
@@ -140,12 +374,127 @@ class BookingService: # Сервис для отмена бронировани
         booking.total_price = BookingService.calculate_total_price(
             room, check_in, check_out
         )
-        booking.save()
+        try:
+            with transaction.atomic():
+                # Резервы проверяются под блокировкой комнаты, как при создании
+                BookingService._lock_rooms(room.pk)
+                if BookingService.live_holds(check_in, check_out).filter(room=room).exclude(user_id=booking.user_id).exists():
+                    booking.check_in, booking.check_out, booking.total_price = old_check_in, old_check_out, old_price
+                    logger.warning(f'Booking update failed - room held: Booking ID {booking.id}, Room {room.room_number}, New dates: {check_in} to {check_out}')
+                    raise ValidationError({'dates': BookingService._held_error(room)})
+                booking.save(validate=False)
+                outbox.emit('booking.updated', {
+                    'booking_id': booking.id,
+                    'room_id': room.pk,
+                    'room_number': room.room_number,
+                    'user_id': booking.user_id,
+                    'old_check_in': old_check_in,
+                    'old_check_out': old_check_out,
+                    'old_total_price': old_price,
+                    'check_in': check_in,
+                    'check_out': check_out,
+                    'total_price': booking.total_price,
+                })
+        except IntegrityError as e:
+            if not BookingService._is_overlap_violation(e):
+                raise
+            booking.check_in, booking.check_out, booking.total_price = old_check_in, old_check_out, old_price
+            logger.warning(f'Booking update failed - room unavailable: Booking ID {booking.id}, Room {room.room_number}, New dates: {check_in} to {check_out}')
+            raise BookingService._overlap_error('dates', room, check_in, check_out, exclude_booking_id=booking.id)
 
-        logger.info(f'Booking updated: ID {booking.id}, Room {room.room_number}, Old dates: {old_check_in} to {old_check_out}, New dates: {check_in} to {check_out}, Price: {old_price} -> {booking.total_price}')
+        BookingService._on_bookings_changed(room.pk)
 
         return booking
 
+    @staticmethod
+    def _held_errors(rooms: List[Room], check_in: date, check_out: date, user) -> List[str]:
+        held = BookingService.live_holds(
+            check_in, check_out
+        ).filter(
+            room__in=rooms
+        ).exclude(
+            user=user
+        ).order_by('room__room_number').values_list('room__room_number', flat=True).distinct()
+
+        return [
+            f"Комната {room_number} временно зарезервирована на эти даты. Попробуйте позже."
+            for room_number in held
+        ]
+
+    @staticmethod
+    @transaction.atomic
+    def create_group_booking(
+        user,
+        rooms: List[Room],
+        check_in: date,
+        check_out: date
+    ) -> List[Booking]:
+        """
+        Групповое бронирование нескольких комнат на одни даты - все или ничего.
+
+        Комнаты блокируются в порядке pk, чтобы параллельные группы не ждали
+        друг друга по кругу. Конфликты и резервы всех комнат проверяются под
+        блокировкой, бронирования вставляются одним bulk_create. Пересечение
+        с бронированием, вставленным в обход блокировки, отсекает ограничение
+        booking_no_overlap - тогда откатывается вся группа.
+        """
+        rooms = sorted(rooms, key=lambda room: room.pk)
+        BookingService._lock_rooms(*[room.pk for room in rooms])
+
+        conflicts = BookingService.overlapping_bookings(
+            check_in, check_out
+        ).filter(
+            room__in=rooms
+        ).order_by('room__room_number', 'check_in').values_list('room__room_number', 'check_in', 'check_out')
+
+        errors = [
+            f"Комната {room_number} уже забронирована на эти даты. "
+            f"Конфликтующее бронирование: с {conflict_check_in} по {conflict_check_out}"
+            for room_number, conflict_check_in, conflict_check_out in conflicts
+        ]
+        errors += BookingService._held_errors(rooms, check_in, check_out, user)
+        if errors:
+            logger.warning(f'Group booking failed - rooms unavailable: {len(errors)} conflicts, {check_in} to {check_out}, User: {user.username}')
+            raise ValidationError({'rooms': errors})
+
+        bookings = [
+            Booking(
+                user=user,
+                room=room,
+                check_in=check_in,
+                check_out=check_out,
+                total_price=BookingService.calculate_total_price(room, check_in, check_out),
+                status='active'
+            )
+            for room in rooms
+        ]
+
+        try:
+            with transaction.atomic():
+                bookings = Booking.objects.bulk_create(bookings)
+                outbox.emit_many('booking.created', [
+                    {
+                        'booking_id': booking.id,
+                        'room_id': booking.room.pk,
+                        'room_number': booking.room.room_number,
+                        'user_id': user.pk,
+                        'username': user.username,
+                        'check_in': check_in,
+                        'check_out': check_out,
+                        'total_price': booking.total_price,
+                    }
+                    for booking in bookings
+                ])
+        except IntegrityError as e:
+            if not BookingService._is_overlap_violation(e):
+                raise
+            logger.warning(f'Group booking failed - overlap rejected by database: {len(rooms)} rooms, {check_in} to {check_out}, User: {user.username}')
+            raise ValidationError({'rooms': 'Одна из комнат была забронирована во время оформления группы. Повторите попытку.'})
+
+        BookingService._on_bookings_changed(*[room.pk for room in rooms])
+
+        return bookings
+
     @staticmethod
     def cancel_booking(booking: Booking, cancelled_by) -> Booking:
         """
@@ -155,33 +504,405 @@ class BookingService: # Сервис для отмена бронировани
             logger.warning(f'Attempt to cancel already cancelled booking: ID {booking.id}')
             raise ValidationError("Бронирование уже отменено")
 
-        from django.utils import timezone
-
         booking.status = 'cancelled'
         booking.cancelled_by = cancelled_by
         booking.cancelled_at = timezone.now()
-        booking.save()
 
-        logger.info(f'Booking cancelled: ID {booking.id}, Room {booking.room.room_number}, User: {booking.user.username}, Cancelled by: {cancelled_by.username}, Dates: {booking.check_in} to {booking.check_out}')
+        with transaction.atomic():
+            booking.save(validate=False)
+            outbox.emit('booking.cancelled', {
+                'booking_id': booking.id,
+                'room_id': booking.room_id,
+                'user_id': booking.user_id,
+                'cancelled_by': cancelled_by.username,
+                'check_in': booking.check_in,
+                'check_out': booking.check_out,
+            })
+            BookingService._on_bookings_changed(booking.room_id)
 
         return booking
 
     @staticmethod
-    def get_available_rooms(check_in: date, check_out: date):
+    def cancel_bookings(queryset, cancelled_by) -> Dict[int, str]:
+        """
+        Массовая отмена бронирований одним запросом.
+
+        Условный UPDATE ... WHERE status = 'active' RETURNING отменяет только
+        активные бронирования из queryset, остальные возвращаются как уже
+        отмененные. Индекс занятости и кэш поиска обновляются один раз на пачку.
+
+        Returns:
+            {booking_id: 'cancelled' | 'already_cancelled'}
+        """
+        target_sql, target_params = queryset.order_by().values('pk').query.sql_with_params()
+        table = Booking._meta.db_table
+        now = timezone.now()
+
+        sql = f"""
+            WITH target AS ({target_sql}),
+            cancelled AS (
+                UPDATE {table}
+                SET status = 'cancelled', cancelled_by_id = %s, cancelled_at = %s, updated_at = %s
+                WHERE id IN (SELECT id FROM target) AND status = 'active'
+                RETURNING id, room_id, user_id, check_in, check_out
+            )
+            SELECT target.id, cancelled.room_id, cancelled.user_id, cancelled.check_in, cancelled.check_out
+            FROM target LEFT JOIN cancelled ON cancelled.id = target.id
+        """
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, (*target_params, cancelled_by.pk, now, now))
+                rows = cursor.fetchall()
+
+            cancelled = [row for row in rows if row[1] is not None]
+            room_ids = {room_id for _, room_id, *_ in cancelled}
+            if room_ids:
+                # Те же поля, что у события одиночной отмены (cancel_booking)
+                outbox.emit_many('booking.cancelled', [
+                    {
+                        'booking_id': booking_id,
+                        'room_id': room_id,
+                        'user_id': user_id,
+                        'cancelled_by': cancelled_by.username,
+                        'check_in': check_in,
+                        'check_out': check_out,
+                    }
+                    for booking_id, room_id, user_id, check_in, check_out in cancelled
+                ])
+                BookingService._on_bookings_changed(*room_ids)
+
+        results = {
+            booking_id: 'cancelled' if room_id is not None else 'already_cancelled'
+            for booking_id, room_id, *_ in rows
+        }
+
+        return results
+
+    @staticmethod
+    def create_hold(user, room: Room, check_in: date, check_out: date) -> BookingHold:
+        """
+        Временный резерв комнаты на BOOKING_HOLD_TTL секунд.
+
+        Пересечение резервов отсекает ограничение booking_hold_no_overlap, а
+        бронирования проверяются в той же транзакции под advisory-блокировкой
+        комнаты (см. _lock_rooms): ее же берут создание и изменение
+        бронирований, строка комнаты не блокируется.
+        Истекшие, но еще не удаленные резервы комнаты на эти даты удаляются
+        перед вставкой, чтобы не мешать ограничению.
+        """
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                BookingService._lock_rooms(room.pk)
+
+                is_available, error_msg = BookingService.check_room_availability(room, check_in, check_out, user=user)
+                if not is_available:
+                    raise ValidationError({'room': error_msg})
+
+                BookingHold.objects.filter(
+                    room=room,
+                    expires_at__lte=now,
+                    stay__overlap=DateRange(check_in, check_out),
+                ).delete()
+                hold = BookingHold.objects.create(
+                    user=user,
+                    room=room,
+                    check_in=check_in,
+                    check_out=check_out,
+                    expires_at=now + timedelta(seconds=settings.BOOKING_HOLD_TTL)
+                )
+        except IntegrityError as e:
+            diag = getattr(e.__cause__, 'diag', None)
+            if getattr(diag, 'constraint_name', None) != 'booking_hold_no_overlap':
+                raise
+            logger.warning(f'Hold creation failed - room held: Room {room.room_number}, {check_in} to {check_out}, User: {user.username}')
+            raise ValidationError({'room': BookingService._held_error(room)})
+
+        transaction.on_commit(availability_cache.bump)
+
+        logger.info(f'Hold created: ID {hold.id}, Room {room.room_number}, User: {user.username}, Dates: {check_in} to {check_out}, Expires: {hold.expires_at}')
+
+        return hold
+
+    @staticmethod
+    @transaction.atomic
+    def convert_hold(hold: BookingHold) -> Booking:
+        """
+        Превращение резерва в бронирование.
+
+        Резерв удаляется в той же транзакции, что и создается бронирование:
+        при конфликте откатываются оба действия и резерв остается.
+        """
+        deleted, _ = BookingHold.objects.filter(pk=hold.pk, expires_at__gt=timezone.now()).delete()
+        if not deleted:
+            raise ValidationError({'hold': 'Резерв истек или уже использован.'})
+
+        booking = BookingService.create_booking(
+            user=hold.user,
+            room=hold.room,
+            check_in=hold.check_in,
+            check_out=hold.check_out
+        )
+
+        logger.info(f'Hold converted: ID {hold.id} -> Booking ID {booking.id}')
+
+        return booking
+
+    @staticmethod
+    def release_hold(hold: BookingHold) -> None:
+        """
+        Досрочное снятие резерва (оплата отменена).
+        """
+        BookingHold.objects.filter(pk=hold.pk).delete()
+        availability_cache.bump()
+
+        logger.info(f'Hold released: ID {hold.id}, Room ID {hold.room_id}')
+
+    @staticmethod
+    def expire_holds(batch_size: int = 1000) -> int:
+        """
+        Удаление истекших резервов пачками по batch_size.
+
+        Returns:
+            Количество удаленных резервов
+        """
+        now = timezone.now()
+        total = 0
+
+        while True:
+            ids = list(
+                BookingHold.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deleted, _ = BookingHold.objects.filter(pk__in=ids).delete()
+            total += deleted
+
+        if total:
+            availability_cache.bump()
+            logger.info(f'Expired holds removed: {total}')
+
+        return total
+
+    @staticmethod
+    def get_available_rooms(check_in: date, check_out: date, filters: Optional[dict] = None):
         """
         Получение списка доступных комнат на указанные даты.
+
+        id свободных комнат берутся из кэша поиска, при промахе считаются
+        через _find_available_rooms.
+
+        Args:
+            filters: Дополнительные условия на Room (например {'capacity__gte': 2}),
+                входят в ключ кэша
         """
-        conflicting_bookings = Booking.objects.filter(
-            room=OuterRef('pk'),
-            status='active'
-        ).filter(
-            Q(check_in__lt=check_out) & Q(check_out__gt=check_in)
+        filters = filters or {}
+
+        room_ids = availability_cache.get_room_ids(
+            check_in,
+            check_out,
+            filters,
+            lambda: list(
+                BookingService._find_available_rooms(check_in, check_out).filter(**filters).values_list('pk', flat=True)
+            )
         )
 
+        return Room.objects.filter(is_active=True, pk__in=room_ids)
+
+    @staticmethod
+    def _find_available_rooms(check_in: date, check_out: date):
+        """
+        Свободные комнаты без кэша.
+
+        Сначала пробуем ответить по индексу занятости, при его недоступности
+        выполняем запрос с подзапросом по бронированиям. Комнаты с действующими
+        резервами исключаются в обоих случаях.
+        """
+        held_rooms = BookingService.live_holds(check_in, check_out).filter(room=OuterRef('pk'))
+
+        occupied_room_ids = occupancy_index.occupied_room_ids(check_in, check_out)
+        if occupied_room_ids is not None:
+            return Room.objects.filter(is_active=True).exclude(pk__in=occupied_room_ids).exclude(Exists(held_rooms))
+
+        conflicting_bookings = BookingService.overlapping_bookings(
+            check_in, check_out
+        ).filter(room=OuterRef('pk'))
+
         available_rooms = Room.objects.filter(
             is_active=True
         ).exclude(
             Exists(conflicting_bookings)
+        ).exclude(
+            Exists(held_rooms)
         )
 
         return available_rooms
+
+    @staticmethod
+    def get_occupancy_calendar(date_from: date, date_to: date) -> List[Tuple[int, str, str]]:
+        """
+        Занятость активных комнат по ночам периода [date_from, date_to).
+
+        Считается одним запросом: ночи из generate_series x комнаты, ночь занята,
+        если с ней пересекается активное бронирование или действующий резерв
+        (busy_intervals).
+
+        Returns:
+            Список (room_id, room_number, occupancy), где occupancy - строка
+            по ночам: '1' - занято, '0' - свободно
+        """
+        bookings_sql, bookings_params = BookingService.busy_intervals(date_from, date_to).query.sql_with_params()
+
+        sql = f"""
+            WITH busy AS ({bookings_sql})
+            SELECT r.id, r.room_number, string_agg(
+                CASE WHEN EXISTS (
+                    SELECT 1 FROM busy b
+                    WHERE b.room_id = r.id
+                      AND b.check_in <= night.day::date
+                      AND b.check_out > night.day::date
+                ) THEN '1' ELSE '0' END,
+                '' ORDER BY night.day
+            )
+            FROM {Room._meta.db_table} r
+            CROSS JOIN generate_series(%s::date, %s::date - 1, interval '1 day') AS night(day)
+            WHERE r.is_active
+            GROUP BY r.id, r.room_number
+            ORDER BY r.room_number
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (*bookings_params, date_from, date_to))
+            return cursor.fetchall()
+
+    @staticmethod
+    def get_available_rooms_batch(ranges: List[Tuple[date, date]]) -> Dict[Tuple[date, date], List[Room]]:
+        """
+        Свободные комнаты сразу для нескольких периодов за один запрос.
+
+        Периоды передаются списком VALUES и соединяются с активными комнатами,
+        занятые комнаты отсекаются тем же условием пересечения, что и в
+        overlapping_bookings, - по бронированиям и действующим резервам.
+
+        Returns:
+            Словарь {(check_in, check_out): [Room, ...]} в порядке ranges
+        """
+        # Повторы схлопываются: иначе комнаты повторного периода попали бы в список дважды
+        ranges = list(dict.fromkeys(ranges))
+        values_sql = ', '.join(['(%s, %s::date, %s::date)'] * len(ranges))
+        params = []
+        for idx, (check_in, check_out) in enumerate(ranges):
+            params.extend([idx, check_in, check_out])
+
+        sql = f"""
+            WITH ranges (idx, check_in, check_out) AS (VALUES {values_sql})
+            SELECT r.*, ranges.idx AS range_idx
+            FROM {Room._meta.db_table} r
+            CROSS JOIN ranges
+            WHERE r.is_active
+              AND NOT EXISTS (
+                  SELECT 1 FROM {Booking._meta.db_table} b
+                  WHERE b.room_id = r.id
+                    AND b.status = 'active'
+                    AND b.stay && daterange(ranges.check_in, ranges.check_out)
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM {BookingHold._meta.db_table} h
+                  WHERE h.room_id = r.id
+                    AND h.expires_at > %s
+                    AND h.stay && daterange(ranges.check_in, ranges.check_out)
+              )
+            ORDER BY ranges.idx, r.room_number
+        """
+        params.append(timezone.now())
+
+        result = {date_range: [] for date_range in ranges}
+        rooms = {}
+        for row in Room.objects.raw(sql, params):
+            # Одна и та же комната приходит строкой на каждый свободный период
+            room = rooms.setdefault(row.pk, row)
+            result[ranges[row.range_idx]].append(room)
+
+        return result
+
+    @staticmethod
+    def free_gaps(
+        intervals: List[Tuple[date, date]],
+        date_from: date,
+        date_to: date
+    ) -> List[Tuple[date, date]]:
+        """
+        Свободные промежутки периода [date_from, date_to) между занятыми интервалами.
+
+        Args:
+            intervals: Пары (check_in, check_out), отсортированные по check_in
+            date_from: Начало периода
+            date_to: Конец периода (не включается)
+
+        Returns:
+            Список свободных промежутков (start, end)
+        """
+        gaps = []
+        cursor = date_from
+
+        for check_in, check_out in intervals:
+            if check_in > cursor:
+                gaps.append((cursor, min(check_in, date_to)))
+            cursor = max(cursor, check_out)
+            if cursor >= date_to:
+                break
+
+        if cursor < date_to:
+            gaps.append((cursor, date_to))
+
+        return gaps
+
+    @staticmethod
+    def find_free_windows(
+        date_from: date,
+        date_to: date,
+        nights: int,
+        ordering: str = 'start'
+    ) -> List[dict]:
+        """
+        Поиск свободных окон из nights ночей внутри периода [date_from, date_to).
+
+        Занятые интервалы всех комнат за период (бронирования и резервы)
+        загружаются одним запросом, свободные промежутки считаются проходом
+        по отсортированным интервалам.
+
+        Args:
+            ordering: 'start' - сначала самые ранние окна, 'price' - сначала дешевые
+
+        Returns:
+            Список окон {room, check_in, check_out, free_from, free_to}, где
+            check_in/check_out - самое раннее размещение, free_from/free_to - весь
+            свободный промежуток, в который помещается окно
+        """
+        rooms = Room.objects.filter(is_active=True)
+
+        busy = BookingService.busy_intervals(date_from, date_to).order_by('room_id', 'check_in')
+
+        intervals = defaultdict(list)
+        for room_id, check_in, check_out in busy:
+            intervals[room_id].append((check_in, check_out))
+
+        windows = []
+        for room in rooms:
+            for free_from, free_to in BookingService.free_gaps(intervals[room.pk], date_from, date_to):
+                if (free_to - free_from).days >= nights:
+                    windows.append({
+                        'room': room,
+                        'check_in': free_from,
+                        'check_out': free_from + timedelta(days=nights),
+                        'free_from': free_from,
+                        'free_to': free_to,
+                    })
+
+        if ordering == 'price':
+            windows.sort(key=lambda window: (window['room'].price_per_night, window['check_in']))
+        else:
+            windows.sort(key=lambda window: (window['check_in'], window['room'].price_per_night))
+
+        return windows
@@ -0,0 +1,14 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.rooms.models import Room
+from .cache import availability_cache
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_availability_on_room_change(sender, instance, **kwargs):
+    """
+    Изменение комнаты (цена, вместимость, активность) меняет результаты поиска.
+    """
+    transaction.on_commit(availability_cache.bump)
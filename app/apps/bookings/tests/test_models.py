@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+
+from apps.bookings.models import Booking
+from apps.bookings.services import BookingService
+from apps.rooms.models import Room
+from apps.users.models import User
+
+
+class BookingIndexesTest(TestCase):
+    """
+    Планы основных запросов по bookings используют составные индексы.
+
+    Таблицы в тестах маленькие, поэтому seq scan отключается: проверяем,
+    что у планировщика есть подходящий индекс.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        start = date.today() + timedelta(days=1)
+        for i in range(5):
+            Booking.objects.create(
+                user=cls.user,
+                room=cls.room,
+                check_in=start + timedelta(days=i * 3),
+                check_out=start + timedelta(days=i * 3 + 2),
+                total_price=Decimal('200.00'),
+            )
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_overlap_check_uses_exclusion_constraint_index(self):
+        check_in = date.today() + timedelta(days=2)
+        queryset = BookingService.overlapping_bookings(
+            check_in, check_in + timedelta(days=3)
+        ).filter(room=self.room)
+
+        plan = self.explain(queryset)
+
+        self.assertIn('booking_no_overlap', plan)
+
+    def test_user_list_uses_user_created_index(self):
+        queryset = Booking.objects.filter(user=self.user).order_by('-created_at')[:20]
+
+        plan = self.explain(queryset)
+
+        self.assertIn('booking_user_created_idx', plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_admin_list_uses_created_index(self):
+        queryset = Booking.objects.order_by('-created_at')[:20]
+
+        plan = self.explain(queryset)
+
+        self.assertIn('booking_created_idx', plan)
+        self.assertNotIn('Sort', plan)
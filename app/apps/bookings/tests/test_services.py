@@ -0,0 +1,575 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.bookings.cache import availability_cache
+from apps.bookings.models import Booking, BookingHold, OutboxEvent
+from apps.bookings.occupancy import occupancy_index
+from apps.bookings.outbox import dead_events, process_batch
+from apps.bookings.services import BookingService
+from apps.rooms.models import Room
+from apps.users.models import User
+
+
+HANDLER_CALLS = []
+
+
+def record_handler(event):
+    HANDLER_CALLS.append('record')
+
+
+def flaky_handler(event):
+    HANDLER_CALLS.append('flaky')
+    raise RuntimeError('handler failed')
+
+
+def data_queries(context):
+    """
+    Запросы к данным без SAVEPOINT / RELEASE / ROLLBACK TO, которые
+    TestCase добавляет вокруг каждого transaction.atomic.
+    """
+    return [
+        query['sql'] for query in context.captured_queries
+        if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'))
+    ]
+
+
+class BookingServiceQueryBudgetTest(TestCase):
+    """
+    Запись бронирования - блокировка комнаты, запрос на запись, проверка
+    резервов и событие outbox, детали конфликта - только при отказе.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        cls.check_in = date.today() + timedelta(days=10)
+        cls.check_out = cls.check_in + timedelta(days=3)
+        cls.booking = Booking.objects.create(
+            user=cls.user,
+            room=cls.room,
+            check_in=cls.check_in,
+            check_out=cls.check_out,
+            total_price=Decimal('300.00'),
+        )
+
+    def test_create_booking_single_insert(self):
+        check_in = self.check_out + timedelta(days=1)
+
+        with CaptureQueriesContext(connection) as context:
+            booking = BookingService.create_booking(self.user, self.room, check_in, check_in + timedelta(days=2))
+
+        # Блокировка комнаты, вставка, проверка резервов, событие outbox
+        queries = data_queries(context)
+        self.assertEqual(len(queries), 4, queries)
+        self.assertIn('pg_advisory_xact_lock', queries[0])
+        self.assertTrue(queries[1].startswith('INSERT'))
+        self.assertEqual(booking.total_price, Decimal('200.00'))
+
+    def test_create_booking_conflict_fetches_details_once(self):
+        with CaptureQueriesContext(connection) as context:
+            with self.assertRaises(ValidationError) as error:
+                BookingService.create_booking(self.user, self.room, self.check_in + timedelta(days=1), self.check_out)
+
+        # Блокировка комнаты, отклоненная вставка и занятые интервалы комнаты
+        queries = data_queries(context)
+        self.assertEqual(len(queries), 3, queries)
+        self.assertIn(str(self.check_in), error.exception.message_dict['room'][0])
+        self.assertEqual(error.exception.busy, [(self.check_in, self.check_out)])
+
+        # Варианты строятся по уже прочитанным интервалам: остается поиск похожих комнат
+        with self.assertNumQueries(1):
+            BookingService.suggest_alternatives(
+                self.room, self.check_in + timedelta(days=1), self.check_out, busy=error.exception.busy
+            )
+
+    def test_update_booking_dates_single_update(self):
+        booking = Booking.objects.select_related('room').get(pk=self.booking.pk)
+
+        with CaptureQueriesContext(connection) as context:
+            BookingService.update_booking_dates(booking, self.check_in, self.check_out + timedelta(days=1))
+
+        # Блокировка комнаты, проверка резервов, UPDATE, событие outbox
+        queries = data_queries(context)
+        self.assertEqual(len(queries), 4, queries)
+        self.assertTrue(queries[2].startswith('UPDATE'))
+        self.assertEqual(booking.total_price, Decimal('400.00'))
+
+    def test_update_booking_dates_conflict_keeps_instance(self):
+        other = Booking.objects.create(
+            user=self.user,
+            room=self.room,
+            check_in=self.check_out,
+            check_out=self.check_out + timedelta(days=2),
+            total_price=Decimal('200.00'),
+        )
+
+        with self.assertRaises(ValidationError):
+            BookingService.update_booking_dates(other, self.check_in, other.check_out)
+
+        self.assertEqual(other.check_in, self.check_out)
+        self.assertEqual(other.total_price, Decimal('200.00'))
+
+
+class AvailabilityCacheTest(TestCase):
+    """
+    Кэш поиска с настройками по умолчанию не обращается к БД.
+    """
+
+    def setUp(self):
+        caches['availability'].clear()
+        self.check_in = date.today() + timedelta(days=10)
+        self.check_out = self.check_in + timedelta(days=3)
+
+    def test_lookup_without_database_queries(self):
+        with self.assertNumQueries(0):
+            missed = availability_cache.get_room_ids(self.check_in, self.check_out, None, lambda: [1, 2])
+            hit = availability_cache.get_room_ids(self.check_in, self.check_out, None, lambda: [3])
+
+        self.assertEqual(missed, [1, 2])
+        self.assertEqual(hit, [1, 2])
+        self.assertEqual(availability_cache.stats()['hits'], 0)
+
+    @override_settings(AVAILABILITY_CACHE_STATS=True)
+    def test_stats_opt_in(self):
+        availability_cache.get_room_ids(self.check_in, self.check_out, None, lambda: [1])
+        availability_cache.get_room_ids(self.check_in, self.check_out, None, lambda: [1])
+
+        self.assertEqual(availability_cache.stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+
+class AvailableRoomsBatchTest(TestCase):
+    """
+    Свободные комнаты по нескольким периодам одним запросом.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.rooms = [
+            Room.objects.create(room_number=f'{101 + i}', price_per_night=Decimal('100.00'), capacity=2)
+            for i in range(3)
+        ]
+        cls.start = date.today() + timedelta(days=10)
+        Booking.objects.create(
+            user=cls.user,
+            room=cls.rooms[0],
+            check_in=cls.start,
+            check_out=cls.start + timedelta(days=3),
+            total_price=Decimal('300.00'),
+        )
+        BookingHold.objects.create(
+            user=cls.user,
+            room=cls.rooms[1],
+            check_in=cls.start + timedelta(days=2),
+            check_out=cls.start + timedelta(days=4),
+            expires_at=timezone.now() + timedelta(days=1),
+        )
+
+    def period(self, start, end):
+        return self.start + timedelta(days=start), self.start + timedelta(days=end)
+
+    def room_numbers(self, result):
+        return {key: [room.room_number for room in rooms] for key, rooms in result.items()}
+
+    def test_overlapping_ranges_in_single_query(self):
+        ranges = [self.period(0, 2), self.period(1, 4), self.period(3, 5), self.period(4, 6)]
+
+        with self.assertNumQueries(1):
+            result = BookingService.get_available_rooms_batch(ranges)
+
+        self.assertEqual(list(result), ranges)
+        self.assertEqual(self.room_numbers(result), {
+            self.period(0, 2): ['102', '103'],
+            self.period(1, 4): ['103'],
+            self.period(3, 5): ['101', '103'],
+            self.period(4, 6): ['101', '102', '103'],
+        })
+        # Комната, свободная в нескольких периодах, - один и тот же объект
+        self.assertIs(result[self.period(0, 2)][-1], result[self.period(1, 4)][0])
+
+    def test_duplicate_ranges(self):
+        ranges = [self.period(0, 2), self.period(4, 6), self.period(0, 2)]
+
+        result = BookingService.get_available_rooms_batch(ranges)
+
+        self.assertEqual(self.room_numbers(result), {
+            self.period(0, 2): ['102', '103'],
+            self.period(4, 6): ['101', '102', '103'],
+        })
+
+
+class FreeGapsTest(SimpleTestCase):
+    """
+    Свободные промежутки периода между отсортированными занятыми интервалами.
+    """
+    date_from = date(2030, 1, 1)
+    date_to = date(2030, 1, 11)
+
+    def day(self, offset):
+        return self.date_from + timedelta(days=offset)
+
+    def gaps(self, *intervals):
+        return BookingService.free_gaps(
+            [(self.day(start), self.day(end)) for start, end in intervals], self.date_from, self.date_to
+        )
+
+    def test_no_bookings(self):
+        self.assertEqual(self.gaps(), [(self.date_from, self.date_to)])
+
+    def test_bookings_touching_period_edges(self):
+        # Выезд в первый день и заезд в последний день периода ничего не занимают
+        self.assertEqual(self.gaps((-3, 0), (10, 12)), [(self.date_from, self.date_to)])
+        # Брони, пересекающие края, отрезают начало и конец периода
+        self.assertEqual(self.gaps((-3, 2), (8, 12)), [(self.day(2), self.day(8))])
+
+    def test_adjacent_and_nested_bookings(self):
+        self.assertEqual(
+            self.gaps((1, 3), (3, 4), (3, 5), (7, 9)),
+            [(self.day(0), self.day(1)), (self.day(5), self.day(7)), (self.day(9), self.day(10))]
+        )
+
+    def test_fully_booked(self):
+        self.assertEqual(self.gaps((-1, 4), (4, 11)), [])
+
+
+class FreeWindowsTest(TestCase):
+    """
+    Поиск окон из N ночей: промежутки короче окна отбрасываются.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.cheap = Room.objects.create(room_number='101', price_per_night=Decimal('50.00'), capacity=2)
+        cls.middle = Room.objects.create(room_number='102', price_per_night=Decimal('100.00'), capacity=2)
+        cls.edges = Room.objects.create(room_number='103', price_per_night=Decimal('200.00'), capacity=2)
+        Room.objects.create(room_number='104', price_per_night=Decimal('10.00'), capacity=2, is_active=False)
+
+        cls.date_from = date.today() + timedelta(days=10)
+        cls.date_to = cls.date_from + timedelta(days=8)
+
+        def book(room, start, end):
+            Booking.objects.create(
+                user=cls.user,
+                room=room,
+                check_in=cls.day(start),
+                check_out=cls.day(end),
+                total_price=room.price_per_night * (end - start),
+            )
+
+        # Промежуток [0, 2) короче окна, подходит только [4, 8)
+        book(cls.middle, -2, 0)
+        book(cls.middle, 2, 4)
+        # Брони пересекают начало и конец периода
+        book(cls.edges, -1, 1)
+        book(cls.edges, 7, 9)
+
+    @classmethod
+    def day(cls, offset):
+        return cls.date_from + timedelta(days=offset)
+
+    def windows(self, nights, ordering='start'):
+        return [
+            (window['room'].room_number, window['check_in'], window['check_out'], window['free_from'], window['free_to'])
+            for window in BookingService.find_free_windows(self.date_from, self.date_to, nights, ordering=ordering)
+        ]
+
+    def test_windows_by_start(self):
+        with self.assertNumQueries(2):
+            windows = self.windows(3)
+
+        self.assertEqual(windows, [
+            ('101', self.day(0), self.day(3), self.day(0), self.day(8)),
+            ('103', self.day(1), self.day(4), self.day(1), self.day(7)),
+            ('102', self.day(4), self.day(7), self.day(4), self.day(8)),
+        ])
+
+    def test_windows_by_price(self):
+        self.assertEqual([window[0] for window in self.windows(3, ordering='price')], ['101', '102', '103'])
+
+    def test_gaps_shorter_than_window_skipped(self):
+        self.assertEqual(self.windows(5), [
+            ('101', self.day(0), self.day(5), self.day(0), self.day(8)),
+            ('103', self.day(1), self.day(6), self.day(1), self.day(7)),
+        ])
+        self.assertEqual(self.windows(7), [('101', self.day(0), self.day(7), self.day(0), self.day(8))])
+
+
+class BookingHoldServiceTest(TestCase):
+    """
+    Резервы: блокируют даты для других пользователей, превращаются в бронирование и истекают.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        cls.check_in = date.today() + timedelta(days=10)
+        cls.check_out = cls.check_in + timedelta(days=3)
+
+    def test_hold_blocks_other_users(self):
+        BookingService.create_hold(self.user, self.room, self.check_in, self.check_out)
+
+        with self.assertRaises(ValidationError):
+            BookingService.create_booking(self.other, self.room, self.check_in, self.check_out)
+        with self.assertRaises(ValidationError):
+            BookingService.create_hold(self.other, self.room, self.check_in + timedelta(days=1), self.check_out)
+
+        self.assertNotIn(self.room, BookingService._find_available_rooms(self.check_in, self.check_out))
+
+    def test_hold_rejected_for_booked_room(self):
+        Booking.objects.create(
+            user=self.other,
+            room=self.room,
+            check_in=self.check_in,
+            check_out=self.check_out,
+            total_price=Decimal('300.00'),
+        )
+
+        with self.assertRaises(ValidationError):
+            BookingService.create_hold(self.user, self.room, self.check_in + timedelta(days=1), self.check_out)
+        self.assertFalse(BookingHold.objects.exists())
+
+    def test_searches_respect_holds(self):
+        free = Room.objects.create(room_number='102', price_per_night=Decimal('100.00'), capacity=2)
+        BookingService.create_hold(self.user, self.room, self.check_in, self.check_out)
+
+        is_available, _ = BookingService.check_room_availability(self.room, self.check_in, self.check_out)
+        self.assertFalse(is_available)
+        is_available, _ = BookingService.check_room_availability(self.room, self.check_in, self.check_out, user=self.user)
+        self.assertTrue(is_available)
+
+        batch = BookingService.get_available_rooms_batch([(self.check_in, self.check_out)])
+        self.assertEqual(batch[(self.check_in, self.check_out)], [free])
+
+        calendar = {room_id: occupancy for room_id, _, occupancy in BookingService.get_occupancy_calendar(
+            self.check_in, self.check_out
+        )}
+        self.assertEqual(calendar, {self.room.pk: '111', free.pk: '000'})
+
+        windows = BookingService.find_free_windows(self.check_in, self.check_out, nights=3)
+        self.assertEqual([window['room'] for window in windows], [free])
+
+        alternatives = BookingService.suggest_alternatives(self.room, self.check_in, self.check_out)
+        self.assertEqual(alternatives['similar_rooms'], [free])
+        self.assertNotIn((self.check_in, self.check_out), alternatives['same_room'])
+
+    def test_hold_does_not_lock_room_row(self):
+        with CaptureQueriesContext(connection) as context:
+            BookingService.create_hold(self.user, self.room, self.check_in, self.check_out)
+
+        queries = data_queries(context)
+        self.assertIn('pg_advisory_xact_lock', queries[0])
+        self.assertFalse([sql for sql in queries if 'FOR UPDATE' in sql or 'FOR KEY SHARE' in sql])
+
+    def test_convert_hold(self):
+        hold = BookingService.create_hold(self.user, self.room, self.check_in, self.check_out)
+
+        booking = BookingService.convert_hold(hold)
+
+        self.assertEqual(booking.user, self.user)
+        self.assertEqual(booking.total_price, Decimal('300.00'))
+        self.assertFalse(BookingHold.objects.filter(pk=hold.pk).exists())
+
+    def test_expired_hold_is_ignored_and_swept(self):
+        hold = BookingService.create_hold(self.user, self.room, self.check_in, self.check_out)
+        BookingHold.objects.filter(pk=hold.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        with self.assertRaises(ValidationError):
+            BookingService.convert_hold(hold)
+        BookingService.create_hold(self.other, self.room, self.check_in, self.check_out)
+
+        BookingHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(BookingService.expire_holds(batch_size=1), 1)
+        self.assertFalse(BookingHold.objects.exists())
+
+
+class OutboxTest(TestCase):
+    """
+    События пишутся вместе с изменением и обрабатываются пачками.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        cls.check_in = date.today() + timedelta(days=10)
+
+    def test_events_written_with_changes(self):
+        booking = BookingService.create_booking(self.user, self.room, self.check_in, self.check_in + timedelta(days=2))
+
+        # Отклоненное бронирование не оставляет события
+        with self.assertRaises(ValidationError):
+            BookingService.create_booking(self.user, self.room, self.check_in + timedelta(days=1), self.check_in + timedelta(days=3))
+
+        BookingService.cancel_booking(booking, cancelled_by=self.user)
+
+        self.assertEqual(
+            list(OutboxEvent.objects.values_list('event_type', flat=True)),
+            ['booking.created', 'booking.cancelled'],
+        )
+
+    def test_process_batch(self):
+        BookingService.create_booking(self.user, self.room, self.check_in, self.check_in + timedelta(days=2))
+
+        self.assertEqual(process_batch(batch_size=10), 1)
+        self.assertEqual(process_batch(batch_size=10), 0)
+        self.assertIsNotNone(OutboxEvent.objects.get().processed_at)
+
+    def test_bulk_cancel_payload_matches_single_cancel(self):
+        single = BookingService.create_booking(self.user, self.room, self.check_in, self.check_in + timedelta(days=2))
+        bulk = BookingService.create_booking(
+            self.user, self.room, self.check_in + timedelta(days=5), self.check_in + timedelta(days=7)
+        )
+
+        BookingService.cancel_booking(single, cancelled_by=self.user)
+        BookingService.cancel_bookings(Booking.objects.filter(pk=bulk.pk), cancelled_by=self.user)
+
+        single_event, bulk_event = OutboxEvent.objects.filter(event_type='booking.cancelled').order_by('id')
+        self.assertEqual(set(bulk_event.payload), set(single_event.payload))
+        self.assertEqual(bulk_event.payload['user_id'], self.user.pk)
+        self.assertEqual(bulk_event.payload['check_in'], str(bulk.check_in))
+
+    @override_settings(BOOKING_OUTBOX={
+        'HANDLERS': [
+            'apps.bookings.tests.test_services.record_handler',
+            'apps.bookings.tests.test_services.flaky_handler',
+        ],
+        'MAX_ATTEMPTS': 2,
+    })
+    def test_failed_handler_retried_alone_until_dead(self):
+        HANDLER_CALLS.clear()
+        BookingService.create_booking(self.user, self.room, self.check_in, self.check_in + timedelta(days=2))
+
+        with self.assertLogs('apps.bookings.outbox', 'ERROR'):
+            process_batch()
+            process_batch()
+
+        event = OutboxEvent.objects.get()
+        # Успешный обработчик не повторяется, упавший - до MAX_ATTEMPTS
+        self.assertEqual(HANDLER_CALLS, ['record', 'flaky', 'flaky'])
+        self.assertEqual(event.completed_handlers, ['apps.bookings.tests.test_services.record_handler'])
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(list(dead_events()), [event])
+        self.assertEqual(process_batch(), 0)
+
+
+class OccupancyIndexTest(TestCase):
+    """
+    Индекс занятости: построение, точечное обновление и отказ в пользу SQL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.rooms = [
+            Room.objects.create(room_number=f'{101 + i}', price_per_night=Decimal('100.00'), capacity=2)
+            for i in range(3)
+        ]
+        cls.check_in = timezone.localdate() + timedelta(days=10)
+        cls.check_out = cls.check_in + timedelta(days=3)
+        Booking.objects.create(
+            user=cls.user,
+            room=cls.rooms[0],
+            check_in=cls.check_in,
+            check_out=cls.check_out,
+            total_price=Decimal('300.00'),
+        )
+
+    def setUp(self):
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir, ignore_errors=True)
+        index_settings = override_settings(OCCUPANCY_INDEX={
+            **settings.OCCUPANCY_INDEX, 'ENABLED': True, 'DIR': index_dir, 'HORIZON_DAYS': 60,
+        })
+        index_settings.enable()
+        self.addCleanup(index_settings.disable)
+
+    def test_rebuild_and_refresh(self):
+        self.assertIsNone(occupancy_index.occupied_room_ids(self.check_in, self.check_out))
+
+        occupancy_index.rebuild()
+        self.assertEqual(occupancy_index.occupied_room_ids(self.check_in, self.check_out), {self.rooms[0].pk})
+        self.assertEqual(occupancy_index.occupied_room_ids(self.check_out, self.check_out + timedelta(days=2)), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingService.create_booking(self.user, self.rooms[1], self.check_in, self.check_out)
+
+        self.assertEqual(
+            occupancy_index.occupied_room_ids(self.check_in, self.check_out),
+            {self.rooms[0].pk, self.rooms[1].pk}
+        )
+
+    def test_falls_back_outside_horizon_and_when_old(self):
+        occupancy_index.rebuild()
+        far = timezone.localdate() + timedelta(days=59)
+        self.assertIsNone(occupancy_index.occupied_room_ids(far, far + timedelta(days=2)))
+
+        with mock.patch('apps.bookings.occupancy.time.time', return_value=10 ** 12):
+            self.assertIsNone(occupancy_index.occupied_room_ids(self.check_in, self.check_out))
+
+    def test_not_trusted_until_bookings_version_matches(self):
+        occupancy_index.rebuild()
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            BookingService.create_booking(self.user, self.rooms[1], self.check_in, self.check_out)
+            # До коммита и пересчета строк индекс уже не отвечает
+            self.assertIsNone(occupancy_index.occupied_room_ids(self.check_in, self.check_out))
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            occupancy_index.occupied_room_ids(self.check_in, self.check_out),
+            {self.rooms[0].pk, self.rooms[1].pk}
+        )
+
+    def test_missed_change_waits_for_rebuild(self):
+        occupancy_index.rebuild()
+
+        # Изменение на другом хосте: версия растет, а этот файл не пересчитан
+        occupancy_index.bump()
+        self.assertIsNone(occupancy_index.occupied_room_ids(self.check_in, self.check_out))
+
+        # Свое изменение поверх пропущенного не делает файл снова актуальным
+        with self.captureOnCommitCallbacks(execute=True):
+            BookingService.create_booking(self.user, self.rooms[1], self.check_in, self.check_out)
+        self.assertIsNone(occupancy_index.occupied_room_ids(self.check_in, self.check_out))
+
+        occupancy_index.rebuild()
+        self.assertEqual(
+            occupancy_index.occupied_room_ids(self.check_in, self.check_out),
+            {self.rooms[0].pk, self.rooms[1].pk}
+        )
+
+    def test_rebuild_reads_bookings_under_file_lock(self):
+        """
+        refresh_rooms, пришедший во время rebuild(), ждет блокировку и не
+        перезаписывается данными, прочитанными до него.
+        """
+        original_lock = occupancy_index._file_lock
+        locked_queries = []
+
+        @contextmanager
+        def recording_lock():
+            with original_lock(), CaptureQueriesContext(connection) as context:
+                yield
+            locked_queries.extend(query['sql'] for query in context.captured_queries)
+
+        with mock.patch.object(occupancy_index, '_file_lock', recording_lock):
+            occupancy_index.rebuild()
+
+        self.assertTrue(any('FROM "bookings"' in sql for sql in locked_queries), locked_queries)
@@ -0,0 +1,569 @@
+import csv
+import io
+import json
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APITestCase
+
+from apps.bookings.models import Booking, IdempotencyKey
+from apps.bookings.serializers import BookingGroupCreateSerializer, BookingListSerializer, BookingSerializer
+from apps.bookings.services import BookingService
+from apps.rooms.catalog import room_catalog
+from apps.rooms.models import Room
+from apps.users.models import User
+
+
+class BookingSparseFieldsetTest(APITestCase):
+    """
+    ?fields= и ?expand= сокращают ответ и запрос к БД.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        check_in = date.today() + timedelta(days=10)
+        cls.booking = Booking.objects.create(
+            user=cls.user,
+            room=cls.room,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=2),
+            total_price=Decimal('200.00'),
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+        self.url = reverse('booking-detail', args=[self.booking.pk])
+
+    def test_without_params_response_is_unchanged(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['room']['room_number'], '101')
+        self.assertEqual(response.data['user']['username'], 'guest')
+
+    def test_fields_prune_response_and_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, {'fields': 'id,check_in,nights_count'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'id', 'check_in', 'nights_count'})
+        self.assertEqual(response.data['nights_count'], 2)
+
+        self.assertEqual(len(context.captured_queries), 1)
+        sql = context.captured_queries[0]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"total_price"', sql)
+
+    def test_expand(self):
+        response = self.client.get(self.url, {'fields': 'id,room,user', 'expand': 'room'})
+
+        self.assertEqual(response.data['room']['room_number'], '101')
+        self.assertEqual(response.data['user'], self.user.pk)
+
+    def test_list_fields(self):
+        response = self.client.get(reverse('booking-list'), {'fields': 'id,room_number'})
+
+        self.assertEqual(response.data['results'], [{'id': self.booking.pk, 'room_number': '101'}])
+
+
+class BookingListFastPathTest(APITestCase):
+    """
+    Список бронирований через values() совпадает с сериализатором DRF байт в байт.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        today = date.today()
+        # Прошедшее, текущее и будущее бронирование
+        for check_in in (today - timedelta(days=5), today - timedelta(days=1), today + timedelta(days=10)):
+            Booking.objects.create(
+                user=cls.user,
+                room=cls.room,
+                check_in=check_in,
+                check_out=check_in + timedelta(days=2),
+                total_price=Decimal('200.00'),
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_matches_serializer(self):
+        for params in ({}, {'ordering': 'check_in'}, {'cursor': ''}, {'fields': 'id,nights_count'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('booking-list'), params)
+
+                queryset = Booking.objects.select_related('room').order_by(params.get('ordering', '-created_at'), 'pk')
+                serializer = BookingListSerializer(
+                    queryset, many=True, context={'request': Request(response.wsgi_request)}
+                )
+                self.assertEqual(
+                    JSONRenderer().render(response.data['results']),
+                    JSONRenderer().render(serializer.data),
+                )
+
+
+class BookingExportTest(APITestCase):
+    """
+    Потоковая выгрузка бронирований: NDJSON, CSV, фильтры и доступ.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='pass12345', is_staff=True
+        )
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        check_in = date.today() + timedelta(days=10)
+        cls.bookings = [
+            Booking.objects.create(
+                user=cls.user,
+                room=cls.room,
+                check_in=check_in + timedelta(days=3 * i),
+                check_out=check_in + timedelta(days=3 * i + 2),
+                total_price=Decimal('200.00'),
+                status='cancelled' if i == 2 else 'active',
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.url = reverse('booking-export')
+        self.client.force_authenticate(self.admin)
+
+    def test_ndjson(self):
+        response = self.client.get(self.url, {'status': 'active'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [booking.pk for booking in self.bookings[:2]])
+        self.assertEqual(rows[0]['username'], 'guest')
+        self.assertEqual(rows[0]['total_price'], '200.00')
+        self.assertEqual(rows[0]['nights_count'], 2)
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'export_format': 'csv'})
+
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2]['status'], 'cancelled')
+        self.assertEqual(rows[0]['cancelled_at'], '')
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.user)
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class BookingAdminChangelistTest(APITestCase):
+    """
+    Список бронирований в админке: поиск подзапросами и фильтр по периоду.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pass12345')
+        cls.user = User.objects.create_user(
+            username='guest', email='guest@example.com', password='pass12345', last_name='Петров'
+        )
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        check_in = date.today() + timedelta(days=10)
+        cls.booking = Booking.objects.create(
+            user=cls.user,
+            room=cls.room,
+            check_in=check_in,
+            check_out=check_in + timedelta(days=2),
+            total_price=Decimal('200.00'),
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:bookings_booking_changelist')
+
+    def changelist_ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [booking.pk for booking in response.context['cl'].result_list]
+
+    def test_search(self):
+        self.assertEqual(self.changelist_ids(q='петр'), [self.booking.pk])
+        self.assertEqual(self.changelist_ids(q='10'), [self.booking.pk])
+        self.assertEqual(self.changelist_ids(q='guest 101'), [self.booking.pk])
+        self.assertEqual(self.changelist_ids(q='nobody'), [])
+
+    def test_search_long_number(self):
+        self.assertEqual(self.changelist_ids(q='9' * 30), [])
+        self.assertEqual(self.changelist_ids(q='²'), [])
+
+    def test_created_period_filter(self):
+        created = timezone.localtime(self.booking.created_at)
+        self.assertEqual(self.changelist_ids(created=f'{created.year}-{created.month:02d}'), [self.booking.pk])
+        self.assertEqual(self.changelist_ids(created=str(created.year - 1)), [])
+
+    def test_created_period_filter_last_year(self):
+        self.assertEqual(self.changelist_ids(created='9999'), [])
+        self.assertEqual(self.changelist_ids(created='9999-12'), [])
+
+
+class IdempotencyKeyTest(APITestCase):
+    """
+    Idempotency-Key: повтор, другое тело и прерванный запрос.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+
+    def setUp(self):
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('booking-create')
+        check_in = date.today() + timedelta(days=10)
+        self.payload = {
+            'room': self.room.pk,
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+        }
+
+    def post(self, payload, key='key-1'):
+        return self.client.post(self.url, payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay_returns_saved_response(self):
+        first = self.post(self.payload)
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        with self.assertNumQueries(1):
+            second = self.post(self.payload)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_different_payload_is_rejected(self):
+        self.post(self.payload)
+        other = dict(self.payload, check_out=(date.today() + timedelta(days=13)).isoformat())
+
+        response = self.post(other)
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_error_response_frees_key(self):
+        invalid = dict(self.payload, room=0)
+        self.assertEqual(self.post(invalid).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_interrupted_request_rolls_back_key_and_booking(self):
+        with mock.patch('apps.bookings.views.BookingSerializer', side_effect=RuntimeError('worker died')):
+            with self.assertRaises(RuntimeError):
+                self.post(self.payload)
+
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        response = self.post(self.payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response.headers)
+
+
+class IdempotencyKeyConcurrencyTest(TransactionTestCase):
+    """
+    Параллельный дубль ждет первый запрос и получает его ответ.
+    """
+
+    def setUp(self):
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+        self.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        self.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        check_in = date.today() + timedelta(days=10)
+        self.payload = {
+            'room': self.room.pk,
+            'check_in': check_in.isoformat(),
+            'check_out': (check_in + timedelta(days=2)).isoformat(),
+        }
+
+    def test_concurrent_duplicate_replays(self):
+        started = threading.Event()
+        release = threading.Event()
+        responses = {}
+
+        class SlowSerializer(BookingSerializer):
+            def __init__(self, *args, **kwargs):
+                started.set()
+                release.wait(5)
+                super().__init__(*args, **kwargs)
+
+        def post(name):
+            client = APIClient()
+            client.force_authenticate(self.user)
+            try:
+                responses[name] = client.post(
+                    reverse('booking-create'), self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1'
+                )
+            finally:
+                connection.close()
+
+        with mock.patch('apps.bookings.views.BookingSerializer', SlowSerializer):
+            first = threading.Thread(target=post, args=('first',))
+            first.start()
+            self.assertTrue(started.wait(5))
+
+            second = threading.Thread(target=post, args=('second',))
+            second.start()
+            # Второй запрос успевает дойти до вставки ключа и ждет первый
+            time.sleep(0.3)
+            release.set()
+            first.join(10)
+            second.join(10)
+
+        self.assertEqual(responses['first'].status_code, status.HTTP_201_CREATED)
+        self.assertEqual(responses['second'].status_code, status.HTTP_201_CREATED)
+        self.assertEqual(responses['second'].headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(responses['second'].data, responses['first'].data)
+        self.assertEqual(Booking.objects.count(), 1)
+
+
+class BookingGroupCreateViewTest(APITestCase):
+    """
+    Групповое бронирование: все или ничего, проверка списка комнат.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        cls.rooms = [
+            Room.objects.create(room_number=f'{101 + i}', price_per_night=Decimal('100.00'), capacity=2)
+            for i in range(3)
+        ]
+        cls.check_in = date.today() + timedelta(days=10)
+        cls.check_out = cls.check_in + timedelta(days=2)
+
+    def setUp(self):
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+        self.client.force_authenticate(self.user)
+        self.url = reverse('booking-group-create')
+
+    def post(self, room_ids):
+        return self.client.post(self.url, {
+            'rooms': room_ids,
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+        }, format='json')
+
+    def test_creates_all_rooms(self):
+        response = self.post([room.pk for room in self.rooms])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['bookings']), 3)
+        self.assertEqual(response.data['total_price'], '600.00')
+        self.assertEqual(response.data['bookings'][0]['total_price'], '200.00')
+        self.assertEqual(Booking.objects.filter(user=self.user).count(), 3)
+
+    def test_conflict_rolls_back_group(self):
+        Booking.objects.create(
+            user=self.other,
+            room=self.rooms[1],
+            check_in=self.check_in,
+            check_out=self.check_out,
+            total_price=Decimal('200.00'),
+        )
+
+        response = self.post([room.pk for room in self.rooms])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(self.rooms[1].room_number, response.data['rooms'][0])
+        self.assertFalse(Booking.objects.filter(user=self.user).exists())
+
+    def test_held_room_rolls_back_group(self):
+        BookingService.create_hold(self.other, self.rooms[2], self.check_in, self.check_out)
+
+        response = self.post([room.pk for room in self.rooms])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(self.rooms[2].room_number, response.data['rooms'][0])
+        self.assertFalse(Booking.objects.filter(user=self.user).exists())
+
+    def test_duplicate_rooms(self):
+        response = self.post([self.rooms[0].pk, self.rooms[0].pk])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rooms', response.data)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_missing_rooms(self):
+        missing = max(room.pk for room in self.rooms) + 1
+
+        response = self.post([self.rooms[0].pk, missing])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(missing), str(response.data['rooms']))
+        self.assertFalse(Booking.objects.exists())
+
+    def test_room_limit(self):
+        response = self.post(list(range(1, BookingGroupCreateSerializer.MAX_ROOMS + 2)))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('rooms', response.data)
+
+
+class BookingBulkCancelTest(APITestCase):
+    """
+    Массовая отмена: результат по каждому id, только для администраторов, действие админки.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='pass12345')
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        check_in = date.today() + timedelta(days=10)
+        cls.active, cls.cancelled, cls.later = [
+            Booking.objects.create(
+                user=user,
+                room=cls.room,
+                check_in=check_in + timedelta(days=offset),
+                check_out=check_in + timedelta(days=offset + 2),
+                total_price=Decimal('200.00'),
+            )
+            for user, offset in [(cls.user, 0), (cls.user, 2), (cls.other, 5)]
+        ]
+        Booking.objects.filter(pk=cls.cancelled.pk).update(
+            status='cancelled', cancelled_by=cls.user, cancelled_at=timezone.now()
+        )
+
+    def setUp(self):
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+        self.url = reverse('booking-bulk-cancel')
+
+    def test_results_per_id(self):
+        self.client.force_authenticate(self.admin)
+        missing = self.later.pk + 1
+
+        response = self.client.post(
+            self.url, {'ids': [missing, self.cancelled.pk, self.active.pk]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cancelled_count'], 1)
+        self.assertEqual(response.data['results'], [
+            {'id': self.active.pk, 'result': 'cancelled'},
+            {'id': self.cancelled.pk, 'result': 'already_cancelled'},
+            {'id': missing, 'result': 'not_found'},
+        ])
+        self.active.refresh_from_db()
+        self.assertEqual(self.active.status, 'cancelled')
+        self.assertEqual(self.active.cancelled_by, self.admin)
+        self.later.refresh_from_db()
+        self.assertEqual(self.later.status, 'active')
+
+    def test_room_and_period(self):
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.post(self.url, {
+            'room': self.room.pk,
+            'date_from': self.later.check_in.isoformat(),
+        }, format='json')
+
+        self.assertEqual(response.data['results'], [{'id': self.later.pk, 'result': 'cancelled'}])
+        self.active.refresh_from_db()
+        self.assertEqual(self.active.status, 'active')
+
+    def test_regular_user_cannot_cancel_others(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.post(self.url, {'ids': [self.later.pk]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.later.refresh_from_db()
+        self.assertEqual(self.later.status, 'active')
+
+    def test_admin_action(self):
+        self.client.force_login(self.admin)
+
+        response = self.client.post(reverse('admin:bookings_booking_changelist'), {
+            'action': 'cancel_selected',
+            '_selected_action': [self.active.pk, self.cancelled.pk],
+        }, follow=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [str(message) for message in response.context['messages']],
+            ['Отменено бронирований: 1. Уже были отменены: 1.']
+        )
+        self.assertEqual(
+            set(Booking.objects.filter(status='cancelled').values_list('pk', flat=True)),
+            {self.active.pk, self.cancelled.pk}
+        )
+
+
+class BookingConflictAlternativesTest(APITestCase):
+    """
+    Ответ 400 при конфликте содержит варианты: свободные даты комнаты и похожие комнаты.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.room = Room.objects.create(room_number='101', price_per_night=Decimal('100.00'), capacity=2)
+        cls.similar = Room.objects.create(room_number='102', price_per_night=Decimal('110.00'), capacity=2)
+        Room.objects.create(room_number='103', price_per_night=Decimal('500.00'), capacity=2)
+        cls.check_in = date.today() + timedelta(days=10)
+        Booking.objects.create(
+            user=cls.user,
+            room=cls.room,
+            check_in=cls.check_in,
+            check_out=cls.check_in + timedelta(days=3),
+            total_price=Decimal('300.00'),
+        )
+
+    def setUp(self):
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+        self.client.force_authenticate(self.user)
+
+    def test_conflict_returns_alternatives(self):
+        response = self.client.post(reverse('booking-create'), {
+            'room': self.room.pk,
+            'check_in': (self.check_in + timedelta(days=1)).isoformat(),
+            'check_out': (self.check_in + timedelta(days=3)).isoformat(),
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(str(self.check_in), response.data['room'][0])
+        # Ближайшие к запрошенному заезду свободные 2 ночи: сразу после брони, затем перед ней
+        self.assertEqual(response.data['alternatives']['same_room'], [
+            {
+                'check_in': (self.check_in + timedelta(days=3)).isoformat(),
+                'check_out': (self.check_in + timedelta(days=5)).isoformat(),
+            },
+            {
+                'check_in': (self.check_in - timedelta(days=2)).isoformat(),
+                'check_out': self.check_in.isoformat(),
+            },
+        ])
+        self.assertEqual([room['id'] for room in response.data['alternatives']['similar_rooms']], [self.similar.pk])
+
@@ -1,6 +1,12 @@
 from django.urls import path
 from .views import (
     BookingCreateView,
+    BookingGroupCreateView,
+    BookingBulkCancelView,
+    BookingExportView,
+    BookingHoldCreateView,
+    BookingHoldReleaseView,
+    BookingHoldConfirmView,
     BookingListView,
     BookingDetailView,
     BookingUpdateView,
@@ -10,6 +16,12 @@ from .views import (
 urlpatterns = [
     path('', BookingListView.as_view(), name='booking-list'),
     path('create/', BookingCreateView.as_view(), name='booking-create'),
+    path('group/', BookingGroupCreateView.as_view(), name='booking-group-create'),
+    path('bulk-cancel/', BookingBulkCancelView.as_view(), name='booking-bulk-cancel'),
+    path('export/', BookingExportView.as_view(), name='booking-export'),
+    path('holds/', BookingHoldCreateView.as_view(), name='booking-hold-create'),
+    path('holds/<int:pk>/', BookingHoldReleaseView.as_view(), name='booking-hold-release'),
+    path('holds/<int:pk>/confirm/', BookingHoldConfirmView.as_view(), name='booking-hold-confirm'),
     path('<int:pk>/', BookingDetailView.as_view(), name='booking-detail'),
     path('<int:pk>/update/', BookingUpdateView.as_view(), name='booking-update'),
     path('<int:pk>/cancel/', BookingCancelView.as_view(), name='booking-cancel'),
@@ -1,25 +1,50 @@
 import logging
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.filters import OrderingFilter
-from drf_spectacular.utils import extend_schema, extend_schema_view
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from drf_spectacular.types import OpenApiTypes
 
-from .models import Booking
+from .models import Booking, BookingHold
+from apps.core.pagination import KeysetPagination
+from apps.core.fast import FastListMixin
+from apps.core.sparse import SPARSE_PARAMETERS, SparseFieldsetViewMixin
 from .serializers import (
     BookingSerializer,
     BookingListSerializer,
     BookingCreateSerializer,
     BookingUpdateSerializer,
+    BookingGroupCreateSerializer,
+    BookingGroupResultSerializer,
+    BookingBulkCancelSerializer,
+    BookingExportSerializer,
+    BookingHoldSerializer,
+    BookingHoldCreateSerializer,
+    raise_booking_conflict,
 )
 from .permissions import IsOwnerOrAdmin
 from .services import BookingService
 from .filters import BookingFilter
+from .idempotency import IdempotencyMixin, IDEMPOTENCY_HEADER
+from .export import EXPORT_FORMATS, iter_rows, stream_csv, stream_ndjson
 
 logger = logging.getLogger(__name__)
 
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    name=IDEMPOTENCY_HEADER,
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description='Уникальный ключ запроса. Повтор с тем же ключом вернет сохраненный ответ.'
+)
+
 
 @extend_schema(tags=['Bookings'])
 @extend_schema_view(
@@ -27,10 +52,11 @@ logger = logging.getLogger(__name__)
         summary="Создать бронирование",
         description="Создание нового бронирования комнаты.",
         request=BookingCreateSerializer,
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={201: BookingSerializer}
     )
 )
-class BookingCreateView(generics.CreateAPIView):
+class BookingCreateView(IdempotencyMixin, generics.CreateAPIView):
     """ Создание нового бронирования. """
     queryset = Booking.objects.all()
     serializer_class = BookingCreateSerializer
@@ -40,6 +66,9 @@ class BookingCreateView(generics.CreateAPIView):
         serializer.save()
 
     def create(self, request, *args, **kwargs):
+        return self.idempotent(request, lambda: self._create(request))
+
+    def _create(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         booking = serializer.save()
@@ -52,14 +81,48 @@ class BookingCreateView(generics.CreateAPIView):
         )
 
 
+@extend_schema(tags=['Bookings'])
+@extend_schema_view(
+    post=extend_schema(
+        summary="Групповое бронирование",
+        description="Бронирование нескольких комнат на одни даты. Все бронирования создаются или не создается ни одно.",
+        request=BookingGroupCreateSerializer,
+        responses={201: BookingGroupResultSerializer}
+    )
+)
+class BookingGroupCreateView(generics.CreateAPIView):
+    """
+    Групповое бронирование (до 40 комнат за один запрос).
+
+    Конфликты по всем комнатам проверяются одним запросом,
+    бронирования создаются одной вставкой в одной транзакции.
+    """
+    queryset = Booking.objects.all()
+    serializer_class = BookingGroupCreateSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        bookings = serializer.save()
+
+        output_serializer = BookingGroupResultSerializer({
+            'bookings': bookings,
+            'total_price': sum(booking.total_price for booking in bookings),
+        })
+
+        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+
+
 @extend_schema(tags=['Bookings'])
 @extend_schema_view(
     get=extend_schema(
         summary="Список своих бронирований",
         description="Получение списка бронирований текущего пользователя с фильтрацией и сортировкой.",
+        parameters=SPARSE_PARAMETERS,
     )
 )
-class BookingListView(generics.ListAPIView):
+class BookingListView(FastListMixin, SparseFieldsetViewMixin, generics.ListAPIView):
     """
     Список бронирований текущего пользователя.
 
@@ -67,9 +130,14 @@ class BookingListView(generics.ListAPIView):
     - Фильтрацию по статусу (status=active|cancelled)
     - Фильтрацию по датам (check_in_after, check_out_before)
     - Сортировку (ordering=-created_at, check_in, -check_in, etc.)
+    - Постраничную выдачу по номеру страницы (page) или по курсору (cursor)
+    - Выбор полей ответа (fields)
+
+    Строки списка строятся из values() без экземпляров модели (FastListMixin).
     """
     serializer_class = BookingListSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = BookingFilter
     ordering_fields = ['created_at', 'check_in', 'check_out', 'total_price']
@@ -95,14 +163,17 @@ class BookingListView(generics.ListAPIView):
     get=extend_schema(
         summary="Детали бронирования",
         description="Получение подробной информации о конкретном бронировании. Доступно только владельцу или администратору.",
+        parameters=SPARSE_PARAMETERS,
     )
 )
-class BookingDetailView(generics.RetrieveAPIView):
+class BookingDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     """Информация о бронировании."""
     queryset = Booking.objects.select_related('room', 'user', 'cancelled_by')
     serializer_class = BookingSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
     lookup_field = 'pk'
+    # IsOwnerOrAdmin сравнивает user_id
+    sparse_required_fields = ('user',)
 
 
 @extend_schema(tags=['Bookings'])
@@ -111,16 +182,18 @@ class BookingDetailView(generics.RetrieveAPIView):
         summary="Изменить даты бронирования",
         description="Обновление дат существующего бронирования. Доступно только владельцу или администратору. Только для активных бронирований.",
         request=BookingUpdateSerializer,
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={200: BookingSerializer}
     ),
     put=extend_schema(
         summary="Изменить даты бронирования (полное обновление)",
         description="Полное обновление дат бронирования.",
         request=BookingUpdateSerializer,
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
         responses={200: BookingSerializer}
     )
 )
-class BookingUpdateView(generics.UpdateAPIView):
+class BookingUpdateView(IdempotencyMixin, generics.UpdateAPIView):
     """
     Обновление дат бронирования.
 
@@ -129,7 +202,7 @@ class BookingUpdateView(generics.UpdateAPIView):
     - Бронирование должно быть активным
     - Новые даты не должны конфликтовать с другими бронированиями
     """
-    queryset = Booking.objects.all()
+    queryset = Booking.objects.select_related('room')
     serializer_class = BookingUpdateSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
     lookup_field = 'pk'
@@ -137,6 +210,9 @@ class BookingUpdateView(generics.UpdateAPIView):
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
+        return self.idempotent(request, lambda: self._update(request, partial))
+
+    def _update(self, request, partial):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
@@ -196,3 +272,195 @@ class BookingCancelView(APIView):
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+
+@extend_schema(tags=['Bookings'])
+class BookingBulkCancelView(APIView):
+    """
+    Массовая отмена бронирований (например, комната выведена из эксплуатации).
+
+    Все выбранные активные бронирования отменяются одним запросом,
+    в ответе - результат по каждому id.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(
+        summary="Массовая отмена бронирований",
+        description="Отмена бронирований по списку id или всех активных бронирований комнаты за период. Только для администраторов.",
+        request=BookingBulkCancelSerializer,
+        responses={200: OpenApiTypes.OBJECT}
+    )
+    def post(self, request):
+        serializer = BookingBulkCancelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = BookingService.cancel_bookings(
+            serializer.get_queryset(),
+            cancelled_by=request.user
+        )
+
+        # id из запроса, которых нет в БД
+        for booking_id in serializer.validated_data.get('ids', []):
+            results.setdefault(booking_id, 'not_found')
+
+        return Response({
+            'cancelled_count': sum(1 for result in results.values() if result == 'cancelled'),
+            'results': [
+                {'id': booking_id, 'result': result}
+                for booking_id, result in sorted(results.items())
+            ]
+        }, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=['Bookings'])
+@extend_schema_view(
+    get=extend_schema(
+        summary="Выгрузка бронирований",
+        description="Потоковая выгрузка всех бронирований (NDJSON или CSV) с фильтрами списка. Только для администраторов.",
+        parameters=[
+            OpenApiParameter(
+                name='export_format',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=list(EXPORT_FORMATS),
+                description='Формат выгрузки: ndjson (по умолчанию) или csv'
+            ),
+        ],
+        responses={(200, media_type): OpenApiTypes.STR for media_type in EXPORT_FORMATS.values()},
+    )
+)
+class BookingExportView(generics.GenericAPIView):
+    """
+    Выгрузка бронирований для финансов и аналитики.
+
+    Вместо обхода постраничного списка - один потоковый ответ:
+    строки читаются серверным курсором пачками по BOOKING_EXPORT_CHUNK_SIZE
+    и сразу отдаются клиенту. Принимает фильтры BookingFilter.
+    """
+    queryset = Booking.objects.all()
+    serializer_class = BookingExportSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    pagination_class = None
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = BookingFilter
+
+    def get(self, request):
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'export_format': f'Допустимые значения: {", ".join(EXPORT_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        serializer = self.get_serializer()
+        rows = iter_rows(queryset, serializer, settings.BOOKING_EXPORT_CHUNK_SIZE)
+
+        if export_format == 'csv':
+            content = stream_csv(rows, list(serializer.fields))
+        else:
+            content = stream_ndjson(rows)
+
+        logger.info(f'Booking export ({export_format}) started by {request.user.username}')
+
+        response = StreamingHttpResponse(content, content_type=f'{EXPORT_FORMATS[export_format]}; charset=utf-8')
+        filename = f'bookings-{timezone.localdate():%Y%m%d}.{export_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@extend_schema(tags=['Bookings'])
+@extend_schema_view(
+    post=extend_schema(
+        summary="Зарезервировать комнату",
+        description="Временный резерв комнаты на время оплаты. Резерв действует BOOKING_HOLD_TTL секунд.",
+        request=BookingHoldCreateSerializer,
+        responses={201: BookingHoldSerializer}
+    )
+)
+class BookingHoldCreateView(generics.CreateAPIView):
+    """ Создание временного резерва комнаты. """
+    queryset = BookingHold.objects.all()
+    serializer_class = BookingHoldCreateSerializer
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        hold = serializer.save()
+
+        output_serializer = BookingHoldSerializer(hold)
+
+        return Response(
+            output_serializer.data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class BookingHoldMixin:
+    """
+    Получение резерва по pk с проверкой прав владельца.
+    """
+
+    def get_hold(self, request, pk):
+        try:
+            hold = BookingHold.objects.select_related('room', 'user').get(pk=pk)
+        except BookingHold.DoesNotExist:
+            return None
+
+        self.check_object_permissions(request, hold)
+        return hold
+
+
+@extend_schema(tags=['Bookings'])
+class BookingHoldReleaseView(BookingHoldMixin, APIView):
+    """ Досрочное снятие резерва. """
+    permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+
+    @extend_schema(
+        summary="Снять резерв",
+        description="Снятие временного резерва до истечения срока. Доступно только владельцу или администратору.",
+        responses={204: None}
+    )
+    def delete(self, request, pk):
+        hold = self.get_hold(request, pk)
+        if hold is None:
+            return Response(
+                {'error': 'Резерв не найден.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        BookingService.release_hold(hold)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@extend_schema(tags=['Bookings'])
+class BookingHoldConfirmView(BookingHoldMixin, APIView):
+    """ Превращение резерва в бронирование после оплаты. """
+    permission_classes = [IsAuthenticated, IsOwnerOrAdmin]
+
+    @extend_schema(
+        summary="Подтвердить резерв",
+        description="Создание бронирования по действующему резерву. Резерв при этом удаляется.",
+        request=None,
+        responses={201: BookingSerializer}
+    )
+    def post(self, request, pk):
+        hold = self.get_hold(request, pk)
+        if hold is None:
+            return Response(
+                {'error': 'Резерв не найден.'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            booking = BookingService.convert_hold(hold)
+        except DjangoValidationError as e:
+            raise_booking_conflict(e, 'room', hold.room, hold.check_in, hold.check_out)
+
+        return Response(
+            BookingSerializer(booking).data,
+            status=status.HTTP_201_CREATED
+        )
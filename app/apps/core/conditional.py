@@ -0,0 +1,90 @@
+"""
+Условные GET-запросы: ETag / Last-Modified и ответ 304 без сериализации.
+
+Представление описывает состояние данных (get_conditional_state) - строку,
+из которой строится ETag, и время последнего изменения. Если заголовки
+If-None-Match / If-Modified-Since запроса совпадают с состоянием,
+ответ 304 отдается до выборки и сериализации строк.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Миксин GenericAPIView: ETag, Last-Modified и Cache-Control для GET.
+
+    ETag зависит от состояния данных и от полного URL запроса (фильтры,
+    страница, ?fields=) и выбранного формата ответа, поэтому разные
+    представления одних данных не путаются в кэше.
+    """
+    cache_max_age = None
+
+    def get_conditional_state(self):
+        """
+        Returns:
+            (строка состояния, datetime последнего изменения или None)
+        """
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        state, last_modified = self.get_conditional_state()
+        etag = self.make_etag(state)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers['ETag'] = etag
+            if last_modified is not None:
+                response.headers['Last-Modified'] = http_date(last_modified)
+            max_age = settings.ROOMS_CACHE_MAX_AGE if self.cache_max_age is None else self.cache_max_age
+            patch_cache_control(response, public=True, max_age=max_age)
+            patch_vary_headers(response, ['Accept'])
+        return response
+
+    def make_etag(self, state: str) -> str:
+        key = f'{state}|{self.request.build_absolute_uri()}|{self.request.accepted_media_type}'
+        # Слабый ETag: тело может отличаться форматированием, данные - нет
+        return f'W/{quote_etag(hashlib.md5(key.encode()).hexdigest())}'
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """
+    Состояние списка - MAX(updated_at) и количество строк после фильтров.
+
+    Количество меняется при удалении или скрытии строки, поэтому ETag
+    меняется, даже если максимальное updated_at осталось прежним.
+    """
+    last_modified_field = 'updated_at'
+
+    def get_conditional_state(self):
+        state = self.filter_queryset(self.get_queryset()).order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count('pk'),
+        )
+        last_modified = state['last_modified']
+        return f"{state['count']}:{last_modified.isoformat() if last_modified else ''}", last_modified
+
+
+class ConditionalDetailMixin(ConditionalGetMixin):
+    """
+    Состояние объекта - его updated_at. Объект загружается один раз:
+    retrieve() использует уже выбранный экземпляр.
+    """
+    last_modified_field = 'updated_at'
+
+    def get_conditional_state(self):
+        self.conditional_object = self.get_object()
+        last_modified = getattr(self.conditional_object, self.last_modified_field)
+        return f'{self.conditional_object.pk}:{last_modified.isoformat()}', last_modified
+
+    def get_object(self):
+        obj = getattr(self, 'conditional_object', None)
+        return obj if obj is not None else super().get_object()
@@ -0,0 +1,153 @@
+"""
+Быстрая сериализация списков только для чтения.
+
+Вместо создания экземпляров моделей и прохода DRF по каждому полю каждой
+строки список строится из values(): для каждого поля сериализатора заранее
+выбирается колонка и функция преобразования.
+Вычисляемые свойства модели берутся из SQL-выражений (sql_fields
+сериализатора). Результат совпадает с serializer.data байт в байт.
+
+Если поле нельзя свести к колонке (вложенный сериализатор, SerializerMethodField,
+свойство без SQL-выражения), используется обычный путь DRF.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import FileField
+from rest_framework import serializers
+from rest_framework.response import Response
+
+
+def _identity(value):
+    return value
+
+
+class CompiledSerializer:
+    """
+    Сериализатор, сведенный к списку (имя, колонка, преобразование).
+    """
+
+    def __init__(self, model, writers, expressions):
+        self.model = model
+        self.writers = writers
+        self.expressions = expressions
+
+    @classmethod
+    def compile(cls, serializer):
+        """
+        Компиляция привязанного ModelSerializer (с контекстом запроса).
+
+        Returns:
+            CompiledSerializer или None, если какое-то поле не сводится к колонке
+        """
+        model = serializer.Meta.model
+        sql_fields = getattr(serializer, 'sql_fields', None)
+        available = sql_fields() if sql_fields else {}
+
+        writers = []
+        expressions = {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            source = field.source
+            if source in available and isinstance(field, serializers.ReadOnlyField):
+                expressions[source] = available[source]
+                writers.append((name, source, _identity))
+                continue
+
+            if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField)) or source == '*':
+                return None
+
+            if isinstance(field, serializers.RelatedField):
+                if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                    return None
+                # values() по FK возвращает id - то же, что PrimaryKeyRelatedField
+                model_field = cls._model_field(model, field.source_attrs)
+                if model_field is None or not model_field.is_relation:
+                    return None
+                writers.append((name, '__'.join(field.source_attrs), _identity))
+                continue
+
+            model_field = cls._model_field(model, field.source_attrs)
+            if model_field is None:
+                return None
+
+            writers.append((name, '__'.join(field.source_attrs), cls._converter(field, model_field)))
+
+        return cls(model, writers, expressions)
+
+    @staticmethod
+    def _model_field(model, path):
+        field = None
+        for attr in path:
+            try:
+                field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation:
+                model = field.related_model
+        return field
+
+    @staticmethod
+    def _converter(field, model_field):
+        if isinstance(model_field, FileField):
+            # values() возвращает имя файла, DRF ожидает FieldFile
+            def convert_file(value):
+                return field.to_representation(model_field.attr_class(None, model_field, value))
+            return convert_file
+        if type(field) is serializers.IntegerField:
+            return int
+        if type(field) is serializers.CharField:
+            return str
+        if type(field) is serializers.ReadOnlyField:
+            return _identity
+        return field.to_representation
+
+    def values(self, queryset):
+        """
+        Queryset строк-словарей с колонками для полей, сортировки и pk.
+
+        Колонки сортировки и pk нужны пагинации (курсор KeysetPagination).
+        Словари, а не кортежи: пагинация добавляет к строкам свои аннотации
+        (COUNT(*) OVER ()), и values() включает их в строку под своим именем.
+        """
+        if self.expressions:
+            queryset = queryset.annotate(**self.expressions)
+
+        columns = [column for _, column, _ in self.writers]
+        ordering = list(queryset.query.order_by) or list(self.model._meta.ordering)
+        columns += [field.lstrip('-') for field in ordering if isinstance(field, str)]
+        columns.append('pk')
+
+        return queryset.values(*dict.fromkeys(columns))
+
+    def serialize(self, rows):
+        writers = self.writers
+        return [
+            {
+                name: None if (value := row[column]) is None else convert(value)
+                for name, column, convert in writers
+            }
+            for row in rows
+        ]
+
+
+class FastListMixin:
+    """
+    Миксин ListAPIView: list() через CompiledSerializer.
+
+    Фильтры, сортировка, ?fields= и пагинация работают как обычно,
+    меняется только способ построения строк ответа.
+    """
+
+    def list(self, request, *args, **kwargs):
+        compiled = CompiledSerializer.compile(self.get_serializer())
+        if compiled is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = compiled.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page))
+
+        return Response(compiled.serialize(queryset))
@@ -0,0 +1,358 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, Q, QuerySet, Window
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset) -> int:
+    """
+    Оценка количества строк по статистике планировщика, без выполнения запроса.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator Django (админка) с оценкой количества вместо COUNT(*).
+
+    Малые выборки (по оценке меньше exact_threshold) считаются точно, большие -
+    по статистике планировщика. Номер последней страницы при этом приблизительный.
+    """
+    exact_threshold = 10000
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+        estimate = estimate_count(self.object_list)
+        if estimate < self.exact_threshold:
+            return super().count
+        return estimate
+
+
+class WindowCountPagination(PageNumberPagination):
+    """
+    Постраничная выдача без отдельного запроса COUNT(*).
+
+    Общее количество считается оконной функцией COUNT(*) OVER () в том же
+    запросе, что и страница, поэтому тяжелый запрос выполняется один раз.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_annotation = 'total_count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.page_size = page_size
+
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.page_number = int(page_number)
+            if self.page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='Номер страницы должен быть положительным числом.'
+            ))
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(
+            queryset.annotate(**{self.count_annotation: Window(Count('pk'))})[offset:offset + page_size]
+        )
+
+        if rows:
+            # Строки - экземпляры моделей или словари values()
+            first = rows[0]
+            self.count = first[self.count_annotation] if isinstance(first, dict) else getattr(first, self.count_annotation)
+        elif self.page_number == 1:
+            self.count = 0
+        else:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='Страница не содержит результатов.'
+            ))
+
+        return rows
+
+    def get_next_link(self):
+        if self.page_number * self.page_size >= self.count:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Постраничная выдача по ключу (cursor) с запасным режимом по номеру страницы.
+
+    Режим включается параметром cursor (для первой страницы - пустым: ?cursor=).
+    Следующая страница выбирается условием по значениям сортировки последней
+    строки, а не OFFSET, поэтому глубокие страницы не медленнее первой.
+    Сортировка берется из запроса (OrderingFilter) или Meta.ordering модели
+    и дополняется pk, чтобы порядок был однозначным. Поля сортировки
+    должны быть NOT NULL.
+
+    Точного COUNT(*) в этом режиме нет: по ?estimate_count=true в ответ
+    добавляется оценка количества строк из статистики планировщика (EXPLAIN).
+    Без параметра cursor работает как обычная PageNumberPagination: COUNT(*)
+    и страница LIMIT/OFFSET отдельными запросами.
+    """
+    cursor_query_param = 'cursor'
+    estimate_query_param = 'estimate_count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.page_size = page_size
+        self.ordering = self.get_ordering(queryset)
+
+        position, reverse = self.decode_cursor(request.query_params[self.cursor_query_param])
+        if position is not None:
+            position = self.coerce_position(queryset, position)
+
+        self.estimated_count = None
+        if request.query_params.get(self.estimate_query_param) in ('true', '1'):
+            self.estimated_count = estimate_count(queryset)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [self.invert(field) for field in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(ordering, position))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.rows = rows
+        return rows
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError('KeysetPagination поддерживает только сортировку по именам полей.')
+
+        names = [field.lstrip('-') for field in ordering]
+        if 'pk' not in names and 'id' not in names:
+            # Направление pk как у последнего поля: один индексный проход без пересортировки
+            last_descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if last_descending else 'pk')
+        return ordering
+
+    @staticmethod
+    def invert(field: str) -> str:
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def keyset_filter(ordering, position) -> Q:
+        """
+        Строки строго после position в порядке ordering:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+
+        Дополнительное условие a >= x по первому полю дает планировщику
+        границу для индексного диапазона.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+
+        first = ordering[0]
+        bound = 'lte' if first.startswith('-') else 'gte'
+        return Q(**{f'{first.lstrip("-")}__{bound}': position[0]}) & condition
+
+    def position_of(self, row):
+        if isinstance(row, dict):
+            return [self.encode_value(row[field.lstrip('-')]) for field in self.ordering]
+        return [
+            self.encode_value(attrgetter(field.lstrip('-').replace('__', '.'))(row))
+            for field in self.ordering
+        ]
+
+    @staticmethod
+    def encode_value(value):
+        # isoformat сохраняет микросекунды, которые DjangoJSONEncoder отбросил бы
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def encode_cursor(self, position, reverse: bool) -> str:
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, cursor: str):
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, reverse = payload['p'], bool(payload['r'])
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound('Некорректный курсор.')
+        return position, reverse
+
+    def coerce_position(self, queryset, position):
+        """
+        Приводит значения курсора к типам полей сортировки.
+
+        Курсор приходит от клиента: строка вместо pk или даты иначе дошла бы
+        до фильтра и закончилась ошибкой БД (500), а не 404.
+        """
+        values = []
+        for field_name, value in zip(self.ordering, position):
+            field = self.resolve_field(queryset, field_name.lstrip('-'))
+            if value is None or isinstance(value, (list, dict)):
+                raise NotFound('Некорректный курсор.')
+            if field is not None:
+                try:
+                    value = field.to_python(value)
+                    field.run_validators(value)
+                except (ValidationError, TypeError, ValueError):
+                    raise NotFound('Некорректный курсор.')
+            values.append(value)
+        return values
+
+    @staticmethod
+    def resolve_field(queryset, name: str):
+        """
+        Поле модели или аннотации по имени из сортировки (с переходами через __).
+        """
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        field = None
+        for part in name.split('__'):
+            if model is None:
+                return None
+            try:
+                field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        if field is not None and field.is_relation:
+            # Сортировка по FK сравнивает значение ключа связанной модели
+            field = field.target_field
+        return field
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.rows:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.position_of(self.rows[-1]), reverse=False)
+        )
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.rows:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.position_of(self.rows[0]), reverse=True)
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.estimated_count is not None:
+            response['estimated_count'] = self.estimated_count
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['estimated_count'] = {
+            'type': 'integer',
+            'example': 1000,
+            'description': 'Оценка количества строк (режим cursor, ?estimate_count=true)',
+        }
+        response_schema['required'] = ['results']
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters += [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы. Пустое значение - первая страница в режиме cursor.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.estimate_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Добавить оценку количества строк (только в режиме cursor).',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+        return parameters
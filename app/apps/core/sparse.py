@@ -0,0 +1,185 @@
+"""
+Выборочные поля ответа: ?fields= и ?expand=.
+
+- ?fields=id,check_in,check_out - в ответе только перечисленные поля
+- ?expand=room,user - вложенные объекты, перечисленные в expandable_fields
+  сериализатора, отдаются целиком; остальные связи - только id
+
+Без обоих параметров ответ не меняется. Если хотя бы один задан, queryset
+выбирает только нужные колонки (only()) и соединяет только раскрытые
+связи (select_related), поэтому сокращается и ответ, и чтение из БД.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+SPARSE_PARAMETERS = [
+    OpenApiParameter(
+        name=FIELDS_PARAM,
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description='Поля ответа через запятую, например: id,check_in,check_out'
+    ),
+    OpenApiParameter(
+        name=EXPAND_PARAM,
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        required=False,
+        description='Связи, которые нужно вернуть целиком, например: room,user. Остальные связи - только id'
+    ),
+]
+
+
+def parse_sparse_params(request):
+    """
+    Разбор ?fields= и ?expand=.
+
+    Returns:
+        (None, None) - параметры не заданы, ответ без изменений;
+        иначе (fields или None, expand) - множества имен полей
+    """
+    if request is None:
+        return None, None
+
+    params = request.query_params
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None, None
+
+    def split(value):
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+    fields = split(params[FIELDS_PARAM]) if FIELDS_PARAM in params else None
+    expand = split(params.get(EXPAND_PARAM, ''))
+    return fields, expand
+
+
+class SparseFieldsetMixin:
+    """
+    Миксин ModelSerializer для ?fields= и ?expand=.
+
+    Действует только на сериализатор верхнего уровня (или элемент списка),
+    вложенные сериализаторы отдаются как есть.
+
+    expandable_fields - вложенные сериализаторы, которые без ?expand=
+    заменяются на id связанного объекта.
+    field_dependencies - колонки модели, нужные вычисляемым полям
+    (свойствам), для сокращения запроса через only().
+    """
+    expandable_fields = ()
+    field_dependencies = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self._is_sparse_root():
+            return fields
+
+        requested, expand = parse_sparse_params(self.context.get('request'))
+        if expand is None:
+            return fields
+
+        if requested is not None:
+            fields = {name: field for name, field in fields.items() if name in requested}
+
+        for name in self.expandable_fields:
+            if name in fields and name not in expand:
+                source = fields[name].source
+                fields[name] = serializers.PrimaryKeyRelatedField(
+                    read_only=True, **({'source': source} if source else {})
+                )
+
+        return fields
+
+    def _is_sparse_root(self):
+        root = self.root
+        return root is self or (isinstance(root, serializers.ListSerializer) and root.child is self)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Миксин GenericAPIView: сокращение queryset под поля сериализатора.
+
+    Применяется после фильтров и сортировки, чтобы колонки сортировки
+    (нужные и для курсора KeysetPagination) тоже остались в выборке.
+    sparse_required_fields - колонки, нужные самому view (например, для
+    проверки прав), даже если их нет в ответе.
+    """
+    sparse_required_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        if getattr(self, 'swagger_fake_view', False):
+            return queryset
+
+        _, expand = parse_sparse_params(self.request)
+        if expand is None:
+            return queryset
+
+        return prune_queryset(queryset, self.get_serializer(), self.sparse_required_fields)
+
+
+def prune_queryset(queryset, serializer, required_fields=()):
+    """
+    only() и select_related() по полям сериализатора.
+
+    Если источник какого-то поля не удается сопоставить с колонками модели,
+    queryset возвращается без изменений - лишние колонки лучше лишних запросов.
+    """
+    model = queryset.model
+    dependencies = getattr(serializer, 'field_dependencies', {})
+    only = set()
+    related = set()
+
+    def add_path(path):
+        try:
+            model_field = model._meta.get_field(path[0])
+        except FieldDoesNotExist:
+            return False
+        only.add(model_field.name)
+        if len(path) > 1:
+            related.add('__'.join(path[:-1]))
+            only.add('__'.join(path))
+        return True
+
+    for name, field in serializer.fields.items():
+        source = field.source
+        if source == '*':
+            return queryset
+
+        if isinstance(field, serializers.BaseSerializer):
+            # Раскрытая связь: соединяем и загружаем связанный объект целиком
+            related.add(source.replace('.', '__'))
+            only.add(source.split('.')[0])
+            continue
+
+        if source in dependencies:
+            for dependency in dependencies[source]:
+                add_path(dependency.split('__'))
+            continue
+
+        if not add_path(source.split('.')):
+            return queryset
+
+    for name in required_fields:
+        add_path(name.split('__'))
+
+    ordering = list(queryset.query.order_by) or list(model._meta.ordering)
+    for field in ordering:
+        if not isinstance(field, str):
+            return queryset
+        name = field.lstrip('-')
+        if name == 'pk' or name in queryset.query.annotations:
+            # Аннотации (например, search_rank) вычисляются и при only()
+            continue
+        if not add_path(name.split('__')):
+            return queryset
+
+    queryset = queryset.select_related(None)
+    if related:
+        queryset = queryset.select_related(*related)
+    return queryset.only(*only)
@@ -0,0 +1,19 @@
+"""
+Хранилище статики: хэшированные имена и сжатые копии (WhiteNoise).
+"""
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    CompressedManifestStaticFilesStorage, работающее и до collectstatic.
+
+    Пока манифест не собран (свежая копия репозитория, тесты - они идут
+    с DEBUG=False), {% static %} отдает имена без хэша вместо ValueError.
+    После collectstatic манифест строгий: отсутствующий в нем файл - ошибка.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -42,6 +42,19 @@ class RoomAdmin(admin.ModelAdmin):
         }),
     )
 
+    @staticmethod
+    def variant_url(obj, min_width):
+        """
+        URL наименьшей WebP-копии не уже min_width (для экранов 2x - с запасом),
+        пока копий нет - оригинал.
+        """
+        names = obj.image_variants.get('webp') or {}
+        widths = sorted(int(width) for width in names)
+        if not widths:
+            return obj.image.url
+        width = next((width for width in widths if width >= min_width), widths[-1])
+        return obj.image.storage.url(names[str(width)])
+
     def image_preview(self, obj):
         """
         Превью изображения в списке (маленькое).
@@ -49,7 +62,7 @@ class RoomAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit: cover; border-radius: 4px;" />',
-                obj.image.url
+                self.variant_url(obj, 160)
             )
         return '-'
     image_preview.short_description = 'Фото'
@@ -61,7 +74,7 @@ class RoomAdmin(admin.ModelAdmin):
         if obj.image:
             return format_html(
                 '<img src="{}" width="300" style="border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);" />',
-                obj.image.url
+                self.variant_url(obj, 640)
             )
         return 'Изображение не загружено'
     image_preview_large.short_description = 'Текущее изображение'
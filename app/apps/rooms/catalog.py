@@ -0,0 +1,164 @@
+"""
+Каталог комнат в памяти процесса.
+
+Комнат немного (сотни строк), меняются они редко, а читаются на каждом
+запросе к каталогу и при каждом бронировании. Каталог загружает все комнаты
+одним запросом и отдает их из памяти, пока не изменится общая версия.
+
+Версия хранится в кэше из ROOM_CATALOG['CACHE'] (по умолчанию 'availability' -
+файловый кэш в /dev/shm, общий для воркеров хоста; кэш процесса - предупреждение bookings.W001) и увеличивается
+сигналами Room после коммита. Воркер сверяет версию не чаще раза в
+CHECK_INTERVAL секунд, поэтому другие воркеры видят изменение с такой задержкой;
+свой процесс сбрасывает каталог сразу.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Room
+
+
+class CatalogSnapshot:
+    """
+    Неизменяемый срез каталога одной версии.
+    """
+
+    def __init__(self, version: int, rooms: List[Room]):
+        self.version = version
+        self.rooms = {room.pk: room for room in rooms}
+        # Состояние активных комнат - тех, что отдает каталог; скрытые на него не влияют
+        active = [room for room in rooms if room.is_active]
+        self.active_count = len(active)
+        self.active_last_modified = max((room.updated_at for room in active), default=None)
+        # Готовые ответы списков: (URL, формат) -> data, сбрасываются вместе со срезом.
+        # Вытесняются в порядке добавления, когда их больше MAX_RESPONSES
+        self.responses = OrderedDict()
+
+
+class RoomCatalog:
+    """
+    Read-through кэш комнат с общей версией.
+    """
+    PREFIX = 'room_catalog'
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> dict:
+        return settings.ROOM_CATALOG
+
+    @property
+    def enabled(self) -> bool:
+        return self.config['ENABLED']
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE']]
+
+    def version(self) -> int:
+        """
+        Общая версия каталога (как эпоха в AvailabilityCache).
+        """
+        key = f'{self.PREFIX}:version'
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, time.time_ns(), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def bump(self) -> None:
+        """
+        Инвалидация каталога во всех воркерах.
+        """
+        key = f'{self.PREFIX}:version'
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, time.time_ns(), timeout=None)
+        self.clear()
+
+    def clear(self) -> None:
+        """
+        Сброс среза текущего процесса: следующее чтение загрузит комнаты заново.
+        """
+        self._snapshot = None
+        self._checked_at = 0.0
+
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < self.config['CHECK_INTERVAL']:
+            return snapshot
+
+        # Версия читается до загрузки: данные среза не старше его версии
+        version = self.version()
+        self._checked_at = now
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = CatalogSnapshot(version, list(Room.objects.defer('search_vector')))
+                self._snapshot = snapshot
+        return snapshot
+
+    def get(self, pk, active_only: bool = True) -> Optional[Room]:
+        """
+        Комната по id. Возвращается копия: экземпляры среза общие для потоков.
+        """
+        if not self.enabled:
+            queryset = Room.objects.filter(is_active=True) if active_only else Room.objects.all()
+            return queryset.filter(pk=pk).first()
+
+        room = self.snapshot().rooms.get(pk)
+        if room is None or (active_only and not room.is_active):
+            return None
+        return copy.copy(room)
+
+    def get_many(self, pks: Iterable[int], active_only: bool = True) -> List[Room]:
+        """
+        Найденные комнаты по списку id, отсутствующие пропускаются.
+        """
+        if not self.enabled:
+            queryset = Room.objects.filter(is_active=True) if active_only else Room.objects.all()
+            return list(queryset.filter(pk__in=pks))
+
+        rooms = self.snapshot().rooms
+        return [
+            copy.copy(rooms[pk]) for pk in pks
+            if pk in rooms and (rooms[pk].is_active or not active_only)
+        ]
+
+    def cached_response(self, key: str, compute: Callable[[], Optional[dict]]):
+        """
+        Данные ответа списка для key из текущего среза или из compute().
+
+        compute() может вернуть None - такой ответ не кэшируется.
+        """
+        if not self.enabled:
+            return compute()
+
+        responses = self.snapshot().responses
+        data = responses.get(key)
+        if data is not None:
+            return data
+
+        data = compute()
+        if data is not None:
+            with self._lock:
+                responses[key] = data
+                while len(responses) > self.config['MAX_RESPONSES']:
+                    responses.popitem(last=False)
+        return data
+
+
+room_catalog = RoomCatalog()
@@ -1,11 +1,16 @@
 import django_filters
-from .models import Room
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import F, Q
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .models import Room, SEARCH_CONFIG
 
 
 class RoomFilter(django_filters.FilterSet):
     """
     Фильтр для комнат отеля.
-    Поддерживает фильтрацию по диапазону цен и вместимости.
+    Поддерживает фильтрацию по диапазону цен, вместимости и количеству гостей.
     """
     min_price = django_filters.NumberFilter(
         field_name='price_per_night',
@@ -22,6 +27,11 @@ class RoomFilter(django_filters.FilterSet):
         lookup_expr='exact',
         label='Вместимость (точное совпадение)'
     )
+    guests = django_filters.NumberFilter(
+        field_name='capacity',
+        lookup_expr='gte',
+        label='Количество гостей (вместимость не меньше)'
+    )
     is_active = django_filters.BooleanFilter(
         field_name='is_active',
         label='Активна'
@@ -29,4 +39,37 @@ class RoomFilter(django_filters.FilterSet):
 
     class Meta:
         model = Room
-        fields = ['min_price', 'max_price', 'capacity', 'is_active']
+        fields = ['min_price', 'max_price', 'capacity', 'guests', 'is_active']
+
+
+class RoomSearchFilter(SearchFilter):
+    """
+    Поиск комнат (search=) по полнотекстовому индексу и триграммам.
+
+    - слова запроса ищутся в search_vector (номер и описание, морфология
+      русского языка) - GIN-индекс вместо ILIKE по описанию;
+    - строка запроса целиком ищется как часть номера комнаты
+      (icontains по триграммному индексу на UPPER(room_number)).
+
+    Результаты сортируются по релевантности (search_rank), если сортировка
+    не задана явно через ordering=.
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        text = ' '.join(terms)
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+        queryset = queryset.filter(
+            Q(search_vector=query) | Q(room_number__icontains=text)
+        ).annotate(**{
+            self.rank_annotation: SearchRank(F('search_vector'), query) + TrigramSimilarity('room_number', text)
+        })
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by(f'-{self.rank_annotation}', *queryset.query.order_by)
+        return queryset
@@ -0,0 +1,185 @@
+"""
+Уменьшенные копии изображений комнат (JPEG и WebP нескольких ширин).
+
+Копии строит воркер (команда process_room_images), а не запрос загрузки:
+Room.save только сбрасывает image_variants, если сменилось изображение.
+Файлы кладутся рядом с оригиналом: rooms/photo.jpg -> rooms/photo-<хэш>-320w.webp,
+где хэш - от полного имени оригинала: у photo.jpg и photo.png копии разные.
+
+image_variants хранит имена файлов: {'webp': {'320': 'rooms/photo-1a2b3c4d-320w.webp'}, 'jpeg': {...}}.
+"""
+import hashlib
+import logging
+import os
+import re
+from io import BytesIO
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .catalog import room_catalog
+from .models import Room
+
+logger = logging.getLogger(__name__)
+
+# Формат -> (расширение, параметры Pillow)
+VARIANT_FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 6}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def source_tag(source: str) -> str:
+    """
+    Короткий хэш имени оригинала - отличает копии файлов с одинаковой основой имени.
+    """
+    return hashlib.md5(source.encode()).hexdigest()[:8]
+
+
+def variant_name(source: str, width: int, fmt: str) -> str:
+    stem, _ = os.path.splitext(source)
+    return f'{stem}-{source_tag(source)}-{width}w.{VARIANT_FORMATS[fmt][0]}'
+
+
+def target_widths(original_width: int) -> List[int]:
+    """
+    Ширины из ROOM_IMAGE_WIDTHS не больше оригинала; для маленького
+    оригинала - одна копия его ширины (без увеличения).
+    """
+    widths = [width for width in sorted(settings.ROOM_IMAGE_WIDTHS) if width <= original_width]
+    return widths or [original_width]
+
+
+def build_variants(image_field) -> Dict[str, Dict[str, str]]:
+    """
+    Генерация и сохранение копий для файла image_field.
+
+    Returns:
+        {'webp': {'320': имя файла, ...}, 'jpeg': {...}}
+    """
+    storage = image_field.storage
+    with image_field.open('rb') as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+
+    variants = {fmt: {} for fmt in VARIANT_FORMATS}
+    for width in target_widths(original.width):
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS)
+
+        for fmt, (_, options) in VARIANT_FORMATS.items():
+            image = resized
+            if fmt == 'jpeg' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            elif image.mode not in ('RGB', 'RGBA', 'L'):
+                image = image.convert('RGBA')
+
+            buffer = BytesIO()
+            image.save(buffer, **options)
+
+            name = variant_name(image_field.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            variants[fmt][str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+
+    return variants
+
+
+def same_image(source: str) -> Q:
+    """
+    Условие "изображение комнаты все еще source" (пустое - это '' или NULL).
+    """
+    return Q(image=source) if source else Q(image='') | Q(image__isnull=True)
+
+
+def delete_variants(storage, variants: Dict[str, Dict[str, str]]) -> None:
+    for names in variants.values():
+        for name in names.values():
+            if storage.exists(name):
+                storage.delete(name)
+
+
+def process_room(room: Room) -> bool:
+    """
+    Копии для текущего изображения комнаты.
+
+    Запись условная (image не изменилось за время обработки): если изображение
+    успели заменить, результат отбрасывается и комната обработается снова.
+
+    Returns:
+        True, если результат записан
+    """
+    source = room.image.name or ''
+    variants = build_variants(room.image) if source else {}
+
+    with transaction.atomic():
+        updated = Room.objects.filter(same_image(source), pk=room.pk).update(
+            image_variants=variants,
+            image_variants_source=source,
+            updated_at=timezone.now(),
+        )
+        if updated:
+            transaction.on_commit(room_catalog.bump)
+
+    if not updated:
+        delete_variants(room.image.storage, variants)
+    return bool(updated)
+
+
+def delete_previous_variants(storage, source: str) -> None:
+    """
+    Копии прежнего изображения - файлы variant_name(source, ...) рядом с ним.
+
+    Имена ищутся по хэшу source, а не по записи в image_variants: Room.save
+    сбрасывает запись при замене изображения, а ширины могли смениться.
+    """
+    directory, filename = os.path.split(source)
+    stem = os.path.splitext(filename)[0]
+    pattern = re.compile(rf'{re.escape(stem)}-{source_tag(source)}-\d+w\.(webp|jpg)$')
+    try:
+        _, files = storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for name in files:
+        if pattern.match(name):
+            storage.delete(os.path.join(directory, name))
+
+
+def process_pending(batch_size: int = 20) -> int:
+    """
+    Обработка комнат, у которых копии не соответствуют изображению.
+
+    Returns:
+        Количество обработанных комнат
+    """
+    rooms = list(
+        Room.objects.exclude(image_variants_source=Coalesce('image', Value('')))
+        .defer('search_vector')
+        .order_by('pk')[:batch_size]
+    )
+
+    processed = 0
+    for room in rooms:
+        previous = room.image_variants_source
+        try:
+            if not process_room(room):
+                continue
+            processed += 1
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            # Битый файл не обрабатывается повторно, комната остается без копий
+            logger.error(f'Failed to build image variants for room {room.pk} ({room.image.name}): {str(e)}')
+            if not Room.objects.filter(same_image(room.image.name or ''), pk=room.pk).update(
+                image_variants={}, image_variants_source=room.image.name or ''
+            ):
+                continue
+
+        if previous and previous != room.image.name:
+            delete_previous_variants(room.image.storage, previous)
+
+    return processed
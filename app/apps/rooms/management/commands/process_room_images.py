@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.rooms.images import process_pending
+
+
+class Command(BaseCommand):
+    help = 'Построение уменьшенных копий (WebP/JPEG) изображений комнат'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Сколько комнат обрабатывать за один проход'
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Работать постоянно, проверяя новые изображения каждые --interval секунд'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=10,
+            help='Пауза между проходами в режиме --loop, секунд'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending(batch_size=options['batch_size'])
+            self.stdout.write(f'Обработано комнат: {processed}')
+
+            if not options['loop']:
+                break
+            # Полная пачка - возможно, есть еще комнаты: следующий проход без паузы
+            if processed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-17 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0002_remove_room_room_price_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['price_per_night'], name='room_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['capacity', 'price_per_night'], name='room_active_capacity_idx'),
+        ),
+    ]
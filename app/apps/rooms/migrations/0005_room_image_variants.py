@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 07:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rooms', '0004_room_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='room',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Уменьшенные JPEG/WebP по ширине, строит команда process_room_images', verbose_name='Копии изображения'),
+        ),
+        migrations.AddField(
+            model_name='room',
+            name='image_variants_source',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Имя файла изображения, для которого построены копии', max_length=100, verbose_name='Исходник копий'),
+        ),
+    ]
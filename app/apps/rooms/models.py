@@ -1,6 +1,12 @@
 from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 
+# Конфигурация полнотекстового поиска: описания комнат на русском
+SEARCH_CONFIG = 'russian'
+
 
 class Room(models.Model):
     room_number = models.CharField(
@@ -32,6 +38,21 @@ class Room(models.Model):
         verbose_name='Изображение',
         help_text='Фотография комнаты'
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Копии изображения',
+        help_text='Уменьшенные JPEG/WebP по ширине, строит команда process_room_images'
+    )
+    image_variants_source = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Исходник копий',
+        help_text='Имя файла изображения, для которого построены копии'
+    )
     is_active = models.BooleanField(
         default=True,
         verbose_name='Активна',
@@ -45,12 +66,40 @@ class Room(models.Model):
         auto_now=True,
         verbose_name='Дата обновления'
     )
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('room_number', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name='Поисковый вектор',
+        help_text='tsvector номера и описания для поиска (search=)'
+    )
 
     class Meta:
         db_table = 'rooms'
         verbose_name = 'Комната'
         verbose_name_plural = 'Комнаты'
         ordering = ['room_number']
+        indexes = [
+            # Каталог показывает только активные комнаты: сортировка и фильтр по цене
+            models.Index(
+                fields=['price_per_night'],
+                condition=models.Q(is_active=True),
+                name='room_active_price_idx',
+            ),
+            # Фильтр по вместимости с сортировкой по цене
+            models.Index(
+                fields=['capacity', 'price_per_night'],
+                condition=models.Q(is_active=True),
+                name='room_active_capacity_idx',
+            ),
+            # Полнотекстовый поиск по номеру и описанию
+            GinIndex(fields=['search_vector'], name='room_search_vector_idx'),
+            # Поиск по части номера комнаты: icontains (UPPER(...) LIKE '%TERM%') через триграммы
+            GinIndex(OpClass(Upper('room_number'), name='gin_trgm_ops'), name='room_number_trgm_idx'),
+        ]
 
     def __str__(self):
         return f"Комната {self.room_number}"
@@ -73,4 +122,10 @@ class Room(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
+        # Копии прежнего изображения не отдаются; новые построит воркер
+        if (self.image.name or '') != self.image_variants_source:
+            self.image_variants = {}
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'image_variants'}
         super().save(*args, **kwargs)
@@ -1,12 +1,44 @@
 from rest_framework import serializers
+from drf_spectacular.utils import extend_schema_field
 from datetime import date
 from .models import Room
+from .catalog import room_catalog
+from apps.core.sparse import SparseFieldsetMixin
 
 
-class RoomSerializer(serializers.ModelSerializer):
+@extend_schema_field({'type': 'object', 'additionalProperties': {'type': 'string'}})
+class ImageSrcsetField(serializers.Field):
+    """
+    image_variants -> {'webp': 'url 160w, url 320w', 'jpeg': '...'} для <picture>/srcset.
+
+    Пока копии не построены - пустой объект, клиент использует image.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        storage = Room._meta.get_field('image').storage
+        request = self.context.get('request')
+
+        def url(name):
+            file_url = storage.url(name)
+            return request.build_absolute_uri(file_url) if request is not None else file_url
+
+        return {
+            fmt: ', '.join(f'{url(names[width])} {width}w' for width in sorted(names, key=int))
+            for fmt, names in value.items() if names
+        }
+
+
+class RoomSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Сериализатор для чтения информации о комнате.
+    Поддерживает ?fields=.
     """
+    image_srcset = ImageSrcsetField(source='image_variants')
+
     class Meta:
         model = Room
         fields = [
@@ -16,6 +48,7 @@ class RoomSerializer(serializers.ModelSerializer):
             'capacity',
             'description',
             'image',
+            'image_srcset',
             'is_active',
             'created_at',
             'updated_at'
@@ -23,6 +56,30 @@ class RoomSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class CatalogRoomField(serializers.PrimaryKeyRelatedField):
+    """
+    id комнаты -> Room из каталога в памяти, без запроса к БД.
+
+    queryset нужен только для схемы и browsable API.
+    """
+
+    def __init__(self, active_only=True, **kwargs):
+        self.active_only = active_only
+        kwargs.setdefault('queryset', Room.objects.filter(is_active=True) if active_only else Room.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            pk = int(str(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        room = room_catalog.get(pk, active_only=self.active_only)
+        if room is None:
+            self.fail('does_not_exist', pk_value=data)
+        return room
+
+
 class RoomAvailabilitySerializer(serializers.Serializer):
     """
     Сериализатор для проверки доступности комнат по датам.
@@ -59,3 +116,127 @@ class RoomAvailabilitySerializer(serializers.Serializer):
             })
 
         return attrs
+
+
+class RoomAvailabilityBatchSerializer(serializers.Serializer):
+    """
+    Сериализатор пакетной проверки доступности: список периодов,
+    каждый валидируется правилами RoomAvailabilitySerializer.
+    """
+    MAX_RANGES = 50
+
+    ranges = RoomAvailabilitySerializer(
+        many=True,
+        allow_empty=False,
+        max_length=MAX_RANGES,
+        help_text='Список периодов [{check_in, check_out}, ...]'
+    )
+
+
+class DateWindowSerializer(serializers.Serializer):
+    """
+    Сериализатор периода поиска по ночам: from (включительно) - to (не включается).
+    """
+    MAX_NIGHTS = 366
+
+    def get_fields(self):
+        # from - зарезервированное слово Python, поэтому поля объявляются здесь
+        fields = super().get_fields()
+        fields['from'] = serializers.DateField(
+            source='date_from',
+            help_text='Первая ночь периода в формате YYYY-MM-DD'
+        )
+        fields['to'] = serializers.DateField(
+            source='date_to',
+            help_text='Дата окончания периода в формате YYYY-MM-DD (не включается)'
+        )
+        return fields
+
+    def validate(self, attrs):
+        """
+        Проверка что период не пустой и не слишком длинный.
+        """
+        date_from = attrs.get('date_from')
+        date_to = attrs.get('date_to')
+
+        if date_to <= date_from:
+            raise serializers.ValidationError({
+                'to': 'Дата окончания должна быть позже даты начала.'
+            })
+
+        if (date_to - date_from).days > self.MAX_NIGHTS:
+            raise serializers.ValidationError({
+                'to': f'Максимальный период - {self.MAX_NIGHTS} дней.'
+            })
+
+        return attrs
+
+
+class RoomCalendarSerializer(DateWindowSerializer):
+    """
+    Сериализатор параметров календаря занятости комнат.
+    """
+    ENCODING_BITS = 'bits'
+    ENCODING_RLE = 'rle'
+
+    # Длиннее этого периода календарь по умолчанию сжимается в RLE
+    BITS_MAX_NIGHTS = 62
+
+    encoding = serializers.ChoiceField(
+        choices=[ENCODING_BITS, ENCODING_RLE],
+        required=False,
+        help_text='Формат строки занятости: bits (символ на ночь) или rle (длина серии + F/B)'
+    )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        if not attrs.get('encoding'):
+            nights = (attrs['date_to'] - attrs['date_from']).days
+            attrs['encoding'] = self.ENCODING_BITS if nights <= self.BITS_MAX_NIGHTS else self.ENCODING_RLE
+
+        return attrs
+
+
+class RoomFlexibleSearchSerializer(DateWindowSerializer):
+    """
+    Сериализатор параметров поиска окна из N ночей внутри периода.
+    """
+    ORDERING_CHOICES = ['start', 'price']
+
+    nights = serializers.IntegerField(
+        min_value=1,
+        max_value=365,
+        help_text='Количество ночей'
+    )
+    ordering = serializers.ChoiceField(
+        choices=ORDERING_CHOICES,
+        default='start',
+        help_text='start - сначала ранние окна, price - сначала дешевые комнаты'
+    )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+
+        if attrs['date_from'] < date.today():
+            raise serializers.ValidationError({
+                'from': 'Дата начала не может быть в прошлом.'
+            })
+
+        if attrs['nights'] > (attrs['date_to'] - attrs['date_from']).days:
+            raise serializers.ValidationError({
+                'nights': 'Количество ночей больше длины периода.'
+            })
+
+        return attrs
+
+
+class RoomWindowSerializer(serializers.Serializer):
+    """
+    Сериализатор найденного свободного окна комнаты.
+    """
+    room = RoomSerializer(read_only=True)
+    check_in = serializers.DateField(read_only=True)
+    check_out = serializers.DateField(read_only=True)
+    free_from = serializers.DateField(read_only=True)
+    free_to = serializers.DateField(read_only=True)
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalog import room_catalog
+from .models import Room
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_catalog_on_room_change(sender, instance, **kwargs):
+    """
+    Свой процесс сбрасывает каталог сразу, остальные воркеры - по версии после коммита.
+    """
+    room_catalog.clear()
+    transaction.on_commit(room_catalog.bump)
@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from apps.rooms.images import process_pending
+from apps.rooms.models import Room
+from apps.rooms.serializers import RoomSerializer
+
+
+class RoomIndexesTest(TestCase):
+    """
+    Запросы каталога комнат используют частичные индексы по активным комнатам.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(10):
+            Room.objects.create(
+                room_number=f'{100 + i}',
+                price_per_night=Decimal('100.00') + i * 10,
+                capacity=1 + i % 4,
+                is_active=i % 5 != 0,
+            )
+
+    def explain(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_price_ordering_uses_active_price_index(self):
+        queryset = Room.objects.filter(is_active=True).order_by('price_per_night')[:20]
+
+        plan = self.explain(queryset)
+
+        self.assertIn('room_active_price_idx', plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_capacity_filter_uses_active_capacity_index(self):
+        queryset = Room.objects.filter(is_active=True, capacity=2).order_by('price_per_night')
+
+        plan = self.explain(queryset)
+
+        self.assertIn('room_active_capacity_idx', plan)
+        self.assertNotIn('Sort', plan)
+
+
+@override_settings(ROOM_IMAGE_WIDTHS=[160, 320, 640, 1280])
+class RoomImageVariantsTest(TestCase):
+    """
+    Воркер строит копии изображения; замена изображения сбрасывает их.
+    """
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    @staticmethod
+    def upload(name, size):
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 120, 40)).save(buffer, format='PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_variants_built_up_to_original_width(self):
+        room = Room.objects.create(
+            room_number='101', price_per_night=Decimal('100.00'), capacity=2,
+            image=self.upload('photo.png', (800, 400)),
+        )
+        self.assertEqual(room.image_variants, {})
+
+        self.assertEqual(process_pending(), 1)
+        room.refresh_from_db()
+
+        self.assertEqual(room.image_variants_source, room.image.name)
+        self.assertEqual(sorted(room.image_variants), ['jpeg', 'webp'])
+        self.assertEqual(sorted(room.image_variants['webp'], key=int), ['160', '320', '640'])
+        with room.image.storage.open(room.image_variants['webp']['320']) as file:
+            self.assertEqual(Image.open(file).size, (320, 160))
+
+        srcset = RoomSerializer(room).data['image_srcset']
+        self.assertEqual(srcset['webp'].split(', ')[-1], f"/media/{room.image_variants['webp']['640']} 640w")
+
+        # Повторный проход ничего не делает
+        self.assertEqual(process_pending(), 0)
+
+    def test_replacing_image_resets_and_removes_old_variants(self):
+        room = Room.objects.create(
+            room_number='102', price_per_night=Decimal('100.00'), capacity=2,
+            image=self.upload('first.png', (400, 300)),
+        )
+        process_pending()
+        room.refresh_from_db()
+        storage = room.image.storage
+        old_variants = [name for names in room.image_variants.values() for name in names.values()]
+
+        room.image = self.upload('second.png', (200, 100))
+        room.save()
+        self.assertEqual(room.image_variants, {})
+
+        self.assertEqual(process_pending(), 1)
+        room.refresh_from_db()
+        self.assertEqual(room.image_variants['jpeg'], {'200': room.image_variants['jpeg']['200']})
+        self.assertFalse(any(storage.exists(name) for name in old_variants))
+
+    def test_same_stem_images_do_not_share_variants(self):
+        room = Room.objects.create(
+            room_number='103', price_per_night=Decimal('100.00'), capacity=2,
+            image=self.upload('photo.jpg', (400, 300)),
+        )
+        other = Room.objects.create(
+            room_number='104', price_per_night=Decimal('100.00'), capacity=2,
+            image=self.upload('photo.png', (400, 300)),
+        )
+        self.assertEqual(process_pending(), 2)
+        room.refresh_from_db()
+        other.refresh_from_db()
+        self.assertNotEqual(room.image_variants['webp']['320'], other.image_variants['webp']['320'])
+
+        # Замена photo.jpg на файл с той же основой имени: удаляются только прежние копии
+        old_variants = [name for names in room.image_variants.values() for name in names.values()]
+        room.image = self.upload('photo.webp', (400, 300))
+        room.save()
+        self.assertEqual(process_pending(), 1)
+        room.refresh_from_db()
+
+        storage = room.image.storage
+        new_variants = [name for names in room.image_variants.values() for name in names.values()]
+        other_variants = [name for names in other.image_variants.values() for name in names.values()]
+        self.assertTrue(new_variants)
+        self.assertTrue(all(storage.exists(name) for name in new_variants + other_variants))
+        self.assertFalse(any(storage.exists(name) for name in old_variants))
@@ -0,0 +1,560 @@
+import base64
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+
+from apps.bookings.models import Booking
+from apps.core.pagination import KeysetPagination
+from apps.rooms.catalog import room_catalog
+from apps.rooms.models import Room
+from apps.rooms.serializers import (
+    CatalogRoomField,
+    RoomAvailabilityBatchSerializer,
+    RoomCalendarSerializer,
+    RoomSerializer,
+)
+from apps.rooms.views import run_length_encode
+from apps.users.models import User
+
+
+class RoomAvailabilityViewTest(APITestCase):
+    """
+    Поиск свободных комнат: фильтры, сортировка, пагинация и число запросов.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.rooms = [
+            Room.objects.create(room_number=f'{101 + i}', price_per_night=Decimal('100.00') * (i + 1), capacity=i + 1)
+            for i in range(4)
+        ]
+        cls.check_in = date.today() + timedelta(days=10)
+        cls.check_out = cls.check_in + timedelta(days=3)
+
+        # Комната 101 занята на весь период
+        Booking.objects.create(
+            user=cls.user,
+            room=cls.rooms[0],
+            check_in=cls.check_in,
+            check_out=cls.check_out,
+            total_price=Decimal('300.00'),
+        )
+
+    def setUp(self):
+        caches['availability'].clear()
+        self.url = reverse('room-availability')
+        self.params = {'check_in': self.check_in, 'check_out': self.check_out}
+
+    def test_excludes_booked_rooms(self):
+        response = self.client.get(self.url, self.params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_rooms_count'], 3)
+        self.assertEqual(
+            [room['room_number'] for room in response.data['available_rooms']],
+            ['102', '103', '104']
+        )
+
+    def test_filters_and_ordering_in_single_search(self):
+        # Поиск свободных комнат + страница с COUNT(*) OVER ()
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {
+                **self.params,
+                'guests': 3,
+                'ordering': '-price_per_night',
+            })
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available_rooms_count'], 2)
+        self.assertEqual(
+            [room['room_number'] for room in response.data['available_rooms']],
+            ['104', '103']
+        )
+
+    def test_repeated_search_is_served_from_cache(self):
+        self.client.get(self.url, self.params)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, self.params)
+
+        self.assertEqual(response.data['available_rooms_count'], 3)
+
+    def test_pagination(self):
+        response = self.client.get(self.url, {**self.params, 'page_size': 2})
+
+        self.assertEqual(response.data['available_rooms_count'], 3)
+        self.assertEqual(len(response.data['available_rooms']), 2)
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(self.url, {**self.params, 'page_size': 2, 'page': 2})
+
+        self.assertEqual(len(response.data['available_rooms']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_invalid_dates(self):
+        response = self.client.get(self.url, {'check_in': self.check_out, 'check_out': self.check_in})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@mock.patch.object(KeysetPagination, 'page_size', 2)
+class RoomListKeysetPaginationTest(APITestCase):
+    """
+    Список комнат в режиме cursor: обход по ключу с одинаковыми ценами.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        prices = ['100.00', '100.00', '200.00', '200.00', '300.00']
+        cls.rooms = [
+            Room.objects.create(room_number=f'{201 + i}', price_per_night=Decimal(price), capacity=2)
+            for i, price in enumerate(prices)
+        ]
+
+    def setUp(self):
+        self.url = reverse('room-list')
+
+    def test_walks_all_pages_in_order(self):
+        response = self.client.get(self.url, {'cursor': '', 'ordering': '-price_per_night'})
+        self.assertIsNone(response.data['previous'])
+        self.assertNotIn('count', response.data)
+
+        ids = [room['id'] for room in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            ids += [room['id'] for room in response.data['results']]
+
+        # Цена по убыванию, при равной цене - pk по убыванию
+        expected = sorted(self.rooms, key=lambda room: (room.price_per_night, room.pk), reverse=True)
+        self.assertEqual(ids, [room.pk for room in expected])
+
+    def test_previous_link(self):
+        first = self.client.get(self.url, {'cursor': '', 'ordering': 'price_per_night'})
+        second = self.client.get(first.data['next'])
+
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrong_value_types(self):
+        for position in (['abc', 'x'], ['100.00', 2 ** 70], ['100.00', None]):
+            payload = json.dumps({'p': position, 'r': False}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+
+            response = self.client.get(self.url, {'cursor': cursor, 'ordering': 'price_per_night'})
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
+    def test_page_number_mode_unchanged(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['count'], 5)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_fast_path_matches_serializer(self):
+        response = self.client.get(self.url, {'ordering': '-room_number'})
+
+        queryset = Room.objects.order_by('-room_number')
+        serializer = RoomSerializer(queryset, many=True, context={'request': Request(response.wsgi_request)})
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(serializer.data))
+
+
+class RoomConditionalGetTest(APITestCase):
+    """
+    ETag / Last-Modified у списка и деталей комнат: 304 без выборки строк.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.room = Room.objects.create(room_number='301', price_per_night=Decimal('100.00'), capacity=2)
+
+    def setUp(self):
+        # Изменения комнат внутри теста откатываются без сигналов
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+
+    def test_list_not_modified(self):
+        url = reverse('room-list')
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        # Состояние списка - из каталога в памяти
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+        # Другие параметры запроса - другой ETag
+        filtered = self.client.get(url, {'fields': 'id'})
+        self.assertNotEqual(filtered['ETag'], response['ETag'])
+
+    def test_list_etag_changes_with_data(self):
+        url = reverse('room-list')
+        etag = self.client.get(url)['ETag']
+
+        Room.objects.create(room_number='302', price_per_night=Decimal('100.00'), capacity=2)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list_etag_ignores_hidden_rooms(self):
+        hidden = Room.objects.create(room_number='303', price_per_night=Decimal('100.00'), capacity=2, is_active=False)
+        url = reverse('room-list')
+        etag = self.client.get(url)['ETag']
+
+        hidden.description = 'Ремонт'
+        hidden.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_not_modified(self):
+        url = reverse('room-detail', args=[self.room.pk])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['room_number'], '301')
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.room.description = 'Обновлено'
+        self.room.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, status.HTTP_200_OK)
+
+
+class RoomSearchTest(APITestCase):
+    """
+    search= по полнотекстовому индексу (русская морфология) и части номера.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sea = Room.objects.create(
+            room_number='401', price_per_night=Decimal('200.00'), capacity=2, description='Номер с видом на море'
+        )
+        cls.garden = Room.objects.create(
+            room_number='402', price_per_night=Decimal('100.00'), capacity=2, description='Окна выходят в сад, рядом с люксом'
+        )
+        cls.suite = Room.objects.create(
+            room_number='Люкс 7', price_per_night=Decimal('500.00'), capacity=4, description='Большой люкс, вид на сад'
+        )
+
+    def setUp(self):
+        self.url = reverse('room-list')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [room['id'] for room in response.data['results']]
+
+    def test_full_text_uses_word_forms(self):
+        self.assertEqual(self.search(search='моря'), [self.sea.pk])
+        self.assertCountEqual(self.search(search='сады'), [self.garden.pk, self.suite.pk])
+
+    def test_partial_room_number(self):
+        self.assertCountEqual(self.search(search='40'), [self.sea.pk, self.garden.pk])
+
+    def test_ranked_by_relevance(self):
+        # Слово в номере (вес A) важнее слова в описании (вес B)
+        self.assertEqual(self.search(search='люкс'), [self.suite.pk, self.garden.pk])
+
+    def test_explicit_ordering_and_cursor(self):
+        self.assertEqual(self.search(search='сад', ordering='price_per_night'), [self.garden.pk, self.suite.pk])
+        with mock.patch.object(KeysetPagination, 'page_size', 1):
+            self.assertEqual(self.search(search='сад', cursor='', ordering='-price_per_night'), [self.suite.pk])
+
+
+class RoomCatalogTest(APITestCase):
+    """
+    Каталог комнат в памяти: повторные чтения без запросов, сброс по сигналам.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.room = Room.objects.create(room_number='501', price_per_night=Decimal('100.00'), capacity=2)
+        cls.hidden = Room.objects.create(room_number='502', price_per_night=Decimal('100.00'), capacity=2, is_active=False)
+
+    def setUp(self):
+        room_catalog.clear()
+        self.addCleanup(room_catalog.clear)
+
+    def test_reads_served_from_memory(self):
+        self.client.get(reverse('room-list'))
+
+        with self.assertNumQueries(0):
+            listed = self.client.get(reverse('room-list'))
+            detail = self.client.get(reverse('room-detail', args=[self.room.pk]))
+            hidden = self.client.get(reverse('room-detail', args=[self.hidden.pk]))
+
+        self.assertEqual([room['id'] for room in listed.data['results']], [self.room.pk])
+        self.assertEqual(detail.data['room_number'], '501')
+        self.assertEqual(hidden.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_room_change_invalidates(self):
+        self.client.get(reverse('room-list'))
+
+        self.room.price_per_night = Decimal('150.00')
+        self.room.save()
+
+        response = self.client.get(reverse('room-list'))
+        self.assertEqual(response.data['results'][0]['price_per_night'], '150.00')
+
+    def test_booking_room_field(self):
+        field = CatalogRoomField()
+
+        self.assertEqual(field.to_internal_value(str(self.room.pk)).room_number, '501')
+        with self.assertRaises(ValidationError):
+            field.to_internal_value(self.hidden.pk)
+        with self.assertRaises(ValidationError):
+            field.to_internal_value('abc')
+
+
+class RunLengthEncodeTest(SimpleTestCase):
+    """
+    Сжатие строки занятости в серии F/B.
+    """
+
+    def test_empty_range(self):
+        self.assertEqual(run_length_encode(''), '')
+
+    def test_single_run(self):
+        self.assertEqual(run_length_encode('000'), '3F')
+        self.assertEqual(run_length_encode('1111'), '4B')
+
+    def test_runs_at_range_edges(self):
+        self.assertEqual(run_length_encode('1001'), '1B2F1B')
+        self.assertEqual(run_length_encode('0011100'), '2F3B2F')
+
+    def test_single_night(self):
+        self.assertEqual(run_length_encode('0'), '1F')
+        self.assertEqual(run_length_encode('1'), '1B')
+
+
+class RoomCalendarViewTest(APITestCase):
+    """
+    Календарь занятости: ночи [from, to), смежные брони и края периода.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.free = Room.objects.create(room_number='601', price_per_night=Decimal('100.00'), capacity=2)
+        cls.adjacent = Room.objects.create(room_number='602', price_per_night=Decimal('100.00'), capacity=2)
+        cls.edges = Room.objects.create(room_number='603', price_per_night=Decimal('100.00'), capacity=2)
+        cls.full = Room.objects.create(room_number='604', price_per_night=Decimal('100.00'), capacity=2)
+        Room.objects.create(room_number='605', price_per_night=Decimal('100.00'), capacity=2, is_active=False)
+
+        cls.date_from = date.today() + timedelta(days=10)
+        cls.date_to = cls.date_from + timedelta(days=7)
+
+        def book(room, start, end):
+            Booking.objects.create(
+                user=cls.user,
+                room=room,
+                check_in=cls.date_from + timedelta(days=start),
+                check_out=cls.date_from + timedelta(days=end),
+                total_price=Decimal('100.00') * (end - start),
+            )
+
+        # Выезд одного гостя в день заезда другого: ночи идут подряд
+        book(cls.adjacent, 2, 4)
+        book(cls.adjacent, 4, 5)
+        # Брони выходят за края периода, заезд ровно в день to не попадает
+        book(cls.edges, -2, 1)
+        book(cls.edges, 6, 9)
+        book(cls.free, 7, 9)
+        book(cls.full, 0, 7)
+
+    def setUp(self):
+        self.url = reverse('room-calendar')
+        self.params = {'from': self.date_from, 'to': self.date_to}
+
+    def occupancy(self, response):
+        return {room['room_number']: room['occupancy'] for room in response.data['rooms']}
+
+    def test_bits(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, self.params)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['nights'], 7)
+        self.assertEqual(response.data['encoding'], 'bits')
+        self.assertEqual(self.occupancy(response), {
+            '601': '0000000',
+            '602': '0011100',
+            '603': '1000001',
+            '604': '1111111',
+        })
+
+    def test_rle(self):
+        response = self.client.get(self.url, {**self.params, 'encoding': 'rle'})
+
+        self.assertEqual(response.data['encoding'], 'rle')
+        self.assertEqual(self.occupancy(response), {
+            '601': '7F',
+            '602': '2F3B2F',
+            '603': '1B5F1B',
+            '604': '7B',
+        })
+
+    def test_long_range_defaults_to_rle(self):
+        date_to = self.date_from + timedelta(days=RoomCalendarSerializer.BITS_MAX_NIGHTS + 1)
+        response = self.client.get(self.url, {'from': self.date_from, 'to': date_to})
+
+        self.assertEqual(response.data['encoding'], 'rle')
+        self.assertEqual(self.occupancy(response)['604'], f'7B{RoomCalendarSerializer.BITS_MAX_NIGHTS - 6}F')
+
+    def test_invalid_range(self):
+        empty = self.client.get(self.url, {'from': self.date_from, 'to': self.date_from})
+        too_long = self.client.get(self.url, {
+            'from': self.date_from,
+            'to': self.date_from + timedelta(days=RoomCalendarSerializer.MAX_NIGHTS + 1),
+        })
+
+        self.assertEqual(empty.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('to', empty.data)
+        self.assertEqual(too_long.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RoomAvailabilityBatchViewTest(APITestCase):
+    """
+    Пакетная проверка доступности: результаты по каждому периоду и лимит запроса.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.rooms = [
+            Room.objects.create(room_number=f'{701 + i}', price_per_night=Decimal('100.00'), capacity=2)
+            for i in range(2)
+        ]
+        cls.start = date.today() + timedelta(days=10)
+        Booking.objects.create(
+            user=cls.user,
+            room=cls.rooms[0],
+            check_in=cls.start,
+            check_out=cls.start + timedelta(days=3),
+            total_price=Decimal('300.00'),
+        )
+
+    def setUp(self):
+        self.url = reverse('room-availability-batch')
+
+    def period(self, start, end):
+        check_in = self.start + timedelta(days=start)
+        check_out = self.start + timedelta(days=end)
+        return {'check_in': check_in.isoformat(), 'check_out': check_out.isoformat()}
+
+    def key(self, period):
+        return f"{period['check_in']}/{period['check_out']}"
+
+    def test_results_keyed_by_range(self):
+        booked, overlapping, free = self.period(0, 3), self.period(2, 5), self.period(3, 5)
+
+        response = self.client.post(self.url, {'ranges': [booked, overlapping, free, booked]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual(list(results), [self.key(booked), self.key(overlapping), self.key(free)])
+        self.assertEqual(results[self.key(booked)]['available_room_ids'], [self.rooms[1].pk])
+        self.assertEqual(results[self.key(booked)]['available_rooms_count'], 1)
+        self.assertEqual(results[self.key(overlapping)]['available_room_ids'], [self.rooms[1].pk])
+        self.assertEqual(results[self.key(free)]['available_room_ids'], [room.pk for room in self.rooms])
+        # Каждая комната сериализуется один раз на весь ответ
+        self.assertEqual([room['id'] for room in response.data['rooms']], [self.rooms[1].pk, self.rooms[0].pk])
+
+    def test_request_size_limit(self):
+        ranges = [self.period(i, i + 1) for i in range(RoomAvailabilityBatchSerializer.MAX_RANGES)]
+
+        accepted = self.client.post(self.url, {'ranges': ranges}, format='json')
+        too_many = self.client.post(self.url, {'ranges': ranges + [self.period(60, 61)]}, format='json')
+        empty = self.client.post(self.url, {'ranges': []}, format='json')
+
+        self.assertEqual(accepted.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(accepted.data['results']), RoomAvailabilityBatchSerializer.MAX_RANGES)
+        self.assertEqual(too_many.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ranges', too_many.data)
+        self.assertEqual(empty.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_range(self):
+        reversed_range = {'check_in': self.period(2, 3)['check_in'], 'check_out': self.period(0, 1)['check_out']}
+
+        response = self.client.post(self.url, {'ranges': [self.period(0, 1), reversed_range]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RoomFlexibleSearchViewTest(APITestCase):
+    """
+    Поиск с гибкими датами: окна по комнатам и проверка параметров.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='guest', email='guest@example.com', password='pass12345')
+        cls.cheap = Room.objects.create(room_number='801', price_per_night=Decimal('50.00'), capacity=2)
+        cls.busy = Room.objects.create(room_number='802', price_per_night=Decimal('100.00'), capacity=2)
+        cls.date_from = date.today() + timedelta(days=10)
+        cls.date_to = cls.date_from + timedelta(days=6)
+        Booking.objects.create(
+            user=cls.user,
+            room=cls.busy,
+            check_in=cls.date_from + timedelta(days=2),
+            check_out=cls.date_from + timedelta(days=5),
+            total_price=Decimal('300.00'),
+        )
+
+    def setUp(self):
+        self.url = reverse('room-flexible-search')
+        self.params = {'from': self.date_from, 'to': self.date_to, 'nights': 2}
+
+    def test_windows(self):
+        response = self.client.get(self.url, {**self.params, 'ordering': 'price'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['nights'], 2)
+        self.assertEqual(response.data['windows_count'], 2)
+        self.assertEqual(
+            [(window['room']['room_number'], window['check_in'], window['free_to']) for window in response.data['windows']],
+            [
+                ('801', self.date_from.isoformat(), self.date_to.isoformat()),
+                ('802', self.date_from.isoformat(), (self.date_from + timedelta(days=2)).isoformat()),
+            ]
+        )
+
+    def test_no_window_fits(self):
+        response = self.client.get(self.url, {**self.params, 'nights': 6, 'ordering': 'start'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([window['room']['room_number'] for window in response.data['windows']], ['801'])
+
+    def test_invalid_params(self):
+        too_many_nights = self.client.get(self.url, {**self.params, 'nights': 7})
+        past = self.client.get(self.url, {**self.params, 'from': date.today() - timedelta(days=1)})
+
+        self.assertEqual(too_many_nights.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('nights', too_many_nights.data)
+        self.assertEqual(past.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('from', past.data)
@@ -3,10 +3,16 @@ from .views import (
     RoomListView,
     RoomDetailView,
     RoomAvailabilityView,
+    RoomAvailabilityBatchView,
+    RoomCalendarView,
+    RoomFlexibleSearchView,
 )
 
 urlpatterns = [
     path('', RoomListView.as_view(), name='room-list'),
     path('available/', RoomAvailabilityView.as_view(), name='room-availability'),
+    path('available/batch/', RoomAvailabilityBatchView.as_view(), name='room-availability-batch'),
+    path('calendar/', RoomCalendarView.as_view(), name='room-calendar'),
+    path('flexible/', RoomFlexibleSearchView.as_view(), name='room-flexible-search'),
     path('<int:pk>/', RoomDetailView.as_view(), name='room-detail'),
 ]
@@ -1,15 +1,41 @@
+from django.http import Http404
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 from .models import Room
-from .serializers import RoomSerializer, RoomAvailabilitySerializer
-from .filters import RoomFilter
+from .serializers import (
+    RoomSerializer,
+    RoomAvailabilitySerializer,
+    RoomAvailabilityBatchSerializer,
+    RoomCalendarSerializer,
+    RoomFlexibleSearchSerializer,
+    RoomWindowSerializer,
+)
+from .catalog import room_catalog
+from .filters import RoomFilter, RoomSearchFilter
+from apps.core.pagination import KeysetPagination, WindowCountPagination
+from apps.core.conditional import ConditionalDetailMixin, ConditionalListMixin
+from apps.core.fast import FastListMixin
+from apps.core.sparse import SPARSE_PARAMETERS, SparseFieldsetViewMixin
+
+
+def run_length_encode(occupancy: str) -> str:
+    """
+    Сжатие строки занятости '0011100' в серии '2F3B2F' (F - свободно, B - занято).
+    """
+    runs = []
+    start = 0
+    for i in range(1, len(occupancy) + 1):
+        if i == len(occupancy) or occupancy[i] != occupancy[start]:
+            runs.append(f"{i - start}{'B' if occupancy[start] == '1' else 'F'}")
+            start = i
+    return ''.join(runs)
 
 
 @extend_schema(tags=['Rooms'])
@@ -17,9 +43,10 @@ from .filters import RoomFilter
     get=extend_schema(
         summary="Список всех комнат",
         description="Возвращает список всех активных комнат с возможностью фильтрации и сортировки",
+        parameters=SPARSE_PARAMETERS,
     )
 )
-class RoomListView(generics.ListAPIView):
+class RoomListView(ConditionalListMixin, FastListMixin, SparseFieldsetViewMixin, generics.ListAPIView):
     """
     Список всех доступных комнат.
 
@@ -27,16 +54,44 @@ class RoomListView(generics.ListAPIView):
     - Фильтрацию по цене (min_price, max_price)
     - Фильтрацию по вместимости (capacity)
     - Сортировку (ordering=price_per_night, -price_per_night, capacity, -capacity)
-    - Поиск по номеру комнаты и описанию (search)
+    - Поиск по номеру комнаты и описанию (search), с сортировкой по релевантности
+    - Постраничную выдачу по номеру страницы (page) или по курсору (cursor)
+    - Выбор полей ответа (fields)
+
+    Строки списка строятся из values() без экземпляров модели (FastListMixin).
+    ETag / Last-Modified по MAX(updated_at) и количеству активных комнат, If-None-Match -> 304.
+    Ответы кэшируются в каталоге комнат (apps.rooms.catalog) до изменения комнат.
     """
     queryset = Room.objects.filter(is_active=True)
     serializer_class = RoomSerializer
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter, RoomSearchFilter]
     filterset_class = RoomFilter
     ordering_fields = ['price_per_night', 'capacity', 'room_number']
     ordering = ['room_number']  # сортировка по умолчанию
-    search_fields = ['room_number', 'description']
+
+    def get_conditional_state(self):
+        """
+        Состояние - количество активных комнат и их MAX(updated_at) по каталогу
+        в памяти, без запроса. Изменение скрытой комнаты ETag не меняет; фильтры
+        входят в ETag через URL.
+        """
+        if not room_catalog.enabled:
+            return super().get_conditional_state()
+
+        snapshot = room_catalog.snapshot()
+        last_modified = snapshot.active_last_modified
+        return f"{snapshot.active_count}:{last_modified.isoformat() if last_modified else ''}", last_modified
+
+    def list(self, request, *args, **kwargs):
+        """
+        Готовый ответ для того же URL и формата берется из каталога
+        и сбрасывается при любом изменении комнат.
+        """
+        build = super().list
+        key = f'{request.build_absolute_uri()}|{request.accepted_media_type}'
+        return Response(room_catalog.cached_response(key, lambda: build(request, *args, **kwargs).data))
 
 
 @extend_schema(tags=['Rooms'])
@@ -44,60 +99,231 @@ class RoomListView(generics.ListAPIView):
     get=extend_schema(
         summary="Детали комнаты",
         description="Возвращает подробную информацию о конкретной комнате",
+        parameters=SPARSE_PARAMETERS,
     )
 )
-class RoomDetailView(generics.RetrieveAPIView):
+class RoomDetailView(ConditionalDetailMixin, SparseFieldsetViewMixin, generics.RetrieveAPIView):
     """
     Детальная информация о комнате.
 
     Доступно для всех пользователей без авторизации.
+    ETag / Last-Modified по updated_at комнаты, If-None-Match -> 304.
+    Комната берется из каталога в памяти (apps.rooms.catalog).
     """
     queryset = Room.objects.filter(is_active=True)
     serializer_class = RoomSerializer
     permission_classes = [AllowAny]
     lookup_field = 'pk'
+    sparse_required_fields = ('updated_at',)
+
+    def get_object(self):
+        """
+        Комната из каталога в памяти вместо запроса к БД.
+        """
+        if not room_catalog.enabled:
+            return super().get_object()
+
+        room = room_catalog.get(self.kwargs[self.lookup_field])
+        if room is None:
+            raise Http404
+        self.check_object_permissions(self.request, room)
+        return room
 
 
 @extend_schema(tags=['Rooms'])
-class RoomAvailabilityView(APIView):
+@extend_schema_view(
+    get=extend_schema(
+        summary="Поиск свободных комнат",
+        description="Возвращает список комнат, доступных для бронирования на указанные даты.",
+        parameters=[
+            OpenApiParameter(
+                name='check_in',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Дата заезда в формате YYYY-MM-DD'
+            ),
+            OpenApiParameter(
+                name='check_out',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Дата выезда в формате YYYY-MM-DD'
+            ),
+        ],
+    )
+)
+class RoomAvailabilityView(generics.ListAPIView):
     """
     Поиск свободных комнат на указанные даты.
 
     Query параметры:
     - check_in: дата заезда (YYYY-MM-DD)
     - check_out: дата выезда (YYYY-MM-DD)
+    - фильтры RoomFilter (min_price, max_price, capacity, guests)
+    - ordering: price_per_night, capacity, room_number (с - для обратного порядка)
+    - page, page_size: постраничная выдача
+
+    Поиск свободных комнат выполняется один раз, страница и общее количество
+    получаются одним запросом (COUNT(*) OVER ()).
 
     Доступно всем пользователям без авторизации.
     """
+    serializer_class = RoomSerializer
+    permission_classes = [AllowAny]
+    pagination_class = WindowCountPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = RoomFilter
+    ordering_fields = ['price_per_night', 'capacity', 'room_number']
+    ordering = ['room_number']
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Room.objects.none()
+
+        from apps.bookings.services import BookingService
+        return BookingService.get_available_rooms(self.check_in, self.check_out)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Получение списка доступных комнат.
+        """
+        # Валидация входных данных
+        serializer = RoomAvailabilitySerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        self.check_in = serializer.validated_data['check_in']
+        self.check_out = serializer.validated_data['check_out']
+
+        # Фильтры и сортировка применяются к тому же запросу, что и страница
+        available_rooms = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(available_rooms)
+
+        # Сериализуем результат
+        room_serializer = RoomSerializer(page, many=True)
+
+        return Response({
+            'check_in': self.check_in,
+            'check_out': self.check_out,
+            'available_rooms_count': self.paginator.count,
+            'next': self.paginator.get_next_link(),
+            'previous': self.paginator.get_previous_link(),
+            'available_rooms': room_serializer.data
+        }, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=['Rooms'])
+class RoomAvailabilityBatchView(APIView):
+    """
+    Поиск свободных комнат сразу для нескольких периодов.
+
+    Тело запроса:
+    - ranges: список периодов [{check_in, check_out}, ...] (не более 50)
+
+    Все периоды проверяются одним запросом к БД. Каждая комната
+    сериализуется один раз, периоды ссылаются на нее по id.
+    """
     permission_classes = [AllowAny]
 
     @extend_schema(
-        summary="Поиск свободных комнат",
-        description="Возвращает список комнат, доступных для бронирования на указанные даты.",
+        summary="Пакетный поиск свободных комнат",
+        description="Возвращает свободные комнаты для каждого из переданных периодов.",
+        request=RoomAvailabilityBatchSerializer,
+        responses={200: OpenApiTypes.OBJECT}
+    )
+    def post(self, request):
+        """
+        Получение доступных комнат по списку периодов.
+        """
+        serializer = RoomAvailabilityBatchSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ranges = [
+            (item['check_in'], item['check_out'])
+            for item in serializer.validated_data['ranges']
+        ]
+
+        from apps.bookings.services import BookingService
+        available = BookingService.get_available_rooms_batch(ranges)
+
+        results = {}
+        rooms = {}
+        for (check_in, check_out), available_rooms in available.items():
+            results[f'{check_in.isoformat()}/{check_out.isoformat()}'] = {
+                'check_in': check_in,
+                'check_out': check_out,
+                'available_rooms_count': len(available_rooms),
+                'available_room_ids': [room.pk for room in available_rooms],
+            }
+            for room in available_rooms:
+                rooms.setdefault(room.pk, room)
+
+        room_serializer = RoomSerializer(rooms.values(), many=True)
+
+        return Response({
+            'results': results,
+            'rooms': room_serializer.data
+        }, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=['Rooms'])
+class RoomCalendarView(APIView):
+    """
+    Календарь занятости всех активных комнат по ночам.
+
+    Query параметры:
+    - from: первая ночь периода (YYYY-MM-DD)
+    - to: дата окончания периода (YYYY-MM-DD, не включается)
+    - encoding: bits (по символу на ночь) или rle (серии вида 3F2B)
+
+    Вся матрица считается одним SQL-запросом.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Календарь занятости комнат",
+        description="Возвращает занятость каждой активной комнаты по ночам указанного периода.",
         parameters=[
             OpenApiParameter(
-                name='check_in',
+                name='from',
                 type=OpenApiTypes.DATE,
                 location=OpenApiParameter.QUERY,
                 required=True,
-                description='Дата заезда в формате YYYY-MM-DD'
+                description='Первая ночь периода в формате YYYY-MM-DD'
             ),
             OpenApiParameter(
-                name='check_out',
+                name='to',
                 type=OpenApiTypes.DATE,
                 location=OpenApiParameter.QUERY,
                 required=True,
-                description='Дата выезда в формате YYYY-MM-DD'
+                description='Дата окончания периода в формате YYYY-MM-DD (не включается)'
+            ),
+            OpenApiParameter(
+                name='encoding',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=['bits', 'rle'],
+                description='Формат строки занятости. По умолчанию bits для периодов до 62 ночей, иначе rle'
             ),
         ],
-        responses={200: RoomSerializer(many=True)}
+        responses={200: OpenApiTypes.OBJECT}
     )
     def get(self, request):
         """
-        Получение списка доступных комнат.
+        Получение календаря занятости.
         """
-        # Валидация входных данных
-        serializer = RoomAvailabilitySerializer(data=request.query_params)
+        serializer = RoomCalendarSerializer(data=request.query_params)
 
         if not serializer.is_valid():
             return Response(
@@ -105,19 +331,108 @@ class RoomAvailabilityView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        check_in = serializer.validated_data['check_in']
-        check_out = serializer.validated_data['check_out']
+        date_from = serializer.validated_data['date_from']
+        date_to = serializer.validated_data['date_to']
+        encoding = serializer.validated_data['encoding']
 
-        # Получаем доступные комнаты через сервис
         from apps.bookings.services import BookingService
-        available_rooms = BookingService.get_available_rooms(check_in, check_out)
+        calendar = BookingService.get_occupancy_calendar(date_from, date_to)
 
-        # Сериализуем результат
-        room_serializer = RoomSerializer(available_rooms, many=True)
+        rooms = []
+        for room_id, room_number, occupancy in calendar:
+            if encoding == RoomCalendarSerializer.ENCODING_RLE:
+                occupancy = run_length_encode(occupancy)
+            rooms.append({
+                'id': room_id,
+                'room_number': room_number,
+                'occupancy': occupancy,
+            })
 
         return Response({
-            'check_in': check_in,
-            'check_out': check_out,
-            'available_rooms_count': available_rooms.count(),
-            'available_rooms': room_serializer.data
+            'from': date_from,
+            'to': date_to,
+            'nights': (date_to - date_from).days,
+            'encoding': encoding,
+            'rooms': rooms
+        }, status=status.HTTP_200_OK)
+
+
+@extend_schema(tags=['Rooms'])
+class RoomFlexibleSearchView(APIView):
+    """
+    Поиск свободных окон из N ночей с гибкими датами.
+
+    Query параметры:
+    - from: начало периода (YYYY-MM-DD)
+    - to: конец периода (YYYY-MM-DD, не включается)
+    - nights: количество ночей
+    - ordering: start (сначала ранние) или price (сначала дешевые)
+
+    Возвращает каждую комнату и свободный промежуток, куда помещается окно.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(
+        summary="Поиск с гибкими датами",
+        description="Возвращает свободные окна заданной длины внутри периода для всех активных комнат.",
+        parameters=[
+            OpenApiParameter(
+                name='from',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Начало периода в формате YYYY-MM-DD'
+            ),
+            OpenApiParameter(
+                name='to',
+                type=OpenApiTypes.DATE,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Конец периода в формате YYYY-MM-DD (не включается)'
+            ),
+            OpenApiParameter(
+                name='nights',
+                type=OpenApiTypes.INT,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Количество ночей'
+            ),
+            OpenApiParameter(
+                name='ordering',
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=['start', 'price'],
+                description='Сортировка: start (по дате начала) или price (по цене за ночь)'
+            ),
+        ],
+        responses={200: RoomWindowSerializer(many=True)}
+    )
+    def get(self, request):
+        """
+        Получение свободных окон.
+        """
+        serializer = RoomFlexibleSearchSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = serializer.validated_data
+
+        from apps.bookings.services import BookingService
+        windows = BookingService.find_free_windows(
+            data['date_from'], data['date_to'], data['nights'], ordering=data['ordering']
+        )
+
+        window_serializer = RoomWindowSerializer(windows, many=True)
+
+        return Response({
+            'from': data['date_from'],
+            'to': data['date_to'],
+            'nights': data['nights'],
+            'windows_count': len(windows),
+            'windows': window_serializer.data
         }, status=status.HTTP_200_OK)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User
+from apps.core.pagination import EstimatedCountPaginator
 
 
 @admin.register(User)
@@ -10,6 +11,11 @@ class UserAdmin(BaseUserAdmin):
     search_fields = ['username', 'email', 'first_name', 'last_name', 'phone']
     ordering = ['-date_joined']
 
+    # Список и автодополнение (autocomplete_fields в BookingAdmin) без COUNT(*) по всей таблице;
+    # поиск icontains идет по триграммным индексам (см. User.Meta.indexes)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     fieldsets = (
         (None, {
             'fields': ('username', 'password')
@@ -32,7 +32,10 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # runserver отдает статику через WhiteNoise, как и в production
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     # Third party apps
     'rest_framework',
@@ -50,6 +53,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -185,12 +189,90 @@ SPECTACULAR_SETTINGS = {
 }
 
 # Static files
+# collectstatic пишет файлы с хэшем содержимого в имени (main.3f2a1c.css) и их
+# сжатые копии .gz/.br; шаблоны получают хэшированные имена через {% static %}.
+# WhiteNoise отдает их с Cache-Control immutable на год и Content-Encoding
+# по Accept-Encoding клиента. При DEBUG файлы отдаются без хэшей из STATICFILES_DIRS.
 STATIC_ROOT = BASE_APP_DIR / 'staticfiles'
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'apps.core.storage.StaticFilesStorage',
+    },
+}
+# Файлы без хэша в имени (favicon и т.п.), секунд
+WHITENOISE_MAX_AGE = int(os.getenv('WHITENOISE_MAX_AGE', 3600))
 
 # Media files
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_APP_DIR / 'media'
 
+# Caches
+# availability - кэш поиска свободных комнат, в нем же эпоха бронирований и версия
+# каталога комнат. Кэш должен быть общим для воркеров, иначе изменения не видны
+# другим процессам: по умолчанию FileBasedCache в /dev/shm (общий для воркеров хоста),
+# для нескольких хостов - RedisCache. LocMemCache - только для одного процесса.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'availability': {
+        'BACKEND': os.getenv('AVAILABILITY_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('AVAILABILITY_CACHE_LOCATION', '/dev/shm/booking/availability-cache'),
+        'TIMEOUT': int(os.getenv('AVAILABILITY_CACHE_TIMEOUT', 300)),
+    },
+}
+
+# Счетчики попаданий кэша поиска: лишняя запись в кэш на каждый поиск, поэтому выключены
+AVAILABILITY_CACHE_STATS = os.getenv('AVAILABILITY_CACHE_STATS', 'False') == 'True'
+
+# Occupancy index (битовая карта занятости комнат в mmap-файле)
+OCCUPANCY_INDEX = {
+    'ENABLED': os.getenv('OCCUPANCY_INDEX_ENABLED', 'True') == 'True',
+    'DIR': os.getenv('OCCUPANCY_INDEX_DIR', BASE_PROJECT_DIR / 'var'),
+    'HORIZON_DAYS': int(os.getenv('OCCUPANCY_INDEX_HORIZON_DAYS', 730)),
+    'MAX_AGE': int(os.getenv('OCCUPANCY_INDEX_MAX_AGE', 60 * 60 * 24)),  # 24 hours
+    # Общая версия бронирований: индекс не отвечает, пока не совпадет с ней
+    'CACHE': os.getenv('OCCUPANCY_INDEX_CACHE', 'availability'),
+}
+
+# Cache-Control: max-age для списка и деталей комнат (ETag / Last-Modified)
+ROOMS_CACHE_MAX_AGE = int(os.getenv('ROOMS_CACHE_MAX_AGE', 60))  # 1 minute
+
+# Каталог комнат в памяти процесса; версия - в общем кэше CACHE
+ROOM_CATALOG = {
+    'ENABLED': os.getenv('ROOM_CATALOG_ENABLED', 'True') == 'True',
+    'CACHE': os.getenv('ROOM_CATALOG_CACHE', 'availability'),
+    'CHECK_INTERVAL': float(os.getenv('ROOM_CATALOG_CHECK_INTERVAL', 1)),  # seconds
+    'MAX_RESPONSES': int(os.getenv('ROOM_CATALOG_MAX_RESPONSES', 256)),
+}
+
+# Ширины копий изображений комнат (px), строит команда process_room_images
+ROOM_IMAGE_WIDTHS = [
+    int(width) for width in os.getenv('ROOM_IMAGE_WIDTHS', '160,320,640,1280').split(',') if width.strip()
+]
+
+# Временный резерв комнаты на время оплаты
+BOOKING_HOLD_TTL = int(os.getenv('BOOKING_HOLD_TTL', 60 * 10))  # 10 minutes
+
+# Outbox событий бронирований: обработчики вызываются командой process_outbox
+BOOKING_OUTBOX = {
+    'HANDLERS': [
+        handler.strip()
+        for handler in os.getenv('BOOKING_OUTBOX_HANDLERS', 'apps.bookings.outbox.log_event').split(',')
+        if handler.strip()
+    ],
+    'MAX_ATTEMPTS': int(os.getenv('BOOKING_OUTBOX_MAX_ATTEMPTS', 5)),
+}
+
+# Выгрузка бронирований: строк за одно чтение серверного курсора
+BOOKING_EXPORT_CHUNK_SIZE = int(os.getenv('BOOKING_EXPORT_CHUNK_SIZE', 2000))
+
+# Idempotency-Key для создания и изменения бронирований
+IDEMPOTENCY_KEY_TTL = int(os.getenv('IDEMPOTENCY_KEY_TTL', 60 * 60 * 24))  # 24 hours
+
 # Logging
 LOGS_DIR = BASE_PROJECT_DIR / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)
@@ -93,6 +93,12 @@ document.addEventListener('DOMContentLoaded', function() {
         const roomImage = document.getElementById('room-image');
         if (room.image) {
             roomImage.src = room.image;
+            // Уменьшенные копии, если воркер их уже построил
+            const srcset = room.image_srcset || {};
+            if (srcset.webp || srcset.jpeg) {
+                roomImage.srcset = srcset.webp || srcset.jpeg;
+                roomImage.sizes = '(max-width: 900px) 100vw, 900px';
+            }
             roomImage.alt = `Комната ${room.room_number}`;
         } else {
             // SVG placeholder для комнаты без изображения
@@ -114,6 +114,20 @@ document.addEventListener('DOMContentLoaded', function() {
         roomsGrid.style.display = 'grid';
     }
 
+    /**
+     * Изображение карточки: уменьшенные копии (image_srcset), пока их нет - оригинал
+     */
+    function createRoomImage(room, src) {
+        const srcset = room.image_srcset || {};
+        const sizes = '(max-width: 640px) 100vw, 400px';
+        const img = `<img src="${src}" ${srcset.jpeg ? `srcset="${srcset.jpeg}" sizes="${sizes}"` : ''} alt="${room.room_number}" class="room-card-image" loading="lazy">`;
+
+        if (!srcset.webp) {
+            return img;
+        }
+        return `<picture><source type="image/webp" srcset="${srcset.webp}" sizes="${sizes}">${img}</picture>`;
+    }
+
     /**
      * Создание карточки комнаты
      */
@@ -132,7 +146,7 @@ document.addEventListener('DOMContentLoaded', function() {
             : 'Описание отсутствует';
 
         card.innerHTML = `
-            <img src="${imageUrl || imagePlaceholder}" alt="${room.room_number}" class="room-card-image">
+            ${createRoomImage(room, imageUrl || imagePlaceholder)}
             <div class="room-card-body">
                 <h3 class="room-card-title">Комната ${room.room_number}</h3>
 
@@ -19,11 +19,21 @@ done
 
 cd /app/app
 
-echo "Running database migrations..."
-python manage.py migrate --noinput
+# Миграции, статика и суперпользователь - только в web; воркеры (APP_SETUP=False)
+# запускают свою команду сразу
+if [ "${APP_SETUP:-True}" = "True" ]; then
+  echo "Running database migrations..."
+  python manage.py migrate --noinput
+  python manage.py createcachetable
 
-echo "Creating superuser if not exists..."
-python manage.py shell << END
+  echo "Collecting static files..."
+  python manage.py collectstatic --noinput
+
+  echo "Rebuilding occupancy index..."
+  python manage.py rebuild_occupancy_index
+
+  echo "Creating superuser if not exists..."
+  python manage.py shell << END
 from apps.users.models import User
 import os
 
@@ -37,6 +47,7 @@ if not User.objects.filter(username=username).exists():
 else:
     print(f'Superuser {username} already exists')
 END
+fi
 
 echo "Starting application..."
 